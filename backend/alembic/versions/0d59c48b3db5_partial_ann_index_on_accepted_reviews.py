@@ -0,0 +1,68 @@
+"""partial ann index on accepted reviews
+
+Rebuilds the RAG_ANN_INDEX index with
+``WHERE status = 'Accepted' AND embedding IS NOT NULL``. The build runs
+concurrently and is swapped in by rename, so writes are not blocked.
+
+Revision ID: 0d59c48b3db5
+Revises: 8396e5fa7451
+Create Date: 2026-10-18 11:02:57.118204
+
+"""
+import math
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d59c48b3db5'
+down_revision: Union[str, None] = '8396e5fa7451'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PREDICATE = "status = 'Accepted' AND embedding IS NOT NULL"
+
+
+def _lists(rows):
+    # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond.
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(1, rows // 1000)
+
+
+def _rebuild(where):
+    hnsw = os.getenv("RAG_ANN_INDEX", "ivfflat").strip().lower() == "hnsw"
+    name = "idx_review_embedding_hnsw" if hnsw else "idx_review_embedding_ann"
+    staging = f"{name}_rebuild"
+
+    if hnsw:
+        m = int(os.getenv("RAG_HNSW_M", "16"))
+        ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+        method = f"hnsw (embedding vector_cosine_ops) WITH (m = {m}, ef_construction = {ef_construction})"
+    else:
+        rows = op.get_bind().execute(
+            sa.text(f"SELECT count(*) FROM review WHERE {where or 'embedding IS NOT NULL'}")
+        ).scalar_one()
+        method = f"ivfflat (embedding vector_cosine_ops) WITH (lists = {_lists(rows)})"
+    build = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {staging} ON review USING {method}"
+    if where:
+        build += f" WHERE {where}"
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}")
+        op.execute(build)
+
+    op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute(f"ALTER INDEX {staging} RENAME TO {name}")
+
+
+def upgrade():
+    _rebuild(PREDICATE)
+
+
+def downgrade():
+    _rebuild(None)
@@ -0,0 +1,43 @@
+"""add review.search_tsv for hybrid retrieval
+
+Adds a stored generated tsvector over the review document (corrected text,
+falling back to the original) and a GIN index on the Accepted rows.
+Adding a stored generated column rewrites the table once; the index itself
+is built concurrently.
+
+Revision ID: 5b2e9c71d4a0
+Revises: 0d59c48b3db5
+Create Date: 2026-10-18 14:21:09.630118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c71d4a0'
+down_revision: Union[str, None] = '0d59c48b3db5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE review ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('english'::regconfig, coalesce(nullif(corrected_text, ''), text))
+        ) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_review_search_tsv
+            ON review USING gin (search_tsv) WHERE status = 'Accepted'
+        """)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_review_search_tsv")
+    op.execute("ALTER TABLE review DROP COLUMN IF EXISTS search_tsv")
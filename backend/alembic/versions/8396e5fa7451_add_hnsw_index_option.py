@@ -0,0 +1,53 @@
+"""add hnsw index option on review.embedding
+
+Builds the ANN index selected by RAG_ANN_INDEX (ivfflat or hnsw) and drops
+the other one. HNSW uses RAG_HNSW_M / RAG_HNSW_EF_CONSTRUCTION. Builds and
+drops run concurrently, outside the migration transaction, so writes to
+``review`` are not blocked for the length of the build.
+
+Revision ID: 8396e5fa7451
+Revises: f3cd63243444
+Create Date: 2026-10-18 10:12:40.512337
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8396e5fa7451'
+down_revision: Union[str, None] = 'f3cd63243444'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _ivfflat():
+    op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_review_embedding_ann
+        ON review
+        USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)
+    """)
+    op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_review_embedding_hnsw")
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        if os.getenv("RAG_ANN_INDEX", "ivfflat").strip().lower() != "hnsw":
+            _ivfflat()
+            return
+        m = int(os.getenv("RAG_HNSW_M", "16"))
+        ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_review_embedding_hnsw
+            ON review
+            USING hnsw (embedding vector_cosine_ops) WITH (m = {m}, ef_construction = {ef_construction})
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_review_embedding_ann")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        _ivfflat()
@@ -0,0 +1,80 @@
+"""ann index metric option
+
+Rebuilds the RAG_ANN_INDEX index with the opclass for RAG_ANN_METRIC
+(``vector_ip_ops`` for ``ip``) when the current one differs. The build runs
+concurrently and is swapped in by rename, like ``0d59c48b3db5``. Later
+switches can use ``python -m app.infra.db.index_maintenance --metric``.
+
+Revision ID: 9e3a7c1d2b64
+Revises: 5b2e9c71d4a0
+Create Date: 2026-10-18 16:40:12.284517
+
+"""
+import math
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3a7c1d2b64'
+down_revision: Union[str, None] = '5b2e9c71d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PREDICATE = "status = 'Accepted' AND embedding IS NOT NULL"
+
+
+def _lists(rows):
+    # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond.
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(1, rows // 1000)
+
+
+def _rebuild(metric):
+    if metric not in ("cosine", "ip"):
+        raise ValueError(f"Unknown ANN metric {metric!r}; expected 'cosine' or 'ip'")
+    hnsw = os.getenv("RAG_ANN_INDEX", "ivfflat").strip().lower() == "hnsw"
+    name = "idx_review_embedding_hnsw" if hnsw else "idx_review_embedding_ann"
+    staging = f"{name}_rebuild"
+    opclass = f"vector_{metric}_ops"
+
+    bind = op.get_bind()
+    current = bind.execute(
+        sa.text(
+            "SELECT opc.opcname FROM pg_index i "
+            "JOIN pg_opclass opc ON opc.oid = i.indclass[0] "
+            "WHERE i.indexrelid = to_regclass(:name)"
+        ),
+        {"name": name},
+    ).scalar()
+    if current is None or current == opclass:
+        return
+
+    if hnsw:
+        m = int(os.getenv("RAG_HNSW_M", "16"))
+        ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+        method = f"hnsw (embedding {opclass}) WITH (m = {m}, ef_construction = {ef_construction})"
+    else:
+        rows = bind.execute(sa.text(f"SELECT count(*) FROM review WHERE {PREDICATE}")).scalar_one()
+        method = f"ivfflat (embedding {opclass}) WITH (lists = {_lists(rows)})"
+    build = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {staging} ON review USING {method} WHERE {PREDICATE}"
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}")
+        op.execute(build)
+
+    op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute(f"ALTER INDEX {staging} RENAME TO {name}")
+
+
+def upgrade():
+    _rebuild(os.getenv("RAG_ANN_METRIC", "cosine").strip().lower())
+
+
+def downgrade():
+    _rebuild("cosine")
@@ -0,0 +1,131 @@
+"""halfvec embedding storage option
+
+Converts review.embedding to the type selected by RAG_EMBEDDING_STORAGE
+(``halfvec(384)`` needs pgvector >= 0.7) without a table rewrite under lock:
+
+1. add ``embedding_new`` with the target type, kept in sync by a trigger;
+2. backfill it in short batches, one transaction each;
+3. build the RAG_ANN_INDEX index on it concurrently;
+4. in one short transaction, drop the old column (and its index), rename
+   ``embedding_new`` to ``embedding`` and the staged index into place.
+
+Restart the app with the same RAG_EMBEDDING_STORAGE right after, so query
+vectors are cast to the new type. Downgrade runs the same steps back to
+``vector(384)``.
+
+Revision ID: c8f41d7e2a56
+Revises: 9e3a7c1d2b64
+Create Date: 2026-10-18 18:05:47.903216
+
+"""
+import math
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f41d7e2a56'
+down_revision: Union[str, None] = '9e3a7c1d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_ROWS = 5000
+_SYNC = "review_embedding_new_sync"
+
+
+def _lists(rows):
+    # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond.
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(1, rows // 1000)
+
+
+def _convert(storage):
+    if storage not in ("vector", "halfvec"):
+        raise ValueError(f"Unknown embedding storage {storage!r}; expected 'vector' or 'halfvec'")
+    bind = op.get_bind()
+    current = bind.execute(
+        sa.text(
+            "SELECT t.typname FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid "
+            "WHERE a.attrelid = 'review'::regclass AND a.attname = 'embedding' AND NOT a.attisdropped"
+        )
+    ).scalar_one()
+    if current == storage:
+        return
+    if storage == "halfvec":
+        version = bind.execute(sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar_one()
+        if tuple(int(p) for p in version.split(".")[:2]) < (0, 7):
+            raise RuntimeError(f"RAG_EMBEDDING_STORAGE=halfvec needs pgvector >= 0.7, found {version}")
+
+    target = f"{storage}(384)"
+    hnsw = os.getenv("RAG_ANN_INDEX", "ivfflat").strip().lower() == "hnsw"
+    name = "idx_review_embedding_hnsw" if hnsw else "idx_review_embedding_ann"
+    staging = f"{name}_rebuild"
+    metric = os.getenv("RAG_ANN_METRIC", "cosine").strip().lower()
+    if metric not in ("cosine", "ip"):
+        raise ValueError(f"Unknown ANN metric {metric!r}; expected 'cosine' or 'ip'")
+    opclass = f"{storage}_{metric}_ops"
+
+    op.execute(f"ALTER TABLE review ADD COLUMN IF NOT EXISTS embedding_new {target}")
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION {_SYNC}() RETURNS trigger AS $$
+        BEGIN
+            NEW.embedding_new := NEW.embedding::{target};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(f"DROP TRIGGER IF EXISTS {_SYNC} ON review")
+    op.execute(
+        f"CREATE TRIGGER {_SYNC} BEFORE INSERT OR UPDATE OF embedding ON review "
+        f"FOR EACH ROW EXECUTE FUNCTION {_SYNC}()"
+    )
+
+    with op.get_context().autocommit_block():
+        while bind.execute(
+            sa.text(
+                f"""
+                UPDATE review SET embedding_new = embedding::{target}
+                WHERE id IN (
+                    SELECT id FROM review
+                    WHERE embedding IS NOT NULL AND embedding_new IS NULL
+                    ORDER BY id
+                    LIMIT :n
+                )
+                """
+            ),
+            {"n": BATCH_ROWS},
+        ).rowcount:
+            pass
+
+        # The predicate names embedding_new; after the rename it reads
+        # "embedding IS NOT NULL", the partial-index predicate queries repeat.
+        where = "status = 'Accepted' AND embedding_new IS NOT NULL"
+        if hnsw:
+            m = int(os.getenv("RAG_HNSW_M", "16"))
+            ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+            method = f"hnsw (embedding_new {opclass}) WITH (m = {m}, ef_construction = {ef_construction})"
+        else:
+            rows = bind.execute(sa.text(f"SELECT count(*) FROM review WHERE {where}")).scalar_one()
+            method = f"ivfflat (embedding_new {opclass}) WITH (lists = {_lists(rows)})"
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}")
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {staging} ON review USING {method} WHERE {where}")
+
+    op.execute(f"DROP TRIGGER IF EXISTS {_SYNC} ON review")
+    op.execute(f"DROP FUNCTION IF EXISTS {_SYNC}()")
+    op.execute("ALTER TABLE review DROP COLUMN embedding")
+    op.execute("ALTER TABLE review RENAME COLUMN embedding_new TO embedding")
+    op.execute(f"ALTER INDEX {staging} RENAME TO {name}")
+
+
+def upgrade():
+    _convert(os.getenv("RAG_EMBEDDING_STORAGE", "vector").strip().lower())
+
+
+def downgrade():
+    _convert("vector")
@@ -0,0 +1,58 @@
+"""binary-quantized HNSW index for two-stage search
+
+Builds an HNSW index (``bit_hamming_ops``) on
+``binary_quantize(embedding)::bit(384)`` for the Accepted rows, concurrently,
+whether or not RAG_BINARY_RESCORE is set, so turning the flag on later needs
+no migration. It is an expression index, so nothing is added to the table.
+Needs pgvector >= 0.7: on older versions the build is skipped with a
+warning; after upgrading the extension, build it with
+``python -m app.infra.db.index_maintenance --apply``. The app refuses to
+start with RAG_BINARY_RESCORE=true while the index is missing.
+
+Revision ID: e1b7d94c3f08
+Revises: c8f41d7e2a56
+Create Date: 2026-10-18 21:42:13.518604
+
+"""
+import logging
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d94c3f08'
+down_revision: Union[str, None] = 'c8f41d7e2a56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar_one()
+    if tuple(int(p) for p in version.split(".")[:2]) < (0, 7):
+        logger.warning(
+            "pgvector %s has no binary_quantize; skipping idx_review_embedding_bq "
+            "(RAG_BINARY_RESCORE stays unavailable)", version
+        )
+        return
+    m = int(os.getenv("RAG_HNSW_M", "16"))
+    ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_review_embedding_bq
+            ON review
+            USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)
+            WITH (m = {m}, ef_construction = {ef_construction})
+            WHERE status = 'Accepted' AND embedding IS NOT NULL
+        """)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_review_embedding_bq")
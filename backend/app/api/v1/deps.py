@@ -5,14 +5,20 @@ from functools import lru_cache
 
 from app.domain.rag.use_cases import SearchRag
 from app.domain.reviews.use_cases import SaveApprovedReview
+from app.core.result_cache import ResultCache
 from app.core.settings import get_settings
 from app.infra.db.admin_repository import SqlModelAdminRepository
 from app.infra.db.rag_repository import SqlModelRagRepository
+from app.infra.db.vector_index import evaluation_search_params
 from app.infra.db.repositories import SqlModelUserRepository
 from app.infra.db.reviews_repository import SqlModelReviewRepository
 from app.infra.tokens.token_provider import SecurityTokenProvider
 
-from app.infra.embeddings.local_sentence_transformer import LocalSentenceTransformerEmbedder
+from app.domain.rag.interfaces import BatchEmbedder, Embedder, RagRepository
+from app.infra.embeddings.cached import CachedEmbedder
+from app.infra.embeddings.factory import build_local_embedder
+from app.infra.embeddings.micro_batching import MicroBatchingEmbedder
+from app.infra.inference.client import RemoteEmbedder, RemoteSentimentAnalyzer, get_inference_client
 
 from app.domain.auth.use_cases import (
     RegisterUser,
@@ -28,13 +34,16 @@ from app.domain.admin.use_cases import (
     GetStats as AdminGetStats
 
 )
-from app.services.suggestion_service import SuggestionService
+from app.services.suggestion_service import MAX_CANDIDATE_CHARS, Retrieval, SuggestionService
 
 
 class E2EFakeSentimentAnalyzer:
     def analyze(self, text: str):
         return "POSITIVE", 0.99
 
+    def analyze_batch(self, texts):
+        return [self.analyze(t) for t in texts]
+
 
 class E2EFakeSuggestionEngine:
     def evaluate(self, *, text: str):
@@ -93,38 +102,120 @@ def get_refresh_tokens_use_case(
 
 
 
+def _numpy_index():
+    mode = get_settings().rag_repository
+    if mode == "memmap":
+        from app.infra.vector.segments import get_memmap_index  # lazy import
+        return get_memmap_index()
+    if mode != "numpy":
+        return None
+    from app.infra.vector.numpy_index import get_numpy_index  # lazy import
+    return get_numpy_index()
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache():
+    settings = get_settings()
+    if not settings.retrieval_cache_enabled:
+        return None
+    from app.infra.vector.retrieval_cache import DEFAULT_GENERATION_FILE, RetrievalCache  # lazy import
+    return RetrievalCache(
+        min_cosine=settings.retrieval_cache_min_cosine,
+        max_entries=settings.retrieval_cache_max_entries,
+        ttl_seconds=settings.retrieval_cache_ttl_seconds,
+        generation_path=settings.retrieval_cache_generation_file or DEFAULT_GENERATION_FILE,
+    )
+
+def _corpus_listeners():
+    return [x for x in (_numpy_index(), get_retrieval_cache()) if x is not None]
+
 def get_review_repo(db: Session = Depends(get_db)):
     from app.infra.db.reviews_repository import SqlModelReviewRepository
-    return SqlModelReviewRepository(db)
+    from app.infra.vector.indexing import IndexingReviewRepository
+    repo = SqlModelReviewRepository(db)
+    for listener in _corpus_listeners():
+        repo = IndexingReviewRepository(repo, listener)
+    return repo
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache | None:
+    settings = get_settings()
+    if not settings.result_cache_enabled:
+        return None
+    return ResultCache(
+        max_entries=settings.result_cache_max_entries,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+        disk_path=settings.result_cache_disk_path,
+    )
+
+@lru_cache(maxsize=1)
+def _sentiment_singleton():
+    from app.services.sentiment_analysis_service import (
+        CachedSentimentAnalyzer,
+        CoalescingSentimentAnalyzer,
+        SentimentAnalysisService,
+    )
+    if get_inference_client() is not None:
+        analyzer = RemoteSentimentAnalyzer(get_inference_client())
+    elif get_settings().sentiment_batching:
+        analyzer = CoalescingSentimentAnalyzer()
+    else:
+        analyzer = SentimentAnalysisService()
+    cache = get_result_cache()
+    if cache is not None:
+        return CachedSentimentAnalyzer(analyzer, cache)
+    return analyzer
 
 def get_sentiment_analyzer():
     if get_settings().e2e_fake_analysis:
         return E2EFakeSentimentAnalyzer()
-    from app.services.sentiment_analysis_service import SentimentAnalysisService
-    return SentimentAnalysisService()
+    return _sentiment_singleton()
 
-def get_query_embedder() -> LocalSentenceTransformerEmbedder:
+def get_query_embedder() -> Embedder:
     return _query_embedder_singleton()
 
-def get_rag_repo(db: Session = Depends(get_db)) -> SqlModelRagRepository:
-    return SqlModelRagRepository(db)
+def get_rag_repo(db: Session = Depends(get_db)) -> RagRepository:
+    index = _numpy_index()
+    repo: RagRepository
+    if index is not None:
+        from app.infra.vector.numpy_index import NumpyRagRepository
+        repo = NumpyRagRepository(db, index)
+    else:
+        repo = SqlModelRagRepository(db)
+    cache = get_retrieval_cache()
+    if cache is not None:
+        from app.infra.vector.retrieval_cache import CachedRagRepository
+        return CachedRagRepository(repo, cache)
+    return repo
 
 def get_rag_uc(
-    embedder: LocalSentenceTransformerEmbedder = Depends(get_query_embedder),  # usa "query: " (E5)
-    repo: SqlModelRagRepository = Depends(get_rag_repo),
+    embedder: Embedder = Depends(get_query_embedder),  # usa "query: " (E5)
+    repo: RagRepository = Depends(get_rag_repo),
 ) -> SearchRag:
-    return SearchRag(embedder=embedder, repo=repo)
+    return SearchRag(embedder=embedder, repo=repo, mode=get_settings().retrieval_mode)
 
 def get_suggestion_engine(
     rag_uc: SearchRag = Depends(get_rag_uc),
-    qembed: LocalSentenceTransformerEmbedder = Depends(get_query_embedder),
+    qembed: Embedder = Depends(get_query_embedder),
 ) -> SuggestionService:
     if get_settings().e2e_fake_analysis:
         return E2EFakeSuggestionEngine()
 
     def _retriever(query_text: str, k: int, min_score: float | None):
-        res = rag_uc.execute(text=query_text, k=k, min_score=min_score)
-        return [{"id": h.id, "text": h.text, "score": h.score} for h in res.hits]
+        res = rag_uc.execute(
+            text=query_text,
+            k=k,
+            min_score=min_score,
+            with_embeddings=True,
+            params=evaluation_search_params(),
+            max_chars=MAX_CANDIDATE_CHARS,
+        )
+        return Retrieval(
+            candidates=[
+                {"id": h.id, "text": h.text, "score": h.score, "embedding": h.embedding, "fused_score": h.fused_score}
+                for h in res.hits
+            ],
+            query_embedding=res.query_embedding,
+        )
 
     return SuggestionService(retriever=_retriever, query_embedder=qembed)
 
@@ -142,27 +233,50 @@ def get_list_my_reviews_uc(
     return ListMyReviews(reviews=repo)
 
 
+def _make_embedder(prefix: str) -> Embedder:
+    settings = get_settings()
+    embedder: BatchEmbedder
+    client = get_inference_client()
+    if client is not None:
+        # Batching happens in the inference server across all API workers.
+        embedder = RemoteEmbedder(client, query_prefix=prefix)
+    else:
+        embedder = build_local_embedder(prefix, settings.embedding_backend)
+
+    namespace = f"{settings.embedding_backend}:{embedder.model_name}:{prefix}"
+    if settings.embed_batching and client is None:
+        embedder = MicroBatchingEmbedder(embedder)
+
+    cache = get_result_cache()
+    if cache is not None:
+        return CachedEmbedder(embedder, cache, namespace=namespace)
+    return embedder
+
 @lru_cache(maxsize=1)
-def _query_embedder_singleton() -> LocalSentenceTransformerEmbedder:
-    return LocalSentenceTransformerEmbedder(query_prefix="query: ")
+def _query_embedder_singleton() -> Embedder:
+    return _make_embedder("query: ")
 
 @lru_cache(maxsize=1)
-def _doc_embedder_singleton() -> LocalSentenceTransformerEmbedder:
-    return LocalSentenceTransformerEmbedder(query_prefix="passage: ")
+def _doc_embedder_singleton() -> Embedder:
+    return _make_embedder("passage: ")
 
 
-def get_doc_embedder() -> LocalSentenceTransformerEmbedder:
+def get_doc_embedder() -> Embedder:
     return _doc_embedder_singleton()
 
 def get_save_approved_uc(
     repo: SqlModelReviewRepository = Depends(get_review_repo),
-    doc_embedder: LocalSentenceTransformerEmbedder = Depends(get_doc_embedder),
+    doc_embedder: Embedder = Depends(get_doc_embedder),
 ) -> SaveApprovedReview:
     return SaveApprovedReview(repo=repo, embedder=doc_embedder)
 
 
 def get_admin_repo(db: Session = Depends(get_db)) -> SqlModelAdminRepository:
-    return SqlModelAdminRepository(db)
+    from app.infra.vector.indexing import IndexingAdminRepository
+    repo = SqlModelAdminRepository(db)
+    for listener in _corpus_listeners():
+        repo = IndexingAdminRepository(repo, listener)
+    return repo
 
 def get_admin_list_uc(repo: SqlModelAdminRepository = Depends(get_admin_repo)) -> AdminListReviews:
     return AdminListReviews(repo=repo)
@@ -1,5 +1,6 @@
 # app/api/v1/endpoints/admin.py
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from dataclasses import asdict
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -11,6 +12,7 @@ from app.api.v1.deps import (
     get_admin_list_uc,
     get_admin_delete_uc,
     get_admin_stats_uc,
+    get_retrieval_cache,
 )
 
 from app.domain.admin.use_cases import (
@@ -101,3 +103,12 @@ def get_admin_stats(
             "user_id": agg.user_id,
         },
     }
+
+
+@router.get("/rag/cache", status_code=status.HTTP_200_OK)
+def get_retrieval_cache_stats(current_user: User = Depends(get_current_user)):
+    _ensure_admin(current_user)
+    cache = get_retrieval_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "min_cosine": cache.min_cosine, **asdict(cache.stats())}
@@ -1,14 +1,74 @@
+import json
+from typing import Iterator, Optional
+
 from fastapi import APIRouter, Depends
-from app.schemas import RagSearchIn, RagSearchOut, RagHit as RagHitSchema
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.schemas import RagBatchSearchIn, RagSearchIn, RagSearchOut, RagHit as RagHitSchema
 
+from app.core.settings import get_settings
+from app.dependencies import require_admin
+from app.domain.rag.entities import AnnSearchParams
 from app.domain.rag.use_cases import SearchRag
-from app.api.v1.deps import get_rag_uc
+from app.models.user import User
+from app.api.v1.deps import get_db, get_rag_uc
 
 router = APIRouter()
 
 
+def _search_params(probes: Optional[int], ef_search: Optional[int]) -> AnnSearchParams:
+    """Caller overrides, capped at RAG_MAX_PROBES / RAG_MAX_EF_SEARCH."""
+    settings = get_settings()
+    return AnnSearchParams(
+        probes=min(probes, settings.rag_max_probes) if probes is not None else None,
+        ef_search=min(ef_search, settings.rag_max_ef_search) if ef_search is not None else None,
+    )
+
+
 @router.post("/search", response_model=RagSearchOut)
 def rag_search(payload: RagSearchIn, uc: SearchRag = Depends(get_rag_uc)):
-    result = uc.execute(text=payload.text, k=payload.k, min_score=payload.min_score)
+    params = _search_params(payload.probes, payload.ef_search)
+    result = uc.execute(
+        text=payload.text,
+        k=payload.k,
+        min_score=payload.min_score,
+        params=params,
+        mode=payload.mode,
+        max_chars=payload.max_chars,
+    )
     hits = [RagHitSchema(id=h.id, text=h.text, score=h.score) for h in result.hits]
-    return RagSearchOut(results=hits)
\ No newline at end of file
+    return RagSearchOut(results=hits)
+
+
+@router.post("/search/batch")
+def rag_search_batch(
+    payload: RagBatchSearchIn,
+    uc: SearchRag = Depends(get_rag_uc),
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    """One NDJSON line per input text, in order:
+    ``{"index": 0, "query": "...", "results": [{"id", "text", "score"}], "took_ms": 12}``.
+    Admins only: up to 100 texts per call."""
+    params = _search_params(payload.probes, payload.ef_search)
+    results = uc.execute_many(
+        texts=payload.texts,
+        k=payload.k,
+        min_score=payload.min_score,
+        params=params,
+        mode=payload.mode,
+        max_chars=payload.max_chars,
+    )
+
+    def lines() -> Iterator[str]:
+        try:
+            for i, result in enumerate(results):
+                hits = [RagHitSchema(id=h.id, text=h.text, score=h.score).model_dump() for h in result.hits]
+                yield json.dumps({"index": i, "query": result.query, "results": hits, "took_ms": result.took_ms}) + "\n"
+        finally:
+            # The request-scoped session has already been closed when the
+            # body streams; give back the connection the stream reopened.
+            db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Sequence, Tuple, TypeVar
+
+
+__all__ = ["MicroBatcher", "BatchingStats"]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class BatchingStats:
+    batches: int
+    items: int
+    max_batch_size: int
+    avg_batch_size: float
+    avg_queue_wait_ms: float
+    max_queue_wait_ms: float
+    queue_depth: int
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces concurrent ``submit`` calls into one ``batch_fn`` call.
+
+    Callers block on a future while a single worker thread drains the queue,
+    flushing when ``max_batch_size`` items are waiting or ``max_wait_s`` has
+    passed since the first item of the batch arrived. ``batch_fn`` must return
+    one result per input, in order; any other count fails the whole batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Sequence[R]],
+        *,
+        max_batch_size: int,
+        max_wait_s: float,
+        name: str = "micro-batcher",
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_s))
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[T, Future, float]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: T) -> R:
+        fut: Future = Future()
+        self._queue.put((item, fut, time.perf_counter()))
+        return fut.result()
+
+    def stats(self) -> BatchingStats:
+        with self._stats_lock:
+            batches = self._batches
+            return BatchingStats(
+                batches=batches,
+                items=self._items,
+                max_batch_size=self._max_batch,
+                avg_batch_size=(self._items / batches) if batches else 0.0,
+                avg_queue_wait_ms=(self._wait_total_s * 1000 / self._items) if self._items else 0.0,
+                max_queue_wait_ms=self._wait_max_s * 1000,
+                queue_depth=self._queue.qsize(),
+            )
+
+    def _collect(self) -> List[Tuple[T, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in batch]
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._max_batch = max(self._max_batch, len(batch))
+                self._wait_total_s += sum(waits)
+                self._wait_max_s = max(self._wait_max_s, max(waits))
+
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as exc:
+                logger.warning("%s batch failed for %s item(s)", self.name, len(batch), exc_info=True)
+                for _, fut, _ in batch:
+                    fut.set_exception(exc)
+                continue
+
+            results = list(results)
+            if len(results) != len(batch):
+                logger.error("%s returned %s result(s) for %s item(s)", self.name, len(results), len(batch))
+                exc = RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+                for _, fut, _ in batch:
+                    fut.set_exception(exc)
+                continue
+
+            for (_, fut, _), result in zip(batch, results):
+                fut.set_result(result)
@@ -1,5 +1,4 @@
 from dotenv import load_dotenv
-from transformers import pipeline
 from huggingface_hub import InferenceClient
 from functools import lru_cache
 import logging
@@ -7,6 +6,8 @@ import os
 import time
 from typing import Any
 
+from app.core.model_registry import get_model_registry
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -27,9 +28,8 @@ LLM_RETRY_ATTEMPTS = max(1, int(os.getenv("LLM_RETRY_ATTEMPTS", "2")))
 LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
 
 
-@lru_cache(maxsize=1)
 def get_sentiment_pipeline():
-    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL_NAME)
+    return get_model_registry().sentiment_pipeline(SENTIMENT_MODEL_NAME)
 
 
 class HuggingFaceLLMClient:
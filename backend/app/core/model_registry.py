@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+__all__ = ["ModelRegistry", "ModelStats", "get_model_registry"]
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]  # (name, device, backend)
+
+
+@dataclass(frozen=True)
+class ModelStats:
+    name: str
+    device: str
+    backend: str
+    load_seconds: float
+    memory_bytes: int
+    hits: int
+    idle_seconds: float
+
+
+@dataclass
+class _Entry:
+    handle: Any
+    load_seconds: float
+    memory_bytes: int
+    last_used: float
+    hits: int = 0
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _module_bytes(handle: Any) -> int:
+    module = getattr(handle, "model", handle)
+    params = getattr(module, "parameters", None)
+    buffers = getattr(module, "buffers", None)
+    if not callable(params):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in params())
+    if callable(buffers):
+        total += sum(b.numel() * b.element_size() for b in buffers())
+    return int(total)
+
+
+def _local_source(name: str) -> Tuple[str, Dict[str, Any]]:
+    """Path to open ``name`` from plus extra ``from_pretrained`` kwargs.
+
+    Pinned snapshots load by path without touching the hub; safetensors
+    weights are memory-mapped rather than read into a second buffer.
+    """
+    from app.core.model_snapshots import resolve_model
+
+    snapshot = resolve_model(name)
+    if snapshot is None:
+        return name, {}
+    kwargs: Dict[str, Any] = {"local_files_only": True}
+    if snapshot.safetensors:
+        kwargs["use_safetensors"] = True
+    return snapshot.path, kwargs
+
+
+def _load_sentence_transformer(name: str, device: Optional[str]) -> Any:
+    from sentence_transformers import SentenceTransformer
+    # SentenceTransformer picks model.safetensors on its own when present.
+    path, _ = _local_source(name)
+    return SentenceTransformer(path, device=device)
+
+
+def _load_cross_encoder(name: str, device: Optional[str]) -> Any:
+    from sentence_transformers import CrossEncoder
+    path, kwargs = _local_source(name)
+    return CrossEncoder(path, device=device, trust_remote_code=True, automodel_args=kwargs)
+
+
+def _load_sentiment_pipeline(name: str, device: Optional[str]) -> Any:
+    from transformers import pipeline
+    path, kwargs = _local_source(name)
+    if device is None:
+        return pipeline("sentiment-analysis", model=path, model_kwargs=kwargs)
+    return pipeline("sentiment-analysis", model=path, device=device, model_kwargs=kwargs)
+
+
+_LOADERS: Dict[str, Callable[[str, Optional[str]], Any]] = {
+    "sentence-transformer": _load_sentence_transformer,
+    "cross-encoder": _load_cross_encoder,
+    "sentiment-pipeline": _load_sentiment_pipeline,
+}
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models keyed by (name, device, backend).
+
+    Models load lazily on first ``get`` and are shared by every caller. When
+    ``max_bytes`` is set, least recently used models idle for at least
+    ``min_idle_seconds`` are dropped after a load pushes the total over budget.
+    Callers should fetch the handle from the registry on use rather than
+    holding it, so an evicted model can actually be freed.
+    """
+
+    def __init__(self, max_bytes: int = 0, min_idle_seconds: float = 0.0) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.min_idle_seconds = max(0.0, float(min_idle_seconds))
+        self._entries: Dict[ModelKey, _Entry] = {}
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        name: str,
+        *,
+        backend: str,
+        device: Optional[str] = None,
+        loader: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        key: ModelKey = (name, device or "auto", backend)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.hits += 1
+                entry.last_used = time.monotonic()
+                return entry.handle
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key, device, loader)
+                with self._lock:
+                    self._entries[key] = entry
+                    self._evict_over_budget(keep=key)
+
+        with self._lock:
+            entry.hits += 1
+            entry.last_used = time.monotonic()
+        return entry.handle
+
+    def sentence_transformer(self, name: str, device: Optional[str] = None) -> Any:
+        return self.get(name, backend="sentence-transformer", device=device)
+
+    def cross_encoder(self, name: str, device: Optional[str] = None) -> Any:
+        return self.get(name, backend="cross-encoder", device=device)
+
+    def sentiment_pipeline(self, name: str, device: Optional[str] = None) -> Any:
+        return self.get(name, backend="sentiment-pipeline", device=device)
+
+    def _load(self, key: ModelKey, device: Optional[str], loader: Optional[Callable[[], Any]]) -> _Entry:
+        name, _, backend = key
+        if loader is None:
+            if backend not in _LOADERS:
+                raise ValueError(f"No loader registered for backend {backend!r}")
+            loader = lambda: _LOADERS[backend](name, device)  # noqa: E731
+
+        rss_before = _rss_bytes()
+        t0 = time.perf_counter()
+        handle = loader()
+        load_seconds = time.perf_counter() - t0
+        memory = _module_bytes(handle) or max(0, _rss_bytes() - rss_before)
+
+        logger.info(
+            "Model loaded",
+            extra={
+                "model_name": name,
+                "model_backend": backend,
+                "model_device": key[1],
+                "model_load_seconds": round(load_seconds, 3),
+                "model_memory_bytes": memory,
+            },
+        )
+        return _Entry(handle=handle, load_seconds=load_seconds, memory_bytes=memory, last_used=time.monotonic())
+
+    def _evict_over_budget(self, *, keep: ModelKey) -> None:
+        if not self.max_bytes:
+            return
+        now = time.monotonic()
+        total = sum(e.memory_bytes for e in self._entries.values())
+        candidates = sorted(
+            (k for k in self._entries if k != keep),
+            key=lambda k: self._entries[k].last_used,
+        )
+        for k in candidates:
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[k]
+            if now - entry.last_used < self.min_idle_seconds:
+                continue
+            total -= entry.memory_bytes
+            del self._entries[k]
+            logger.info("Model evicted", extra={"model_name": k[0], "model_backend": k[2]})
+
+    def evict(self, name: str, *, backend: str, device: Optional[str] = None) -> bool:
+        with self._lock:
+            return self._entries.pop((name, device or "auto", backend), None) is not None
+
+    def stats(self) -> List[ModelStats]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                ModelStats(
+                    name=name,
+                    device=device,
+                    backend=backend,
+                    load_seconds=round(e.load_seconds, 3),
+                    memory_bytes=e.memory_bytes,
+                    hits=e.hits,
+                    idle_seconds=round(now - e.last_used, 3),
+                )
+                for (name, device, backend), e in self._entries.items()
+            ]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e.memory_bytes for e in self._entries.values())
+
+
+@lru_cache(maxsize=1)
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry(
+        max_bytes=int(os.getenv("MODEL_REGISTRY_MAX_BYTES", "0")),
+        min_idle_seconds=float(os.getenv("MODEL_REGISTRY_MIN_IDLE_SECONDS", "300")),
+    )
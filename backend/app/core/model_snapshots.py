@@ -0,0 +1,199 @@
+"""Pinned local copies of every model the backend loads.
+
+    uv run python -m app.core.model_snapshots --dir /app/models
+
+downloads each configured model into ``<dir>/<org>__<name>`` and records the
+resolved commit in ``<dir>/manifest.json``. Registry loaders then open models
+by path from that directory; with MODEL_OFFLINE=true a model missing from the
+manifest is an error instead of a hub download.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from huggingface_hub import HfApi, snapshot_download
+
+from app.core.settings import get_settings
+
+
+__all__ = [
+    "MANIFEST_FILE",
+    "ModelSnapshot",
+    "configured_models",
+    "load_manifest",
+    "prefetch_models",
+    "resolve_model",
+    "verify_snapshots",
+]
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Weight formats we never need once safetensors are available.
+_NON_SAFETENSORS_WEIGHTS = [
+    "*.bin",
+    "*.h5",
+    "*.msgpack",
+    "*.ot",
+    "*.onnx",
+    "*.pt",
+    "onnx/*",
+    "openvino/*",
+]
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    name: str
+    path: str  # relative to the snapshot directory
+    revision: str
+    safetensors: bool
+
+
+def configured_models() -> List[str]:
+    """Every model name the API can load with the current environment."""
+    names = [
+        os.getenv("EMBEDDINGS_MODEL_NAME", "intfloat/multilingual-e5-small"),
+        os.getenv("SENTIMENT_MODEL_NAME", "distilbert-base-uncased-finetuned-sst-2-english"),
+        os.getenv("RAG_RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+        os.getenv("RAG_RERANKER_SHADOW_MODEL", "").strip(),
+        *get_settings().reranker_preload,
+    ]
+    return list(dict.fromkeys(n for n in names if n))
+
+
+def _snapshot_dirname(name: str) -> str:
+    return name.replace("/", "__")
+
+
+def load_manifest(snapshot_dir: str) -> Dict[str, ModelSnapshot]:
+    path = Path(snapshot_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    return {name: ModelSnapshot(name=name, **entry) for name, entry in raw.get("models", {}).items()}
+
+
+def _write_manifest(snapshot_dir: Path, snapshots: Dict[str, ModelSnapshot]) -> None:
+    payload = {
+        "version": 1,
+        "models": {
+            name: {k: v for k, v in asdict(s).items() if k != "name"}
+            for name, s in sorted(snapshots.items())
+        },
+    }
+    tmp = snapshot_dir / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, snapshot_dir / MANIFEST_FILE)
+
+
+def prefetch_models(names: Iterable[str], snapshot_dir: str) -> Dict[str, ModelSnapshot]:
+    """Downloads ``names`` (optionally ``name@revision``) into ``snapshot_dir``
+    and updates its manifest. Only safetensors weights are fetched when the
+    repo has them, so loads can memory-map instead of unpickling."""
+    root = Path(snapshot_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    snapshots = load_manifest(snapshot_dir)
+    api = HfApi()
+
+    for spec in names:
+        name, _, revision = spec.partition("@")
+        info = api.model_info(name, revision=revision or None)
+        files = [s.rfilename for s in (info.siblings or [])]
+        has_safetensors = any(f.endswith(".safetensors") for f in files)
+
+        t0 = time.perf_counter()
+        snapshot_download(
+            repo_id=name,
+            revision=info.sha,
+            local_dir=str(root / _snapshot_dirname(name)),
+            ignore_patterns=_NON_SAFETENSORS_WEIGHTS if has_safetensors else ["*.h5", "*.msgpack", "*.ot"],
+        )
+        snapshots[name] = ModelSnapshot(
+            name=name,
+            path=_snapshot_dirname(name),
+            revision=info.sha,
+            safetensors=has_safetensors,
+        )
+        _write_manifest(root, snapshots)
+        logger.info(
+            "Model snapshot fetched",
+            extra={
+                "model_name": name,
+                "model_revision": info.sha,
+                "model_safetensors": has_safetensors,
+                "model_fetch_seconds": round(time.perf_counter() - t0, 3),
+            },
+        )
+    return snapshots
+
+
+def resolve_model(
+    name: str,
+    snapshot_dir: Optional[str] = None,
+    offline: Optional[bool] = None,
+) -> Optional[ModelSnapshot]:
+    """Returns the pinned snapshot for ``name`` with an absolute ``path``, or
+    ``None`` when the model should be resolved against the hub as before.
+
+    Raises ``RuntimeError`` in offline mode when the snapshot is missing.
+    """
+    settings = get_settings()
+    snapshot_dir = snapshot_dir if snapshot_dir is not None else settings.model_snapshot_dir
+    offline = settings.model_offline if offline is None else offline
+
+    if os.path.isdir(name):
+        return None
+
+    snapshot = load_manifest(snapshot_dir).get(name) if snapshot_dir else None
+    if snapshot is not None:
+        path = Path(snapshot_dir) / snapshot.path
+        if path.is_dir():
+            return ModelSnapshot(name=name, path=str(path), revision=snapshot.revision, safetensors=snapshot.safetensors)
+
+    if offline:
+        raise RuntimeError(
+            f"Model {name!r} has no local snapshot in {snapshot_dir or 'MODEL_SNAPSHOT_DIR (unset)'}. "
+            "Run `python -m app.core.model_snapshots` or set MODEL_OFFLINE=false."
+        )
+    return None
+
+
+def verify_snapshots(names: Iterable[str], snapshot_dir: Optional[str] = None) -> List[str]:
+    """Names from ``names`` that have no usable local snapshot."""
+    missing = []
+    for name in names:
+        try:
+            resolve_model(name, snapshot_dir=snapshot_dir, offline=True)
+        except RuntimeError:
+            missing.append(name)
+    return missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download pinned snapshots of every configured model.")
+    parser.add_argument("--dir", default=os.getenv("MODEL_SNAPSHOT_DIR") or "models")
+    parser.add_argument(
+        "--model",
+        action="append",
+        dest="models",
+        help="Model to fetch as name or name@revision (repeatable). Defaults to every configured model.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    snapshots = prefetch_models(args.models or configured_models(), args.dir)
+    for s in snapshots.values():
+        print(f"{s.name}\t{s.revision}\t{'safetensors' if s.safetensors else 'pytorch'}\t{s.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+__all__ = ["ResultCache", "CacheStats", "cache_key", "normalize_text"]
+
+logger = logging.getLogger(__name__)
+
+_DISK_TRIM_EVERY = 1000  # disk writes between TTL / capacity sweeps
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(namespace: str, model: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{namespace}:{model}:{digest}"
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    disk_hits: int
+    hit_ratio: float
+    entries: int
+    memory_bytes: int
+
+
+class ResultCache:
+    """Bounded LRU cache with a TTL for small binary results.
+
+    Values are raw ``bytes`` (e.g. ``ndarray.tobytes()``) so memory use is
+    simply the sum of value sizes. With ``disk_path`` set, entries are also
+    written to a SQLite file and read back on memory misses, so the cache
+    survives restarts. SQLite is only touched under its own lock, so memory
+    hits never wait on a disk write. Expired and over-capacity rows are
+    deleted at startup and every ``_DISK_TRIM_EVERY`` writes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600.0,
+        disk_path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._lock = threading.Lock()
+
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._disk_writes = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS result_cache_stored_at ON result_cache (stored_at)")
+            self._disk.commit()
+            with self._disk_lock:
+                self._trim_disk(time.time())
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                stored_at, value = item
+                if not self._expired(stored_at, now):
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._remove(key)
+            if self._disk is None:
+                self._misses += 1
+                return None
+
+        row = None
+        with self._disk_lock:
+            try:
+                row = self._disk.execute(
+                    "SELECT value, stored_at FROM result_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                logger.warning("Result cache disk read failed", exc_info=True)
+
+        with self._lock:
+            if row is not None and not self._expired(row[1], now):
+                value = bytes(row[0])
+                self._insert(key, value, row[1])
+                self._hits += 1
+                self._disk_hits += 1
+                return value
+            self._misses += 1
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._insert(key, value, now)
+        if self._disk is None:
+            return
+        with self._disk_lock:
+            try:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO result_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                self._disk.commit()
+                self._disk_writes += 1
+                if self._disk_writes % _DISK_TRIM_EVERY == 0:
+                    self._trim_disk(now)
+            except sqlite3.Error:
+                logger.warning("Result cache disk write failed", exc_info=True)
+
+    def _trim_disk(self, now: float) -> None:
+        """Deletes expired rows and all but the newest ``max_entries``.
+        Callers hold ``_disk_lock``."""
+        try:
+            if self.ttl_seconds > 0:
+                self._disk.execute("DELETE FROM result_cache WHERE stored_at < ?", (now - self.ttl_seconds,))
+            self._disk.execute(
+                "DELETE FROM result_cache WHERE key IN "
+                "(SELECT key FROM result_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._disk.commit()
+        except sqlite3.Error:
+            logger.warning("Result cache disk trim failed", exc_info=True)
+
+    def _insert(self, key: str, value: bytes, stored_at: float) -> None:
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (stored_at, value)
+        self._bytes += len(value)
+        while len(self._data) > self.max_entries:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._data.pop(key)
+        self._bytes -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM result_cache")
+                self._disk.commit()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                disk_hits=self._disk_hits,
+                hit_ratio=(self._hits / lookups) if lookups else 0.0,
+                entries=len(self._data),
+                memory_bytes=self._bytes,
+            )
@@ -1,8 +1,9 @@
 from functools import lru_cache
+import importlib.util
 import os
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 load_dotenv()
@@ -26,6 +27,64 @@ class Settings(BaseModel):
     cors_origins: list[str] = Field(default_factory=list)
     port: int = 7860
     e2e_fake_analysis: bool = False
+    embed_batching: bool = False
+    embed_max_batch: int = 32
+    embed_max_wait_ms: float = 5.0
+    embedding_backend: str = "torch"
+    sentiment_batching: bool = False
+    result_cache_enabled: bool = False
+    result_cache_max_entries: int = 10_000
+    result_cache_ttl_seconds: float = 3600.0
+    result_cache_disk_path: str | None = None
+    reranker_preload: list[str] = Field(default_factory=list)
+    inference_socket: str | None = None
+    inference_authkey: str | None = None
+    inference_timeout_seconds: float = 30.0
+    model_snapshot_dir: str | None = None
+    model_offline: bool = False
+    ann_index: str = "ivfflat"
+    ann_metric: str = "cosine"
+    embedding_storage: str = "vector"
+    hnsw_ef_search: int = 40
+    rag_probes: int = 15
+    rag_max_probes: int = 100
+    rag_max_ef_search: int = 400
+    iterative_scan: str | None = None
+    eval_probes: int = 8
+    eval_ef_search: int = 40
+    eval_iterative_scan: str | None = None
+    rag_repository: str = "pgvector"
+    numpy_refresh_seconds: float = 30.0
+    vector_segments_dir: str | None = None
+    vector_segments_dtype: str = "float32"
+    retrieval_mode: str = "vector"
+    hybrid_candidates: int = 50
+    hybrid_probes: int | None = None
+    rrf_k: int = 60
+    binary_rescore: bool = False
+    binary_candidates: int = 200
+    retrieval_cache_enabled: bool = False
+    retrieval_cache_min_cosine: float = 0.995
+    retrieval_cache_max_entries: int = 2000
+    retrieval_cache_ttl_seconds: float = 60.0
+    retrieval_cache_generation_file: str | None = None
+
+    @field_validator("embedding_backend")
+    @classmethod
+    def _backend_installed(cls, value: str) -> str:
+        if value == "onnx" and importlib.util.find_spec("onnxruntime") is None:
+            raise ValueError(
+                "RAG_EMBEDDING_BACKEND=onnx needs onnxruntime; install the onnx extra (uv sync --extra onnx)"
+            )
+        return value
+
+    @field_validator("binary_candidates")
+    @classmethod
+    def _binary_candidates_in_range(cls, value: int) -> int:
+        # The first stage is one HNSW scan, and pgvector caps hnsw.ef_search at 1000.
+        if not 1 <= value <= 1000:
+            raise ValueError(f"RAG_BINARY_CANDIDATES must be between 1 and 1000, got {value}")
+        return value
 
 
 @lru_cache(maxsize=1)
@@ -38,4 +97,45 @@ def get_settings() -> Settings:
         cors_origins=_env_csv("CORS_ORIGINS", "https://review-analyzer.vercel.app"),
         port=int(os.getenv("PORT", "7860")),
         e2e_fake_analysis=_env_bool("E2E_FAKE_ANALYSIS", default=False),
+        embed_batching=_env_bool("RAG_EMBED_BATCHING", default=False),
+        embed_max_batch=int(os.getenv("RAG_EMBED_MAX_BATCH", "32")),
+        embed_max_wait_ms=float(os.getenv("RAG_EMBED_MAX_WAIT_MS", "5")),
+        embedding_backend=os.getenv("RAG_EMBEDDING_BACKEND", "torch").strip().lower(),
+        sentiment_batching=_env_bool("SENTIMENT_BATCHING", default=False),
+        result_cache_enabled=_env_bool("RESULT_CACHE_ENABLED", default=False),
+        result_cache_max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000")),
+        result_cache_ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600")),
+        result_cache_disk_path=os.getenv("RESULT_CACHE_DISK_PATH") or None,
+        reranker_preload=_env_csv("RAG_RERANKER_PRELOAD", ""),
+        inference_socket=os.getenv("INFERENCE_SOCKET") or None,
+        inference_authkey=os.getenv("INFERENCE_AUTHKEY") or None,
+        inference_timeout_seconds=float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30")),
+        model_snapshot_dir=os.getenv("MODEL_SNAPSHOT_DIR") or None,
+        model_offline=_env_bool("MODEL_OFFLINE", default=False),
+        ann_index=os.getenv("RAG_ANN_INDEX", "ivfflat").strip().lower(),
+        ann_metric=os.getenv("RAG_ANN_METRIC", "cosine").strip().lower(),
+        embedding_storage=os.getenv("RAG_EMBEDDING_STORAGE", "vector").strip().lower(),
+        hnsw_ef_search=int(os.getenv("RAG_HNSW_EF_SEARCH", "40")),
+        rag_probes=int(os.getenv("RAG_PROBES", "15")),
+        rag_max_probes=int(os.getenv("RAG_MAX_PROBES", "100")),
+        rag_max_ef_search=int(os.getenv("RAG_MAX_EF_SEARCH", "400")),
+        iterative_scan=os.getenv("RAG_ITERATIVE_SCAN", "").strip().lower() or None,
+        eval_probes=int(os.getenv("RAG_EVAL_PROBES", "8")),
+        eval_ef_search=int(os.getenv("RAG_EVAL_EF_SEARCH", "40")),
+        eval_iterative_scan=os.getenv("RAG_EVAL_ITERATIVE_SCAN", "").strip().lower() or None,
+        rag_repository=os.getenv("RAG_REPOSITORY", "pgvector").strip().lower(),
+        numpy_refresh_seconds=float(os.getenv("RAG_NUMPY_REFRESH_SECONDS", "30")),
+        vector_segments_dir=os.getenv("RAG_SEGMENTS_DIR") or None,
+        vector_segments_dtype=os.getenv("RAG_SEGMENTS_DTYPE", "float32").strip().lower(),
+        retrieval_mode=os.getenv("RAG_RETRIEVAL_MODE", "vector").strip().lower(),
+        hybrid_candidates=int(os.getenv("RAG_HYBRID_CANDIDATES", "50")),
+        hybrid_probes=int(os.getenv("RAG_HYBRID_PROBES")) if os.getenv("RAG_HYBRID_PROBES") else None,
+        rrf_k=int(os.getenv("RAG_RRF_K", "60")),
+        binary_rescore=_env_bool("RAG_BINARY_RESCORE", default=False),
+        binary_candidates=int(os.getenv("RAG_BINARY_CANDIDATES", "200")),
+        retrieval_cache_enabled=_env_bool("RAG_RETRIEVAL_CACHE", default=False),
+        retrieval_cache_min_cosine=float(os.getenv("RAG_RETRIEVAL_CACHE_MIN_COSINE", "0.995")),
+        retrieval_cache_max_entries=int(os.getenv("RAG_RETRIEVAL_CACHE_MAX_ENTRIES", "2000")),
+        retrieval_cache_ttl_seconds=float(os.getenv("RAG_RETRIEVAL_CACHE_TTL_SECONDS", "60")),
+        retrieval_cache_generation_file=os.getenv("RAG_RETRIEVAL_CACHE_GENERATION_FILE") or None,
     )
@@ -26,4 +26,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Dep
     except (ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Invalid token subject")
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def require_admin(user: User = Depends(get_current_user)) -> User:
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return user
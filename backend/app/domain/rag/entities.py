@@ -1,9 +1,39 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
 
 
-__all__ = ["RagHit", "RagSearchResult"]
+__all__ = ["AnnSearchParams", "RagHit", "RagSearchResult", "RETRIEVAL_MODES"]
+
+ITERATIVE_SCAN_MODES = ("off", "relaxed_order", "strict_order")
+RETRIEVAL_MODES = ("vector", "hybrid")
+
+
+@dataclass(frozen=True)
+class AnnSearchParams:
+    """Recall/latency knobs for one ANN query; ``None`` leaves a knob unset.
+
+    ``probes`` applies to ivfflat, ``ef_search`` to HNSW, ``iterative_scan``
+    (pgvector 0.8+) to both.
+    """
+
+    probes: Optional[int] = None
+    ef_search: Optional[int] = None
+    iterative_scan: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.iterative_scan is not None and self.iterative_scan not in ITERATIVE_SCAN_MODES:
+            raise ValueError(f"iterative_scan must be one of {ITERATIVE_SCAN_MODES}, got {self.iterative_scan!r}")
+
+    def merged(self, override: Optional["AnnSearchParams"]) -> "AnnSearchParams":
+        """Values set on ``override`` win over this object's."""
+        if override is None:
+            return self
+        return AnnSearchParams(
+            probes=override.probes if override.probes is not None else self.probes,
+            ef_search=override.ef_search if override.ef_search is not None else self.ef_search,
+            iterative_scan=override.iterative_scan if override.iterative_scan is not None else self.iterative_scan,
+        )
 
 
 @dataclass(frozen=True)
@@ -11,6 +41,9 @@ class RagHit:
     id: int
     text: str
     score: float
+    embedding: Optional[Sequence[float]] = field(default=None, repr=False, compare=False)
+    # Reciprocal-rank-fusion score in hybrid mode; ``score`` stays the cosine.
+    fused_score: Optional[float] = field(default=None, compare=False)
 
 
 @dataclass(frozen=True)
@@ -18,3 +51,4 @@ class RagSearchResult:
     query: str
     hits: List[RagHit]
     took_ms: Optional[int] = None
+    query_embedding: Optional[List[float]] = field(default=None, repr=False, compare=False)
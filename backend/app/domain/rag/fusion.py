@@ -0,0 +1,17 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+
+
+__all__ = ["RRF_K", "reciprocal_rank_fusion"]
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """Fuses ranked id lists by summing ``1 / (k + rank)`` (rank from 1) per
+    id. Returns ``(id, fused_score)`` best first; ties keep first-seen order."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
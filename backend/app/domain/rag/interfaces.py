@@ -1,9 +1,9 @@
 from __future__ import annotations
-from typing import Protocol, List, Optional
-from .entities import RagHit
+from typing import Protocol, List, Optional, Sequence
+from .entities import AnnSearchParams, RagHit
 
 
-__all__ = ["RagRepository", "Embedder"]
+__all__ = ["RagRepository", "Embedder", "BatchEmbedder"]
 
 
 class RagRepository(Protocol):
@@ -13,10 +13,47 @@ class RagRepository(Protocol):
         embedding: List[float],
         k: int = 5,
         min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
     ) -> List[RagHit]:
+        """Nearest hits with cosine >= ``min_score``, best first; ``text`` is
+        cut to ``max_chars`` characters."""
+        ...
+
+    def search_many_by_embedding(
+        self,
+        *,
+        embeddings: Sequence[List[float]],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[List[RagHit]]:
+        """One hit list per query embedding, in input order."""
+        ...
+
+    def search_hybrid(
+        self,
+        *,
+        text: str,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        """Full-text and ANN candidates fused by reciprocal rank, best first.
+        ``min_score`` only drops hits that did not match lexically."""
         ...
 
 
 class Embedder(Protocol):
     def embed(self, text: str) -> List[float]:
         ...
+
+
+class BatchEmbedder(Embedder, Protocol):
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
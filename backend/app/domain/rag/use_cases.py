@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Iterator, List, Optional, Sequence
 
-from .entities import RagHit, RagSearchResult
+from .entities import RETRIEVAL_MODES, AnnSearchParams, RagHit, RagSearchResult
 from .interfaces import Embedder, RagRepository
 
 
@@ -16,9 +16,23 @@ class SearchRag:
     embedder: Embedder
     repo: RagRepository
     max_k: int = 50
+    mode: str = "vector"
 
-    def execute(self, *, text: str, k: int = 5, min_score: Optional[float] = None) -> RagSearchResult:
+    def execute(
+        self,
+        *,
+        text: str,
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        mode: Optional[str] = None,
+        max_chars: Optional[int] = None,
+    ) -> RagSearchResult:
         t0 = time.perf_counter()
+        mode = mode or self.mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, got {mode!r}")
 
         q = (text or "").strip()
         if not q:
@@ -28,11 +42,83 @@ class SearchRag:
 
         emb: List[float] = self.embedder.embed(q)
 
-        hits: List[RagHit] = self.repo.search_by_embedding(
-            embedding=emb, k=k, min_score=min_score
-        )
-
-        hits_sorted = sorted(hits, key=lambda h: h.score, reverse=True)
+        if mode == "hybrid":
+            hits: List[RagHit] = self.repo.search_hybrid(
+                text=q,
+                embedding=emb,
+                k=k,
+                min_score=min_score,
+                with_embeddings=with_embeddings,
+                params=params,
+                max_chars=max_chars,
+            )
+            # Fusion order is the ranking; the cosine only breaks ties.
+            hits_sorted = sorted(hits, key=lambda h: (h.fused_score or 0.0, h.score), reverse=True)
+        else:
+            hits = self.repo.search_by_embedding(
+                embedding=emb,
+                k=k,
+                min_score=min_score,
+                with_embeddings=with_embeddings,
+                params=params,
+                max_chars=max_chars,
+            )
+            hits_sorted = sorted(hits, key=lambda h: h.score, reverse=True)
 
         took_ms = int((time.perf_counter() - t0) * 1000)
-        return RagSearchResult(query=q, hits=hits_sorted, took_ms=took_ms)
+        return RagSearchResult(query=q, hits=hits_sorted, took_ms=took_ms, query_embedding=emb)
+
+    def execute_many(
+        self,
+        *,
+        texts: Sequence[str],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        params: Optional[AnnSearchParams] = None,
+        mode: Optional[str] = None,
+        chunk_size: int = 64,
+        max_chars: Optional[int] = None,
+    ) -> Iterator[RagSearchResult]:
+        """Yields one result per text, in order. Each chunk of texts is
+        embedded with one batched ``embed_many`` call and searched in one
+        repository call, so callers can stream results as chunks finish.
+        Hybrid mode fuses per query."""
+        mode = mode or self.mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, got {mode!r}")
+        k = max(1, min(self.max_k, int(k or 5)))
+        embed_many = getattr(self.embedder, "embed_many", None)
+
+        for start in range(0, len(texts), max(1, chunk_size)):
+            t0 = time.perf_counter()
+            queries = [(t or "").strip() for t in texts[start : start + chunk_size]]
+            todo = [q for q in queries if q]
+            embs = (embed_many(todo) if embed_many else [self.embedder.embed(q) for q in todo]) if todo else []
+
+            if mode == "hybrid":
+                found = [
+                    sorted(
+                        self.repo.search_hybrid(
+                            text=q, embedding=e, k=k, min_score=min_score, params=params, max_chars=max_chars
+                        ),
+                        key=lambda h: (h.fused_score or 0.0, h.score),
+                        reverse=True,
+                    )
+                    for q, e in zip(todo, embs)
+                ]
+            else:
+                found = [
+                    sorted(hits, key=lambda h: h.score, reverse=True)
+                    for hits in self.repo.search_many_by_embedding(
+                        embeddings=embs, k=k, min_score=min_score, params=params, max_chars=max_chars
+                    )
+                ] if embs else []
+
+            took_ms = int((time.perf_counter() - t0) * 1000)
+            by_query = iter(zip(found, embs))
+            for q in queries:
+                if not q:
+                    yield RagSearchResult(query=q, hits=[], took_ms=0)
+                    continue
+                hits, emb = next(by_query)
+                yield RagSearchResult(query=q, hits=hits, took_ms=took_ms, query_embedding=emb)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Protocol, Optional, List, Tuple, Iterable
+from typing import Protocol, Optional, List, Sequence, Tuple, Iterable
 from datetime import datetime
 from app.domain.reviews.entities import ReviewEntity
 
@@ -47,6 +47,10 @@ class SentimentAnalyzer(Protocol):
     def analyze(self, text: str) -> Tuple[str, float]: ...
 
 
+class BatchSentimentAnalyzer(SentimentAnalyzer, Protocol):
+    def analyze_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]: ...
+
+
 class SuggestionEngine(Protocol):
     def evaluate(self, *, text: str) -> dict: ...
 
@@ -56,4 +60,4 @@ class DraftProvider(Protocol):
     def create(self, *, user_id: int, text: str, group_id: str) -> str: ...
     def decode(self, token: str) -> dict: ...  # {"user_id","text","group_id","ts"}
 
-__all__ = ["ReviewRepository", "SentimentAnalyzer", "SuggestionEngine", "DraftProvider"]
+__all__ = ["ReviewRepository", "SentimentAnalyzer", "BatchSentimentAnalyzer", "SuggestionEngine", "DraftProvider"]
@@ -1,20 +1,24 @@
 from typing import List
-from sentence_transformers import SentenceTransformer
 import os
 
+from app.core.model_registry import get_model_registry
+
 _MODEL_NAME = os.getenv("EMBEDDINGS_MODEL_NAME", "intfloat/multilingual-e5-small")
-_model = SentenceTransformer(_MODEL_NAME)
+_DEVICE = os.getenv("RAG_EMBEDDING_DEVICE", "cpu")
+
+def _model():
+    return get_model_registry().sentence_transformer(_MODEL_NAME, device=_DEVICE)
 
 def embed_text_passage(text: str) -> List[float]:
     text = (text or "").strip()
     if not text:
         return []
-    v = _model.encode(f"passage: {text}", normalize_embeddings=True)
+    v = _model().encode(f"passage: {text}", normalize_embeddings=True)
     return v.tolist()
 
 def embed_text_query(text: str) -> List[float]:
     text = (text or "").strip()
     if not text:
         return []
-    v = _model.encode(f"query: {text}", normalize_embeddings=True)
+    v = _model().encode(f"query: {text}", normalize_embeddings=True)
     return v.tolist()
\ No newline at end of file
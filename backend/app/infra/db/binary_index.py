@@ -0,0 +1,55 @@
+# app/infra/db/binary_index.py
+from __future__ import annotations
+
+from typing import Optional
+
+from app.infra.db.vector_index import ANN_INDEX_PREDICATE, EMBEDDING_DIM, HNSW_EF_CONSTRUCTION, HNSW_M
+
+
+__all__ = [
+    "BINARY_INDEX_NAME",
+    "binary_quantized_sql",
+    "hamming_distance_sql",
+    "binary_index_sql",
+    "first_stage_size",
+]
+
+# HNSW over the sign bits of each embedding (pgvector >= 0.7). An expression
+# index, not a column: nothing to backfill and nothing stored in the heap.
+BINARY_INDEX_NAME = "idx_review_embedding_bq"
+
+# pgvector rejects hnsw.ef_search above this.
+HNSW_MAX_EF_SEARCH = 1000
+
+
+def binary_quantized_sql(column: str = "embedding") -> str:
+    # Queries must spell the expression exactly like the index, cast included.
+    return f"(binary_quantize({column})::bit({EMBEDDING_DIM}))"
+
+
+def hamming_distance_sql(column: str, query: str) -> str:
+    return f"{binary_quantized_sql(column)} <~> binary_quantize({query})"
+
+
+def binary_index_sql(
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    *,
+    name: str = BINARY_INDEX_NAME,
+    concurrently: bool = False,
+) -> str:
+    m = int(m or HNSW_M)
+    ef_construction = int(ef_construction or HNSW_EF_CONSTRUCTION)
+    return f"""
+        CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name}
+        ON review
+        USING hnsw ({binary_quantized_sql()} bit_hamming_ops) WITH (m = {m}, ef_construction = {ef_construction})
+        WHERE {ANN_INDEX_PREDICATE}
+    """
+
+
+def first_stage_size(candidates: int, k: int, max_ef_search: Optional[int] = None) -> int:
+    """Rows the Hamming stage hands to rescoring: at least ``k``, but no more
+    than one HNSW scan may return (``max_ef_search``, and pgvector's 1000)."""
+    cap = HNSW_MAX_EF_SEARCH if max_ef_search is None else min(HNSW_MAX_EF_SEARCH, int(max_ef_search))
+    return max(1, min(max(int(candidates), int(k)), cap))
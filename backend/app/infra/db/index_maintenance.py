@@ -0,0 +1,289 @@
+"""Keeps the review ANN index sized for the corpus.
+
+    uv run python -m app.infra.db.index_maintenance            # dry run
+    uv run python -m app.infra.db.index_maintenance --apply
+    uv run python -m app.infra.db.index_maintenance --metric ip --apply
+
+Rebuilds the review ANN index concurrently when its lists, opclass or
+predicate drift from the corpus and settings.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.settings import get_settings
+from app.infra.db.binary_index import BINARY_INDEX_NAME, binary_index_sql
+from app.infra.db.vector_index import (
+    ANN_INDEX_PREDICATE,
+    ANN_INDEX_TYPES,
+    ANN_METRICS,
+    hnsw_index_sql,
+    index_name_for,
+    ivfflat_index_sql,
+    opclass_for,
+    resolve_metric,
+    resolve_storage,
+)
+
+
+__all__ = [
+    "IndexInfo",
+    "MaintenancePlan",
+    "recommended_lists",
+    "inspect_indexes",
+    "count_embedded_rows",
+    "column_storage",
+    "pgvector_version",
+    "binary_index_valid",
+    "build_binary_index",
+    "plan_maintenance",
+    "apply_plan",
+]
+
+logger = logging.getLogger(__name__)
+
+_BUILD_SUFFIX = "_rebuild"
+_LISTS_RE = re.compile(r"lists=(\d+)")
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    name: str
+    method: str
+    lists: Optional[int]
+    size_bytes: int
+    valid: bool
+    partial: bool = False
+    opclass: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class MaintenancePlan:
+    rows: int
+    index_type: str
+    target_lists: Optional[int]
+    rebuild: bool
+    drop: List[str] = field(default_factory=list)
+    reason: str = ""
+    metric: str = "cosine"
+    storage: str = "vector"
+
+
+def recommended_lists(rows: int) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(1, rows // 1000)
+
+
+def inspect_indexes(conn: Connection) -> List[IndexInfo]:
+    rows = conn.execute(
+        text(
+            """
+            SELECT c.relname, am.amname, c.reloptions, pg_relation_size(c.oid), i.indisvalid,
+                   i.indpred IS NOT NULL, opc.opcname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_am am ON am.oid = c.relam
+            JOIN pg_opclass opc ON opc.oid = i.indclass[0]
+            WHERE i.indrelid = 'review'::regclass
+              AND am.amname IN ('ivfflat', 'hnsw')
+            ORDER BY c.relname
+            """
+        )
+    ).all()
+    out = []
+    for name, method, reloptions, size, valid, partial, opclass in rows:
+        match = _LISTS_RE.search(",".join(reloptions or []))
+        out.append(
+            IndexInfo(
+                name=name,
+                method=method,
+                lists=int(match.group(1)) if match else None,
+                size_bytes=int(size),
+                valid=bool(valid),
+                partial=bool(partial),
+                opclass=opclass,
+            )
+        )
+    return out
+
+
+def count_embedded_rows(conn: Connection) -> int:
+    """Rows covered by the partial ANN index."""
+    return int(conn.execute(text(f"SELECT count(*) FROM review WHERE {ANN_INDEX_PREDICATE}")).scalar_one())
+
+
+def column_storage(conn: Connection) -> str:
+    """``vector`` or ``halfvec``: the current type of ``review.embedding``."""
+    return conn.execute(
+        text(
+            "SELECT t.typname FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid "
+            "WHERE a.attrelid = 'review'::regclass AND a.attname = 'embedding' AND NOT a.attisdropped"
+        )
+    ).scalar_one()
+
+
+def pgvector_version(conn: Connection) -> Tuple[int, int]:
+    """(major, minor) of the installed ``vector`` extension."""
+    version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar_one()
+    major, minor = version.split(".")[:2]
+    return int(major), int(minor)
+
+
+def binary_index_valid(conn: Connection) -> bool:
+    """Whether the binary-quantized index exists and finished building."""
+    return bool(
+        conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": BINARY_INDEX_NAME},
+        ).scalar()
+    )
+
+
+def build_binary_index(engine: Engine) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if pgvector_version(conn) < (0, 7):
+            raise RuntimeError("The binary-quantized index needs pgvector >= 0.7 (binary_quantize, bit_hamming_ops)")
+        # A failed concurrent build leaves an invalid index behind.
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {BINARY_INDEX_NAME}"))
+        logger.info("Building binary-quantized index", extra={"index_name": BINARY_INDEX_NAME})
+        conn.execute(text(binary_index_sql(concurrently=True)))
+        conn.execute(text("ANALYZE review"))
+
+
+def plan_maintenance(
+    rows: int,
+    indexes: List[IndexInfo],
+    index_type: str,
+    tolerance: float = 0.5,
+    force: bool = False,
+    metric: Optional[str] = None,
+    storage: Optional[str] = None,
+) -> MaintenancePlan:
+    """Decides whether the ``index_type`` index needs a rebuild and which
+    other vector indexes on ``review`` should go.
+
+    An ivfflat index is rebuilt when its ``lists`` is off from the target by
+    more than ``tolerance`` (relative), when it is invalid or missing. Any
+    index is rebuilt when its opclass does not match ``metric`` on the
+    ``storage`` column type.
+    """
+    metric = resolve_metric(metric)
+    storage = resolve_storage(storage)
+    opclass = opclass_for(metric, storage)
+    keep = index_name_for(index_type)
+    current = next((ix for ix in indexes if ix.name == keep and ix.method == index_type), None)
+    drop = [ix.name for ix in indexes if ix.name not in (keep, BINARY_INDEX_NAME)]
+    target = recommended_lists(rows) if index_type == "ivfflat" else None
+
+    def plan(rebuild: bool, reason: str) -> MaintenancePlan:
+        return MaintenancePlan(rows, index_type, target, rebuild, drop, reason, metric, storage)
+
+    if current is None:
+        return plan(True, f"{keep} does not exist")
+    if not current.valid:
+        return plan(True, f"{keep} is invalid")
+    if not current.partial:
+        return plan(True, f"{keep} is not partial")
+    if current.opclass is not None and current.opclass != opclass:
+        return plan(True, f"{keep} uses {current.opclass}, want {opclass}")
+    if force:
+        return plan(True, "forced")
+    if target is not None:
+        lists = current.lists or 0
+        if abs(lists - target) > tolerance * target:
+            return plan(True, f"lists={lists}, want {target}")
+    return plan(False, "index is up to date")
+
+
+def _build_sql(plan: MaintenancePlan, name: str) -> str:
+    if plan.index_type == "hnsw":
+        return hnsw_index_sql(name=name, concurrently=True, metric=plan.metric, storage=plan.storage)
+    return ivfflat_index_sql(
+        lists=plan.target_lists or 1, name=name, concurrently=True, metric=plan.metric, storage=plan.storage
+    )
+
+
+def apply_plan(engine: Engine, plan: MaintenancePlan) -> None:
+    final = index_name_for(plan.index_type)
+    staging = final + _BUILD_SUFFIX
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if plan.rebuild:
+            # A failed concurrent build leaves an invalid index behind.
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}"))
+            logger.info("Building vector index", extra={"index_name": staging, "index_lists": plan.target_lists})
+            conn.execute(text(_build_sql(plan, staging)))
+
+            # Swap in one short transaction on a regular connection: readers
+            # see either the old or the new index, never neither.
+            with engine.begin() as tx:
+                tx.execute(text(f"DROP INDEX IF EXISTS {final}"))
+                tx.execute(text(f"ALTER INDEX {staging} RENAME TO {final}"))
+
+        for name in plan.drop:
+            if name in (final, staging):
+                continue
+            logger.info("Dropping vector index", extra={"index_name": name})
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+        conn.execute(text("ANALYZE review"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-tune and rebuild the review ANN index.")
+    parser.add_argument("--index-type", choices=ANN_INDEX_TYPES, default=get_settings().ann_index)
+    parser.add_argument("--metric", choices=ANN_METRICS, default=get_settings().ann_metric)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Relative lists drift that triggers a rebuild.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the index looks up to date.")
+    parser.add_argument("--apply", action="store_true", help="Execute the plan instead of printing it.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app.database import engine
+
+    with engine.connect() as conn:
+        rows = count_embedded_rows(conn)
+        indexes = inspect_indexes(conn)
+        storage = column_storage(conn)
+        binary_ready = binary_index_valid(conn)
+
+    for ix in indexes:
+        print(
+            f"{ix.name}\t{ix.method}\t{ix.opclass}\tlists={ix.lists}\t{ix.size_bytes / 1e6:.1f} MB\tvalid={ix.valid}"
+        )
+    plan = plan_maintenance(
+        rows,
+        indexes,
+        args.index_type,
+        tolerance=args.tolerance,
+        force=args.force,
+        metric=args.metric,
+        storage=storage,
+    )
+    print(
+        f"rows={plan.rows} index={plan.index_type} metric={plan.metric} storage={plan.storage} "
+        f"target_lists={plan.target_lists} rebuild={plan.rebuild} drop={plan.drop} ({plan.reason})"
+    )
+
+    if args.apply and (plan.rebuild or plan.drop):
+        apply_plan(engine, plan)
+
+    if get_settings().binary_rescore:
+        print(f"{BINARY_INDEX_NAME} ready={binary_ready}")
+        if args.apply and not binary_ready:
+            build_binary_index(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# app/infra/db/lexical_index.py
+from __future__ import annotations
+
+__all__ = [
+    "TS_CONFIG",
+    "SEARCH_DOCUMENT",
+    "SEARCH_TSV_EXPRESSION",
+    "LEXICAL_INDEX_NAME",
+    "LEXICAL_INDEX_PREDICATE",
+    "search_tsv_column_sql",
+    "gin_index_sql",
+    "lexical_query_sql",
+]
+
+# Text search configuration baked into the generated column. Changing it
+# needs a new migration: the column expression must stay immutable.
+TS_CONFIG = "english"
+
+# The same document the suggestion retriever shows: the corrected text when
+# the author accepted a correction, the original text otherwise.
+SEARCH_DOCUMENT = "coalesce(nullif(corrected_text, ''), text)"
+SEARCH_TSV_EXPRESSION = f"to_tsvector('{TS_CONFIG}'::regconfig, {SEARCH_DOCUMENT})"
+
+LEXICAL_INDEX_NAME = "idx_review_search_tsv"
+LEXICAL_INDEX_PREDICATE = "status = 'Accepted'"
+
+
+def search_tsv_column_sql() -> str:
+    # Kept out of the SQLModel metadata: the generated expression is
+    # Postgres-only and the column is never written by the application.
+    return (
+        "ALTER TABLE review ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_TSV_EXPRESSION}) STORED"
+    )
+
+
+def gin_index_sql(*, name: str = LEXICAL_INDEX_NAME, concurrently: bool = False) -> str:
+    concurrent = " CONCURRENTLY" if concurrently else ""
+    return (
+        f"CREATE INDEX{concurrent} IF NOT EXISTS {name} "
+        f"ON review USING gin (search_tsv) WHERE {LEXICAL_INDEX_PREDICATE}"
+    )
+
+
+def lexical_query_sql(alias: str = "r") -> str:
+    """Accepted, embedded reviews matching ``:text``, best ``ts_rank_cd``
+    first, at most ``:n`` rows of ``(id, rank)``. ``websearch_to_tsquery``
+    never raises on user input, unlike ``to_tsquery``."""
+    return f"""
+        SELECT {alias}.id, ts_rank_cd({alias}.search_tsv, tsq) AS rank
+        FROM review AS {alias}, websearch_to_tsquery('{TS_CONFIG}'::regconfig, :text) AS tsq
+        WHERE {alias}.{LEXICAL_INDEX_PREDICATE} AND {alias}.embedding IS NOT NULL AND {alias}.search_tsv @@ tsq
+        ORDER BY ts_rank_cd({alias}.search_tsv, tsq) DESC, {alias}.id
+        LIMIT :n
+    """
@@ -1,67 +1,288 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import math
+from typing import List, Optional, Sequence
 
-from sqlalchemy import text
+from sqlalchemy import text as sql_text
 from sqlmodel import Session
 
-from app.domain.rag.entities import RagHit
+from app.core.settings import get_settings
+from app.domain.rag.entities import AnnSearchParams, RagHit
 from app.domain.rag.interfaces import RagRepository
+from app.models.vector_types import embedding_type
+from app.infra.db.binary_index import first_stage_size, hamming_distance_sql
+from app.infra.db.lexical_index import lexical_query_sql
+from app.infra.db.vector_index import (
+    ANN_INDEX_PREDICATE,
+    ANN_INDEX_TYPES,
+    ann_search_scope,
+    distance_operator,
+    max_distance,
+    resolve_metric,
+    resolve_storage,
+    score_from_distance,
+    search_params,
+)
 
 
 __all__ = ["SqlModelRagRepository"]
 
 
 class SqlModelRagRepository(RagRepository):
-    def __init__(self, db: Session):
+    """pgvector k-NN over the Accepted reviews, using the ANN index, metric
+    and storage the deployment built (RAG_ANN_INDEX, RAG_ANN_METRIC)."""
+
+    def __init__(
+        self,
+        db: Session,
+        index_type: Optional[str] = None,
+        params: Optional[AnnSearchParams] = None,
+        metric: Optional[str] = None,
+        storage: Optional[str] = None,
+        binary_rescore: Optional[bool] = None,
+        binary_candidates: Optional[int] = None,
+    ):
+        settings = get_settings()
         self.db = db
+        self.index_type = (index_type or settings.ann_index).lower()
+        if self.index_type not in ANN_INDEX_TYPES:
+            raise ValueError(f"Unknown ANN index type {self.index_type!r}; expected one of {ANN_INDEX_TYPES}")
+        self.params = params or search_params()
+        self.metric = resolve_metric(metric)
+        self._op = distance_operator(self.metric)
+        # Query vectors are cast to the column type (RAG_EMBEDDING_STORAGE).
+        self.storage = resolve_storage(storage)
+        self.binary_rescore = settings.binary_rescore if binary_rescore is None else bool(binary_rescore)
+        self.binary_candidates = max(1, int(binary_candidates or settings.binary_candidates))
+        self.max_ef_search = settings.rag_max_ef_search
 
     def _format_vector_literal(self, emb: List[float]) -> str:
+        if self.metric == "ip":
+            # Inner product only equals the cosine for unit vectors.
+            norm = math.sqrt(sum(float(x) * float(x) for x in emb)) or 1.0
+            emb = [float(x) / norm for x in emb]
         return "[" + ",".join(f"{x:.6f}" for x in emb) + "]"
 
+    def _score(self, distance: str) -> str:
+        return score_from_distance(distance, self.metric)
+
+    @staticmethod
+    def _text_column(column: str, max_chars: Optional[int]) -> str:
+        return f"left({column}, :max_chars)" if max_chars is not None else column
+
+    def _nearest_sql(self, query: str, limit: str, columns: str) -> str:
+        """``columns`` of review ``r`` plus ``dist``, for the ``limit``
+        nearest Accepted rows to ``query``, closest first."""
+        distance = f"r.embedding {self._op} {query}"
+        if not self.binary_rescore:
+            return f"""
+                SELECT {columns}, {distance} AS dist
+                FROM review AS r
+                WHERE {ANN_INDEX_PREDICATE}
+                ORDER BY {distance} ASC
+                LIMIT {limit}
+            """
+        return f"""
+            SELECT {columns}, {distance} AS dist
+            FROM (
+                SELECT r.id, r.text, r.embedding
+                FROM review AS r
+                WHERE {ANN_INDEX_PREDICATE}
+                ORDER BY {hamming_distance_sql("r.embedding", query)} ASC
+                LIMIT :rescore_n
+            ) AS r
+            ORDER BY {distance} ASC
+            LIMIT {limit}
+        """
+
+    def _search_scope(self, search: AnnSearchParams, k: int):
+        if not self.binary_rescore:
+            return ann_search_scope(self.db, self.index_type, search, k=k)
+        # The first stage is always the HNSW bit index; ef_search must cover
+        # every candidate it hands to the rescoring stage, within the same cap.
+        n = self._rescore_n(k)
+        first_stage = AnnSearchParams(ef_search=first_stage_size(search.ef_search or n, n, self.max_ef_search))
+        return ann_search_scope(self.db, "hnsw", first_stage, k=n)
+
+    def _rescore_n(self, k: int) -> int:
+        return first_stage_size(self.binary_candidates, k, self.max_ef_search)
+
+    def _filter_binds(self, min_score: Optional[float], max_chars: Optional[int]) -> dict:
+        binds = {}
+        if min_score is not None:
+            binds["max_dist"] = max_distance(min_score, self.metric)
+        if max_chars is not None:
+            binds["max_chars"] = max(0, int(max_chars))
+        return binds
+
     def search_by_embedding(
         self,
         *,
         embedding: List[float],
         k: int = 5,
         min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
     ) -> List[RagHit]:
         k = max(1, int(k or 5))
 
         q_vec = self._format_vector_literal(embedding)
+        emb_col = "nn.embedding," if with_embeddings else ""
+        columns = "r.id, r.text, r.embedding" if with_embeddings else "r.id, r.text"
+        threshold = "WHERE nn.dist <= :max_dist" if min_score is not None else ""
 
-        sql = text(
+        sql = sql_text(
+            f"""
+            WITH nn AS MATERIALIZED (
+                {self._nearest_sql(f"CAST(:q AS {self.storage})", ":k", columns)}
+            )
+            SELECT
+                nn.id,
+                {self._text_column("nn.text", max_chars)} AS text,
+                {emb_col}
+                {self._score("nn.dist")} AS score
+            FROM nn
+            {threshold}
+            ORDER BY nn.dist ASC
             """
-            SET LOCAL ivfflat.probes = 15;
+        )
+        if with_embeddings:
+            # The pgvector type's result processor decodes each row into a float32 ndarray.
+            sql = sql.columns(embedding=embedding_type(self.storage))
+
+        binds = {"q": q_vec, "k": k, "rescore_n": self._rescore_n(k), **self._filter_binds(min_score, max_chars)}
+        with self._search_scope(self.params.merged(params), k):
+            rows = self.db.execute(sql, binds).all()
 
+        return [
+            RagHit(
+                id=row.id,
+                text=row.text,
+                score=float(row.score),
+                embedding=row.embedding if with_embeddings else None,
+            )
+            for row in rows
+        ]
+
+    def search_many_by_embedding(
+        self,
+        *,
+        embeddings: Sequence[List[float]],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[List[RagHit]]:
+        """All queries in one round trip: ``unnest`` the query vectors and run
+        the k-NN as a ``LATERAL`` subquery, which is an index scan per row."""
+        k = max(1, int(k or 5))
+        if not embeddings:
+            return []
+
+        vectors = "{" + ",".join(f'"{self._format_vector_literal(e)}"' for e in embeddings) + "}"
+        threshold = "WHERE hit.dist <= :max_dist" if min_score is not None else ""
+        sql = sql_text(
+            f"""
             SELECT
-                r.id,
-                r.text,
-                1 - (r.embedding <=> CAST(:q AS vector)) AS score
-            FROM review AS r
-            WHERE r.embedding IS NOT NULL
-            ORDER BY r.embedding <=> CAST(:q AS vector) ASC
-            LIMIT :k
+                q.ord,
+                hit.id,
+                {self._text_column("hit.text", max_chars)} AS text,
+                {self._score("hit.dist")} AS score
+            FROM unnest(CAST(:qs AS {self.storage}[])) WITH ORDINALITY AS q(vec, ord)
+            CROSS JOIN LATERAL (
+                {self._nearest_sql("q.vec", ":k", "r.id, r.text")}
+            ) AS hit
+            {threshold}
+            ORDER BY q.ord, hit.dist ASC
             """
         )
+        binds = {"qs": vectors, "k": k, "rescore_n": self._rescore_n(k), **self._filter_binds(min_score, max_chars)}
+        with self._search_scope(self.params.merged(params), k):
+            rows = self.db.execute(sql, binds).all()
 
-        rows = self.db.execute(sql, {"q": q_vec, "k": k}).all()
+        out: List[List[RagHit]] = [[] for _ in embeddings]
+        for row in rows:
+            out[row.ord - 1].append(RagHit(id=row.id, text=row.text, score=float(row.score)))
+        return out
 
-        hits = [RagHit(id=row.id, text=row.text, score=float(row.score)) for row in rows]
+    def search_hybrid(
+        self,
+        *,
+        text: str,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        settings = get_settings()
+        k = max(1, int(k or 5))
+        n = max(k, settings.hybrid_candidates)
 
+        emb_col = "r.embedding," if with_embeddings else ""
+        # Lexical matches are kept whatever their cosine.
+        threshold = ""
         if min_score is not None:
-            hits = [h for h in hits if h.score >= float(min_score)]
-
-        hits.sort(key=lambda h: h.score, reverse=True)
-        return hits
-
-    def ensure_ivfflat_cosine_index(self) -> None:
-        create_idx_sql = text(
-            """
-            CREATE INDEX IF NOT EXISTS review_embedding_cosine_idx
-            ON review
-            USING ivfflat (embedding vector_cosine_ops);
+            threshold = f"WHERE f.lexical OR r.embedding {self._op} CAST(:q AS {self.storage}) <= :max_dist"
+        sql = sql_text(
+            f"""
+            WITH vec AS (
+                SELECT id, row_number() OVER (ORDER BY dist, id) AS rnk
+                FROM (
+                    {self._nearest_sql(f"CAST(:q AS {self.storage})", ":n", "r.id")}
+                ) AS ann
+            ),
+            lex AS (
+                SELECT id, row_number() OVER (ORDER BY rank DESC, id) AS rnk
+                FROM ({lexical_query_sql("l")}) AS fts
+            ),
+            fused AS (
+                SELECT id, sum(1.0 / (:rrf_k + rnk)) AS rrf, bool_or(lexical) AS lexical
+                FROM (
+                    SELECT id, rnk, false AS lexical FROM vec
+                    UNION ALL
+                    SELECT id, rnk, true AS lexical FROM lex
+                ) AS ranked
+                GROUP BY id
+            )
+            SELECT
+                r.id,
+                {self._text_column("r.text", max_chars)} AS text,
+                {emb_col}
+                {self._score(f"r.embedding {self._op} CAST(:q AS {self.storage})")} AS score,
+                f.rrf
+            FROM fused AS f
+            JOIN review AS r ON r.id = f.id
+            {threshold}
+            ORDER BY f.rrf DESC, score DESC
+            LIMIT :k
             """
         )
-        self.db.exec(create_idx_sql)
-        self.db.commit()
+        if with_embeddings:
+            sql = sql.columns(embedding=embedding_type(self.storage))
+
+        search = self.params.merged(AnnSearchParams(probes=settings.hybrid_probes)).merged(params)
+        binds = {
+            "q": self._format_vector_literal(embedding),
+            "text": text,
+            "n": n,
+            "k": k,
+            "rrf_k": settings.rrf_k,
+            "rescore_n": self._rescore_n(n),
+            **self._filter_binds(min_score, max_chars),
+        }
+        with self._search_scope(search, n):
+            rows = self.db.execute(sql, binds).all()
+
+        return [
+            RagHit(
+                id=row.id,
+                text=row.text,
+                score=float(row.score),
+                embedding=row.embedding if with_embeddings else None,
+                fused_score=float(row.rrf),
+            )
+            for row in rows
+        ]
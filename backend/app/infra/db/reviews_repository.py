@@ -3,8 +3,10 @@ from datetime import datetime
 from sqlmodel import Session, select
 from sqlalchemy import func
 
+from app.core.settings import get_settings
 from app.domain.reviews.interfaces import ReviewRepository
 from app.domain.reviews.entities import ReviewEntity
+from app.infra.db.vector_index import check_unit_norm
 from app.models.review import Review as ReviewModel
 
 
@@ -43,6 +45,8 @@ class SqlModelReviewRepository(ReviewRepository):
         suggestion: Optional[str],
         embedding: Optional[List[float]] = None
     ) -> ReviewEntity:
+        if embedding is not None and get_settings().ann_metric == "ip":
+            check_unit_norm(embedding)
         row = ReviewModel(
             user_id=user_id,
             text=text,
@@ -0,0 +1,218 @@
+# app/infra/db/vector_index.py
+from __future__ import annotations
+
+import math
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.settings import get_settings
+from app.domain.rag.entities import AnnSearchParams
+
+
+__all__ = [
+    "ANN_INDEX_TYPES",
+    "ANN_METRICS",
+    "EMBEDDING_DIM",
+    "EMBEDDING_STORAGES",
+    "ANN_INDEX_PREDICATE",
+    "IVFFLAT_INDEX_NAME",
+    "HNSW_INDEX_NAME",
+    "ivfflat_index_sql",
+    "hnsw_index_sql",
+    "index_name_for",
+    "resolve_metric",
+    "resolve_storage",
+    "opclass_for",
+    "distance_operator",
+    "score_from_distance",
+    "max_distance",
+    "check_unit_norm",
+    "search_params",
+    "evaluation_search_params",
+    "ann_search_settings",
+    "ann_search_scope",
+]
+
+ANN_INDEX_TYPES = ("ivfflat", "hnsw")
+
+# "ip" ranks by negative inner product (<#>, vector_ip_ops). On unit vectors it
+# orders exactly like cosine distance but skips the per-comparison norms; every
+# stored and query embedding is encoded with normalize_embeddings=True.
+ANN_METRICS = ("cosine", "ip")
+_OPERATORS = {"cosine": "<=>", "ip": "<#>"}
+UNIT_NORM_TOLERANCE = 1e-3
+
+# Column type of review.embedding (RAG_EMBEDDING_STORAGE). "halfvec" stores
+# 16-bit floats (pgvector >= 0.7): half the heap and index size. Query vectors
+# are cast to the same type so the operators match the index opclass.
+EMBEDDING_DIM = 384
+EMBEDDING_STORAGES = ("vector", "halfvec")
+
+IVFFLAT_INDEX_NAME = "idx_review_embedding_ann"
+HNSW_INDEX_NAME = "idx_review_embedding_hnsw"
+
+# Only rows that can be served as examples are indexed. Queries must repeat
+# this predicate literally for the planner to pick the partial index.
+ANN_INDEX_PREDICATE = "status = 'Accepted' AND embedding IS NOT NULL"
+
+HNSW_M = int(os.getenv("RAG_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+
+
+def index_name_for(index_type: str) -> str:
+    if index_type not in ANN_INDEX_TYPES:
+        raise ValueError(f"Unknown ANN index type {index_type!r}; expected one of {ANN_INDEX_TYPES}")
+    return HNSW_INDEX_NAME if index_type == "hnsw" else IVFFLAT_INDEX_NAME
+
+
+def resolve_metric(metric: Optional[str] = None) -> str:
+    metric = (metric or get_settings().ann_metric).lower()
+    if metric not in ANN_METRICS:
+        raise ValueError(f"Unknown ANN metric {metric!r}; expected one of {ANN_METRICS}")
+    return metric
+
+
+def resolve_storage(storage: Optional[str] = None) -> str:
+    storage = (storage or get_settings().embedding_storage).lower()
+    if storage not in EMBEDDING_STORAGES:
+        raise ValueError(f"Unknown embedding storage {storage!r}; expected one of {EMBEDDING_STORAGES}")
+    return storage
+
+
+def opclass_for(metric: Optional[str] = None, storage: Optional[str] = None) -> str:
+    """``vector_cosine_ops``, ``vector_ip_ops``, ``halfvec_cosine_ops`` or ``halfvec_ip_ops``."""
+    return f"{resolve_storage(storage)}_{resolve_metric(metric)}_ops"
+
+
+def distance_operator(metric: Optional[str] = None) -> str:
+    return _OPERATORS[resolve_metric(metric)]
+
+
+def score_from_distance(distance: str, metric: Optional[str] = None) -> str:
+    """SQL for the cosine similarity behind ``distance``: ``1 - d`` for
+    ``<=>``, ``-d`` for ``<#>`` (the inner product of unit vectors)."""
+    return f"(1 - ({distance}))" if resolve_metric(metric) == "cosine" else f"(-({distance}))"
+
+
+def max_distance(min_score: float, metric: Optional[str] = None) -> float:
+    """Largest distance whose score still reaches ``min_score``."""
+    return 1.0 - float(min_score) if resolve_metric(metric) == "cosine" else -float(min_score)
+
+
+def check_unit_norm(embedding: Sequence[float], tolerance: float = UNIT_NORM_TOLERANCE) -> None:
+    """Inner-product scores are only cosines for unit vectors."""
+    norm = math.sqrt(sum(float(x) * float(x) for x in embedding))
+    if abs(norm - 1.0) > tolerance:
+        raise ValueError(f"Embedding norm is {norm:.4f}; RAG_ANN_METRIC=ip needs unit-norm vectors")
+
+
+def _where(predicate: Optional[str]) -> str:
+    return f"WHERE {predicate}" if predicate else ""
+
+
+def ivfflat_index_sql(
+    lists: int = 100,
+    *,
+    name: str = IVFFLAT_INDEX_NAME,
+    concurrently: bool = False,
+    where: Optional[str] = ANN_INDEX_PREDICATE,
+    metric: Optional[str] = None,
+    storage: Optional[str] = None,
+    column: str = "embedding",
+) -> str:
+    return f"""
+        CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name}
+        ON review
+        USING ivfflat ({column} {opclass_for(metric, storage)}) WITH (lists = {int(lists)})
+        {_where(where)}
+    """
+
+
+def hnsw_index_sql(
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    *,
+    name: str = HNSW_INDEX_NAME,
+    concurrently: bool = False,
+    where: Optional[str] = ANN_INDEX_PREDICATE,
+    metric: Optional[str] = None,
+    storage: Optional[str] = None,
+    column: str = "embedding",
+) -> str:
+    m = int(m or HNSW_M)
+    ef_construction = int(ef_construction or HNSW_EF_CONSTRUCTION)
+    if ef_construction < 2 * m:
+        raise ValueError(f"ef_construction ({ef_construction}) must be at least 2 * m ({2 * m})")
+    return f"""
+        CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name}
+        ON review
+        USING hnsw ({column} {opclass_for(metric, storage)}) WITH (m = {m}, ef_construction = {ef_construction})
+        {_where(where)}
+    """
+
+
+def search_params() -> AnnSearchParams:
+    """Deployment defaults, used as-is by ``/rag/search``."""
+    s = get_settings()
+    return AnnSearchParams(probes=s.rag_probes, ef_search=s.hnsw_ef_search, iterative_scan=s.iterative_scan)
+
+
+def evaluation_search_params() -> AnnSearchParams:
+    """Cheaper settings for the candidate retrieval behind review evaluation,
+    where MMR and the cross-encoder re-order the pool anyway."""
+    s = get_settings()
+    return AnnSearchParams(probes=s.eval_probes, ef_search=s.eval_ef_search, iterative_scan=s.eval_iterative_scan)
+
+
+def ann_search_settings(index_type: str, params: AnnSearchParams, k: int = 1) -> Dict[str, str]:
+    """pgvector GUCs for ``params`` on the given index type.
+
+    HNSW never returns more than ``ef_search`` rows, so it is raised to ``k``.
+    ivfflat only supports ``relaxed_order`` iterative scans.
+    """
+    index_name_for(index_type)
+    out: Dict[str, str] = {}
+    if index_type == "hnsw":
+        if params.ef_search is not None:
+            out["hnsw.ef_search"] = str(max(int(k), int(params.ef_search)))
+    elif params.probes is not None:
+        out["ivfflat.probes"] = str(max(1, int(params.probes)))
+
+    if params.iterative_scan is not None:
+        if index_type == "ivfflat" and params.iterative_scan == "strict_order":
+            raise ValueError("ivfflat iterative scans only support 'relaxed_order'")
+        out[f"{index_type}.iterative_scan"] = params.iterative_scan
+    return out
+
+
+@contextmanager
+def ann_search_scope(db: Session, index_type: str, params: AnnSearchParams, k: int = 1) -> Iterator[None]:
+    """Applies ``params`` with ``set_config(..., is_local => true)``, i.e.
+    ``SET LOCAL``, so they end with the transaction and never stick to a
+    pooled connection.
+
+    Without an open transaction one is started and committed around the
+    block; otherwise the settings last until the caller's transaction ends.
+    """
+    settings = ann_search_settings(index_type, params, k)
+    tx = None if db.in_transaction() else db.begin()
+    try:
+        if settings:
+            calls = ", ".join(f"set_config(:n{i}, :v{i}, true)" for i in range(len(settings)))
+            binds = {}
+            for i, (name, value) in enumerate(settings.items()):
+                binds[f"n{i}"] = name
+                binds[f"v{i}"] = value
+            db.execute(text(f"SELECT {calls}"), binds)
+        yield
+    except BaseException:
+        if tx is not None:
+            tx.rollback()
+        raise
+    else:
+        if tx is not None:
+            tx.commit()
@@ -0,0 +1,63 @@
+# app/infra/embeddings/cached.py
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.result_cache import ResultCache, cache_key
+from app.domain.rag.interfaces import BatchEmbedder, Embedder
+
+
+__all__ = ["CachedEmbedder"]
+
+
+class CachedEmbedder(Embedder):
+    """Serves repeated texts from a ``ResultCache`` of float32 vectors.
+
+    ``namespace`` must distinguish anything that changes the vector for the
+    same text (model name, query/passage prefix).
+    """
+
+    def __init__(self, inner: BatchEmbedder, cache: ResultCache, namespace: str) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.namespace = namespace
+
+    def _key(self, text: str) -> str:
+        return cache_key("embed", self.namespace, text)
+
+    def embed(self, text: str) -> List[float]:
+        t = (text or "").strip()
+        if not t:
+            return []
+        key = self._key(t)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return np.frombuffer(hit, dtype=np.float32).tolist()
+
+        emb = self.inner.embed(t)
+        if emb:
+            self.cache.set(key, np.asarray(emb, dtype=np.float32).tobytes())
+        return emb
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        out: List[List[float]] = [[] for _ in texts]
+        missing: Dict[int, str] = {}
+        for i, text in enumerate(texts):
+            t = (text or "").strip()
+            if not t:
+                continue
+            hit = self.cache.get(self._key(t))
+            if hit is not None:
+                out[i] = np.frombuffer(hit, dtype=np.float32).tolist()
+            else:
+                missing[i] = t
+
+        if missing:
+            computed = self.inner.embed_many(list(missing.values()))
+            for (i, t), emb in zip(missing.items(), computed):
+                out[i] = emb
+                if emb:
+                    self.cache.set(self._key(t), np.asarray(emb, dtype=np.float32).tobytes())
+        return out
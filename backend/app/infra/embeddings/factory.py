@@ -0,0 +1,16 @@
+# app/infra/embeddings/factory.py
+from __future__ import annotations
+
+from app.domain.rag.interfaces import BatchEmbedder
+
+
+__all__ = ["build_local_embedder"]
+
+
+def build_local_embedder(prefix: str, backend: str = "torch") -> BatchEmbedder:
+    if backend == "onnx":
+        from app.infra.embeddings.onnx_embedder import OnnxSentenceEmbedder  # lazy import
+        return OnnxSentenceEmbedder(query_prefix=prefix)
+
+    from app.infra.embeddings.local_sentence_transformer import LocalSentenceTransformerEmbedder
+    return LocalSentenceTransformerEmbedder(query_prefix=prefix)
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 import os
-import threading
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
+from app.core.model_registry import get_model_registry
 from app.domain.rag.interfaces import Embedder
 
 try:
@@ -17,9 +17,6 @@ __all__ = ["LocalSentenceTransformerEmbedder"]
 
 
 class LocalSentenceTransformerEmbedder(Embedder):
-    _model_lock = threading.Lock()
-    _model: Optional["SentenceTransformer"] = None
-
     def __init__(
         self,
         model_name: Optional[str] = None,
@@ -49,26 +46,44 @@ class LocalSentenceTransformerEmbedder(Embedder):
             "RAG_E5_QUERY_PREFIX", "query: "
         )
 
-        if self.__class__._model is None:
-            with self.__class__._model_lock:
-                if self.__class__._model is None:
-                    self.__class__._model = SentenceTransformer(self.model_name, device=self.device)
-
-        self._m = self.__class__._model
-
-    def embed(self, text: str) -> List[float]:
-        t = (text or "").strip()
-        if not t:
-            return []
+        # Load eagerly so a missing model fails at startup, not on first request.
+        get_model_registry().sentence_transformer(self.model_name, device=self.device)
 
-        q = f"{self.query_prefix}{t}" if self.query_prefix else t
+    @property
+    def _m(self) -> "SentenceTransformer":
+        return get_model_registry().sentence_transformer(self.model_name, device=self.device)
 
-        vec = self._m.encode(q, normalize_embeddings=True)  # np.ndarray
-        emb = [float(x) for x in vec.tolist()]
+    def _prefixed(self, text: str) -> str:
+        return f"{self.query_prefix}{text}" if self.query_prefix else text
 
+    def _check_dim(self, emb: List[float]) -> List[float]:
         if self.expected_dim is not None and len(emb) != self.expected_dim:
             raise RuntimeError(
                 f"Embedding dimension mismatch: expected {self.expected_dim}, got {len(emb)} "
                 f"(model={self.model_name})"
             )
         return emb
+
+    def embed(self, text: str) -> List[float]:
+        t = (text or "").strip()
+        if not t:
+            return []
+
+        vec = self._m.encode(self._prefixed(t), normalize_embeddings=True)  # np.ndarray
+        return self._check_dim([float(x) for x in vec.tolist()])
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        stripped = [(t or "").strip() for t in texts]
+        idx = [i for i, t in enumerate(stripped) if t]
+        out: List[List[float]] = [[] for _ in stripped]
+        if not idx:
+            return out
+
+        mat = self._m.encode(
+            [self._prefixed(stripped[i]) for i in idx],
+            batch_size=batch_size or max(1, len(idx)),
+            normalize_embeddings=True,
+        )  # (n, D) np.ndarray
+        for i, vec in zip(idx, mat):
+            out[i] = self._check_dim([float(x) for x in vec.tolist()])
+        return out
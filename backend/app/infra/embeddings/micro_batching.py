@@ -0,0 +1,43 @@
+# app/infra/embeddings/micro_batching.py
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+from app.core.batching import BatchingStats, MicroBatcher
+from app.core.settings import get_settings
+from app.domain.rag.interfaces import BatchEmbedder, Embedder
+
+
+__all__ = ["MicroBatchingEmbedder", "BatchingStats"]
+
+
+class MicroBatchingEmbedder(Embedder):
+    """Coalesces concurrent ``embed`` calls into one ``embed_many`` pass."""
+
+    def __init__(
+        self,
+        inner: BatchEmbedder,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self.inner = inner
+        wait = max_wait_ms if max_wait_ms is not None else settings.embed_max_wait_ms
+        self._batcher: MicroBatcher[str, List[float]] = MicroBatcher(
+            inner.embed_many,
+            max_batch_size=max_batch_size or settings.embed_max_batch,
+            max_wait_s=wait / 1000.0,
+            name="embed-batcher",
+        )
+
+    def embed(self, text: str) -> List[float]:
+        t = (text or "").strip()
+        if not t:
+            return []
+        return self._batcher.submit(t)
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.inner.embed_many(texts)
+
+    def stats(self) -> BatchingStats:
+        return self._batcher.stats()
@@ -0,0 +1,233 @@
+# app/infra/embeddings/onnx_embedder.py
+from __future__ import annotations
+
+import fcntl
+import inspect
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.model_registry import get_model_registry
+from app.domain.rag.interfaces import BatchEmbedder, Embedder
+
+try:
+    import onnxruntime as ort
+except Exception:
+    ort = None  # type: ignore
+
+
+__all__ = ["OnnxSentenceEmbedder", "export_onnx_model", "cosine_parity"]
+
+_MODEL_FILE = "model.onnx"
+_QUANTIZED_FILE = "model.int8.onnx"
+
+
+def _default_onnx_dir(model_name: str) -> Path:
+    root = os.getenv("RAG_ONNX_DIR") or os.path.join(
+        os.getenv("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "onnx"
+    )
+    return Path(root) / model_name.replace("/", "__")
+
+
+@contextmanager
+def _export_lock(out_dir: Path) -> Iterator[None]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / ".export.lock", "a+") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _staging_path(final: Path) -> Path:
+    # Same directory, so os.replace is atomic; keeps the .onnx suffix.
+    return final.with_name(f".{os.getpid()}.{final.name}")
+
+
+def _export_fp32(model_name: str, out_dir: Path, fp32_path: Path) -> None:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    from app.core.model_snapshots import resolve_model
+
+    snapshot = resolve_model(model_name)
+    source = snapshot.path if snapshot is not None else model_name
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    model = AutoModel.from_pretrained(source)
+    model.eval()
+
+    sample = tokenizer(["query: sample"], return_tensors="pt")
+    # ONNX input names are bound positionally, so follow forward()'s order.
+    params = list(inspect.signature(model.forward).parameters)
+    input_names = sorted(sample.keys(), key=params.index)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    # The tokenizer goes first: readers take the model file as the signal
+    # that the export is complete.
+    tokenizer.save_pretrained(str(out_dir))
+    staging = _staging_path(fp32_path)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(staging),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+    os.replace(staging, fp32_path)
+
+
+def export_onnx_model(model_name: str, out_dir: Path, quantize: bool = False) -> Path:
+    """Exports a HF encoder to ONNX (plus an int8 copy when ``quantize``) and
+    saves its tokenizer next to it. Returns the path of the model to load.
+
+    Workers starting together export once: the export runs under a file lock
+    and each model is written under a temporary name, then renamed."""
+    fp32_path = out_dir / _MODEL_FILE
+    int8_path = out_dir / _QUANTIZED_FILE
+    target = int8_path if quantize else fp32_path
+    if target.exists():
+        return target
+
+    with _export_lock(out_dir):
+        # Another worker may have finished while this one waited.
+        if not fp32_path.exists():
+            _export_fp32(model_name, out_dir, fp32_path)
+        if quantize and not int8_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            staging = _staging_path(int8_path)
+            quantize_dynamic(str(fp32_path), str(staging), weight_type=QuantType.QInt8)
+            os.replace(staging, int8_path)
+    return target
+
+
+def cosine_parity(
+    reference: BatchEmbedder,
+    candidate: BatchEmbedder,
+    texts: Sequence[str],
+) -> List[float]:
+    """Per-text cosine similarity between two embedders' vectors."""
+    ref = np.asarray(reference.embed_many(texts), dtype=np.float32)
+    cand = np.asarray(candidate.embed_many(texts), dtype=np.float32)
+    num = np.sum(ref * cand, axis=1)
+    den = np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1) + 1e-8
+    return (num / den).tolist()
+
+
+class OnnxSentenceEmbedder(Embedder):
+    """Runs the e5 encoder through onnxruntime with mean pooling, matching
+    ``SentenceTransformer.encode(..., normalize_embeddings=True)``."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        expected_dim: Optional[int] = None,
+        query_prefix: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        onnx_dir: Optional[str] = None,
+        max_length: int = 512,
+    ) -> None:
+        if ort is None:
+            raise RuntimeError(
+                "onnxruntime is not installed. "
+                "Install the onnx extra (uv sync --extra onnx) or set RAG_EMBEDDING_BACKEND=torch."
+            )
+
+        self.model_name = model_name or os.getenv(
+            "EMBEDDINGS_MODEL_NAME",
+            "intfloat/multilingual-e5-small",
+        )
+        self.expected_dim = expected_dim
+        if self.expected_dim is None:
+            try:
+                self.expected_dim = int(os.getenv("RAG_EXPECTED_DIM", "").strip() or 0) or None
+            except Exception:
+                self.expected_dim = None
+
+        self.query_prefix = query_prefix if query_prefix is not None else os.getenv(
+            "RAG_E5_QUERY_PREFIX", "query: "
+        )
+        if quantize is None:
+            quantize = os.getenv("RAG_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+        self.quantize = quantize
+        self.max_length = max_length
+
+        self.onnx_dir = Path(onnx_dir) if onnx_dir else _default_onnx_dir(self.model_name)
+        self.backend = "onnx-int8" if self.quantize else "onnx"
+        self._handle()
+
+    def _handle(self) -> tuple:
+        return get_model_registry().get(
+            self.model_name,
+            backend=self.backend,
+            device="cpu",
+            loader=lambda: self._load(self.onnx_dir),
+        )
+
+    def _load(self, out_dir: Path) -> tuple:
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx_model(self.model_name, out_dir, quantize=self.quantize)
+        opts = ort.SessionOptions()
+        threads = int(os.getenv("RAG_ONNX_THREADS", "0"))
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        session = ort.InferenceSession(str(model_path), opts, providers=["CPUExecutionProvider"])
+        tokenizer = AutoTokenizer.from_pretrained(str(out_dir))
+        input_names = {i.name for i in session.get_inputs()}
+        return session, tokenizer, input_names
+
+    def _prefixed(self, text: str) -> str:
+        return f"{self.query_prefix}{text}" if self.query_prefix else text
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        session, tokenizer, input_names = self._handle()
+        enc = tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in input_names}
+        hidden = session.run(None, feeds)[0]  # (n, seq, D)
+
+        mask = enc["attention_mask"].astype(np.float32)[:, :, None]
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def _check_dim(self, emb: List[float]) -> List[float]:
+        if self.expected_dim is not None and len(emb) != self.expected_dim:
+            raise RuntimeError(
+                f"Embedding dimension mismatch: expected {self.expected_dim}, got {len(emb)} "
+                f"(model={self.model_name})"
+            )
+        return emb
+
+    def embed(self, text: str) -> List[float]:
+        t = (text or "").strip()
+        if not t:
+            return []
+        vec = self._encode([self._prefixed(t)])[0]
+        return self._check_dim([float(x) for x in vec.tolist()])
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        stripped = [(t or "").strip() for t in texts]
+        idx = [i for i, t in enumerate(stripped) if t]
+        out: List[List[float]] = [[] for _ in stripped]
+        if not idx:
+            return out
+
+        mat = self._encode([self._prefixed(stripped[i]) for i in idx])
+        for i, vec in zip(idx, mat):
+            out[i] = self._check_dim([float(x) for x in vec.tolist()])
+        return out
@@ -0,0 +1,143 @@
+# app/infra/inference/client.py
+from __future__ import annotations
+
+import os
+import queue
+from functools import lru_cache
+from multiprocessing.connection import Client, Connection
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.settings import get_settings
+from app.domain.rag.interfaces import Embedder
+
+
+__all__ = [
+    "InferenceClient",
+    "InferenceError",
+    "InferenceTimeout",
+    "RemoteEmbedder",
+    "RemoteSentimentAnalyzer",
+    "RemoteCrossEncoder",
+    "get_inference_client",
+    "default_authkey",
+]
+
+
+class InferenceError(RuntimeError):
+    pass
+
+
+class InferenceTimeout(InferenceError, TimeoutError):
+    pass
+
+
+def default_authkey() -> bytes:
+    """INFERENCE_AUTHKEY as bytes. Connections exchange pickles, so there is
+    no built-in fallback: a missing key is a configuration error."""
+    key = get_settings().inference_authkey
+    if not key:
+        raise RuntimeError("INFERENCE_AUTHKEY must be set to a random secret shared by the server and API workers")
+    return key.encode("utf-8")
+
+
+class InferenceClient:
+    """Thread-safe client for ``InferenceServer``.
+
+    ``Connection`` objects are not safe to share between threads, so each call
+    borrows one from a small pool and returns it afterwards. A reply that
+    takes longer than ``timeout`` seconds (INFERENCE_TIMEOUT_SECONDS) raises
+    ``InferenceTimeout`` and the connection is dropped, since a late reply
+    would otherwise be read by the next call.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        authkey: Optional[bytes] = None,
+        pool_size: int = 8,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self.authkey = authkey or default_authkey()
+        self.timeout = get_settings().inference_timeout_seconds if timeout is None else float(timeout)
+        self._pool: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=max(1, pool_size))
+
+    def _connect(self) -> Connection:
+        return Client(self.socket_path, family="AF_UNIX", authkey=self.authkey)
+
+    def call(self, op: str, **payload: Any) -> Any:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            conn.send((op, payload))
+            if not conn.poll(self.timeout):
+                conn.close()
+                raise InferenceTimeout(f"Inference server gave no reply to {op!r} within {self.timeout:g}s")
+            status, result = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            raise
+
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+        if status != "ok":
+            raise InferenceError(result)
+        return result
+
+
+class RemoteEmbedder(Embedder):
+    def __init__(self, client: InferenceClient, query_prefix: str, model_name: Optional[str] = None) -> None:
+        self.client = client
+        self.query_prefix = query_prefix
+        self.model_name = model_name or os.getenv("EMBEDDINGS_MODEL_NAME", "intfloat/multilingual-e5-small")
+
+    def embed(self, text: str) -> List[float]:
+        t = (text or "").strip()
+        if not t:
+            return []
+        return self.client.call("embed", prefix=self.query_prefix, text=t)
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.client.call("embed_many", prefix=self.query_prefix, texts=list(texts))
+
+
+class RemoteSentimentAnalyzer:
+    def __init__(self, client: InferenceClient) -> None:
+        self.client = client
+
+    def analyze(self, text: str) -> Tuple[str, float]:
+        return self.client.call("sentiment", text=text)
+
+    def analyze_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        return self.client.call("sentiment_batch", texts=list(texts))
+
+
+class RemoteCrossEncoder:
+    """Stands in for ``CrossEncoder`` so ``services.reranker`` keeps its
+    batching, caching and top-k logic in the API worker."""
+
+    def __init__(self, client: InferenceClient, model_name: str) -> None:
+        self.client = client
+        self.model_name = model_name
+
+    def predict(self, pairs, batch_size: int = 32, show_progress_bar: Optional[bool] = None) -> np.ndarray:
+        return self.client.call(
+            "rerank",
+            model_name=self.model_name,
+            pairs=[(q, d) for q, d in pairs],
+            batch_size=batch_size,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_inference_client() -> Optional[InferenceClient]:
+    socket_path = get_settings().inference_socket
+    return InferenceClient(socket_path) if socket_path else None
@@ -0,0 +1,219 @@
+# app/infra/inference/server.py
+"""Single process that owns the models and serves every API worker.
+
+    INFERENCE_AUTHKEY=... uv run python -m app.infra.inference.server --socket /run/review-analyzer/inference.sock
+
+API workers started with INFERENCE_SOCKET pointing at the same path use the
+thin clients in ``app.infra.inference.client`` instead of loading models.
+Messages are pickles, so the socket lives in a directory only the server's
+user can enter (created 0700 if missing) with the socket itself at 0600, and
+every connection must present INFERENCE_AUTHKEY.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import threading
+from multiprocessing.connection import Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.batching import MicroBatcher
+from app.core.clients import SENTIMENT_MODEL_NAME
+from app.core.model_registry import get_model_registry
+from app.core.settings import get_settings
+from app.domain.rag.interfaces import BatchEmbedder
+from app.infra.embeddings.factory import build_local_embedder
+from app.infra.inference.client import default_authkey
+from app.services.sentiment_analysis_service import SentimentAnalysisService
+
+
+__all__ = ["InferenceServer", "default_authkey"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/review-analyzer-inference/inference.sock"
+
+
+def _private_socket_dir(socket_path: str) -> None:
+    """Creates the socket's directory 0700, or checks that an existing one is
+    owned by this user and closed to everyone else."""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(
+            f"Inference socket directory {directory} must be owned by this user with mode 0700 "
+            f"(found uid={st.st_uid}, mode={oct(st.st_mode & 0o777)})"
+        )
+
+
+class InferenceServer:
+    """Serves ``embed``, ``sentiment`` and ``rerank`` requests over a Unix socket.
+
+    Each connection is handled on its own thread; embedding, sentiment and
+    rerank requests from all connections go through shared ``MicroBatcher``
+    queues, so concurrent API workers end up in the same forward pass.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        *,
+        authkey: Optional[bytes] = None,
+        embedder_factory: Callable[[str], BatchEmbedder] = build_local_embedder,
+        sentiment_batch_fn: Callable[[List[str]], List[Tuple[str, float]]] = SentimentAnalysisService.analyze_batch,
+        cross_encoder_factory: Callable[[str], Any] = lambda name: get_model_registry().cross_encoder(name),
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self.socket_path = socket_path
+        self.authkey = authkey or default_authkey()
+        self.embedder_factory = embedder_factory
+        self.cross_encoder_factory = cross_encoder_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+
+        self._embedders: Dict[str, BatchEmbedder] = {}
+        self._embed_batchers: Dict[str, MicroBatcher[str, List[float]]] = {}
+        self._rerank_batchers: Dict[str, MicroBatcher[Tuple[List[Tuple[str, str]], int], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._sentiment = MicroBatcher(
+            sentiment_batch_fn,
+            max_batch_size=max_batch_size,
+            max_wait_s=self.max_wait_s,
+            name="inference-sentiment",
+        )
+        self._listener: Optional[Listener] = None
+        self._closed = threading.Event()
+
+    def _embedder(self, prefix: str) -> Tuple[BatchEmbedder, MicroBatcher]:
+        with self._lock:
+            if prefix not in self._embedders:
+                embedder = self.embedder_factory(prefix)
+                self._embedders[prefix] = embedder
+                self._embed_batchers[prefix] = MicroBatcher(
+                    embedder.embed_many,
+                    max_batch_size=self.max_batch_size,
+                    max_wait_s=self.max_wait_s,
+                    name=f"inference-embed[{prefix.strip()}]",
+                )
+            return self._embedders[prefix], self._embed_batchers[prefix]
+
+    def _reranker(self, model_name: str) -> MicroBatcher:
+        with self._lock:
+            if model_name not in self._rerank_batchers:
+                ce = self.cross_encoder_factory(model_name)
+
+                def predict(requests: List[Tuple[List[Tuple[str, str]], int]]) -> List[np.ndarray]:
+                    # One predict over every request's pairs, split back per request.
+                    pairs = [pair for request_pairs, _ in requests for pair in request_pairs]
+                    batch_size = max(size for _, size in requests)
+                    scores = np.asarray(
+                        ce.predict(pairs, batch_size=batch_size, show_progress_bar=False), dtype=np.float32
+                    ).reshape(-1)
+                    bounds = np.cumsum([len(request_pairs) for request_pairs, _ in requests])[:-1]
+                    return np.split(scores, bounds)
+
+                self._rerank_batchers[model_name] = MicroBatcher(
+                    predict,
+                    max_batch_size=self.max_batch_size,
+                    max_wait_s=self.max_wait_s,
+                    name=f"inference-rerank[{model_name}]",
+                )
+            return self._rerank_batchers[model_name]
+
+    def handle(self, op: str, payload: Dict[str, Any]) -> Any:
+        if op == "ping":
+            return "pong"
+        if op == "embed":
+            _, batcher = self._embedder(payload["prefix"])
+            return batcher.submit(payload["text"])
+        if op == "embed_many":
+            embedder, _ = self._embedder(payload["prefix"])
+            return embedder.embed_many(payload["texts"])
+        if op == "sentiment":
+            return self._sentiment.submit(payload["text"])
+        if op == "sentiment_batch":
+            return self._sentiment.batch_fn(list(payload["texts"]))
+        if op == "rerank":
+            pairs = [tuple(pair) for pair in payload["pairs"]]
+            if not pairs:
+                return np.empty(0, dtype=np.float32)
+            batcher = self._reranker(payload["model_name"])
+            return batcher.submit((pairs, int(payload.get("batch_size") or 32)))
+        raise ValueError(f"Unknown inference op {op!r}")
+
+    def _serve_connection(self, conn: Connection) -> None:
+        with conn:
+            while not self._closed.is_set():
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(("ok", self.handle(op, payload)))
+                except Exception as exc:
+                    logger.warning("Inference request %s failed", op, exc_info=True)
+                    conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+    def serve_forever(self) -> None:
+        _private_socket_dir(self.socket_path)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = Listener(self.socket_path, family="AF_UNIX", authkey=self.authkey)
+        os.chmod(self.socket_path, 0o600)
+        logger.info("Inference server listening", extra={"inference_socket": self.socket_path})
+        try:
+            while not self._closed.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError):
+                    if self._closed.is_set():
+                        break
+                    logger.warning("Inference server failed to accept a connection", exc_info=True)
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the shared model inference server.")
+    parser.add_argument("--socket", default=os.getenv("INFERENCE_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--max-batch", type=int, default=int(os.getenv("INFERENCE_MAX_BATCH", "32")))
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("INFERENCE_MAX_WAIT_MS", "5")))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    server = InferenceServer(
+        args.socket,
+        embedder_factory=lambda prefix: build_local_embedder(prefix, settings.embedding_backend),
+        max_batch_size=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+
+    # Load everything up front so the first request is not a cold start.
+    server._embedder("query: ")
+    server._embedder("passage: ")
+    get_model_registry().sentiment_pipeline(SENTIMENT_MODEL_NAME)
+    for name in settings.reranker_preload:
+        server._reranker(name)
+
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# app/infra/vector/indexing.py
+from __future__ import annotations
+
+import logging
+from typing import Any, List, Optional, Protocol, Sequence
+
+from app.domain.reviews.entities import ReviewEntity
+
+
+__all__ = ["CorpusListener", "IndexingReviewRepository", "IndexingAdminRepository"]
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusListener(Protocol):
+    """Anything that follows the Accepted corpus: the in-process vector
+    indexes and the retrieval cache."""
+
+    def upsert(self, review_id: int, embedding: Sequence[float], text: Optional[str] = None) -> None:
+        ...
+
+    def remove(self, review_id: int) -> bool:
+        ...
+
+
+def _notify(action: str, call: Any, review_id: int, *args: Any, **kwargs: Any) -> None:
+    # The database write is already committed; a listener failure must not
+    # turn it into an error response. The next sync catches the index up.
+    try:
+        call(review_id, *args, **kwargs)
+    except Exception:
+        logger.warning("Corpus listener %s failed for review %s", action, review_id, exc_info=True)
+
+
+class IndexingReviewRepository:
+    """Keeps a ``CorpusListener`` in step with reviews created or deleted
+    through the wrapped repository; everything else is delegated. Listener
+    errors are logged, never raised."""
+
+    def __init__(self, inner: Any, index: CorpusListener) -> None:
+        self.inner = inner
+        self.index = index
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def create_approved(self, *, embedding: Optional[List[float]] = None, **fields: Any) -> ReviewEntity:
+        entity = self.inner.create_approved(embedding=embedding, **fields)
+        if embedding and entity.id is not None and entity.status == "Accepted":
+            _notify("upsert", self.index.upsert, entity.id, embedding, text=entity.text)
+        return entity
+
+    def delete(self, review_id: int) -> bool:
+        deleted = self.inner.delete(review_id)
+        if deleted:
+            _notify("remove", self.index.remove, review_id)
+        return deleted
+
+
+class IndexingAdminRepository:
+    def __init__(self, inner: Any, index: CorpusListener) -> None:
+        self.inner = inner
+        self.index = index
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def delete_review(self, review_id: int) -> bool:
+        deleted = self.inner.delete_review(review_id)
+        if deleted:
+            _notify("remove", self.index.remove, review_id)
+        return deleted
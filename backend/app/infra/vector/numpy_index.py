@@ -0,0 +1,353 @@
+# app/infra/vector/numpy_index.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text as sql_text
+from sqlmodel import Session, select
+
+from app.core.settings import get_settings
+from app.domain.rag.entities import AnnSearchParams, RagHit
+from app.domain.rag.fusion import reciprocal_rank_fusion
+from app.domain.rag.interfaces import RagRepository
+from app.infra.db.lexical_index import lexical_query_sql
+from app.infra.db.vector_index import ANN_INDEX_PREDICATE
+from app.models.review import Review
+
+
+__all__ = ["TextCache", "NumpyVectorIndex", "NumpyRagRepository", "sync_index", "get_numpy_index"]
+
+_LOAD_CHUNK = 5000
+
+
+class TextCache:
+    """Thread-safe LRU of review texts, bounded at ``max_size`` entries."""
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self.max_size = max_size
+        self._texts: "OrderedDict[int, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, review_id: int, text: str) -> None:
+        with self._lock:
+            self._texts[int(review_id)] = text
+            self._texts.move_to_end(int(review_id))
+            while len(self._texts) > self.max_size:
+                self._texts.popitem(last=False)
+
+    def get(self, review_id: int) -> Optional[str]:
+        with self._lock:
+            text = self._texts.get(int(review_id))
+            if text is not None:
+                self._texts.move_to_end(int(review_id))
+            return text
+
+    def pop(self, review_id: int) -> None:
+        with self._lock:
+            self._texts.pop(int(review_id), None)
+
+
+class NumpyVectorIndex:
+    """Accepted-review embeddings as one contiguous, L2-normalized float32
+    matrix; row ``i`` belongs to ``ids[i]``.
+
+    Search is an exact matmul plus ``argpartition``. Removal moves the last
+    row into the freed slot so the live rows stay contiguous. Review texts are
+    cached on first use, up to ``max_texts`` entries.
+    """
+
+    def __init__(self, dim: int = 384, initial_capacity: int = 1024, max_texts: int = 100_000) -> None:
+        self.dim = dim
+        self._vecs = np.zeros((max(1, initial_capacity), dim), dtype=np.float32)
+        self._ids = np.zeros(max(1, initial_capacity), dtype=np.int64)
+        self._row: Dict[int, int] = {}
+        self._size = 0
+        self._texts = TextCache(max_texts)
+        self._lock = threading.RLock()
+        # Held by NumpyRagRepository around the staleness check and sync.
+        self.sync_lock = threading.Lock()
+        self.synced_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, review_id: int) -> bool:
+        return int(review_id) in self._row
+
+    def _normalized(self, vectors: np.ndarray) -> np.ndarray:
+        mat = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        return mat / np.clip(norms, 1e-12, None)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._ids):
+            return
+        capacity = max(needed, 2 * len(self._ids))
+        vecs = np.zeros((capacity, self.dim), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        vecs[: self._size] = self._vecs[: self._size]
+        ids[: self._size] = self._ids[: self._size]
+        self._vecs, self._ids = vecs, ids
+
+    def upsert_many(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        if len(ids) == 0:
+            return
+        mat = self._normalized(vectors)
+        with self._lock:
+            self._reserve(len(ids))
+            for review_id, vec in zip(ids, mat):
+                review_id = int(review_id)
+                row = self._row.get(review_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row[review_id] = row
+                    self._ids[row] = review_id
+                self._vecs[row] = vec
+
+    def upsert(self, review_id: int, embedding: Sequence[float], text: Optional[str] = None) -> None:
+        self.upsert_many([review_id], np.asarray(embedding, dtype=np.float32))
+        if text is not None:
+            self.remember_text(review_id, text)
+
+    def remove(self, review_id: int) -> bool:
+        review_id = int(review_id)
+        with self._lock:
+            row = self._row.pop(review_id, None)
+            self._texts.pop(review_id)
+            if row is None:
+                return False
+            last = self._size - 1
+            if row != last:
+                moved = int(self._ids[last])
+                self._vecs[row] = self._vecs[last]
+                self._ids[row] = moved
+                self._row[moved] = row
+            self._size = last
+            return True
+
+    def ids(self) -> np.ndarray:
+        with self._lock:
+            return self._ids[: self._size].copy()
+
+    def vector(self, review_id: int) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._row.get(int(review_id))
+            return None if row is None else self._vecs[row].copy()
+
+    def search(self, query: Sequence[float], k: int, min_score: Optional[float] = None) -> List[Tuple[int, float]]:
+        q = self._normalized(np.asarray(query, dtype=np.float32))[0]
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return []
+            scores = self._vecs[:n] @ q
+            candidates = np.flatnonzero(scores >= min_score) if min_score is not None else np.arange(n)
+            if candidates.size == 0:
+                return []
+            k = min(int(k), candidates.size)
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(int(self._ids[i]), float(scores[i])) for i in top]
+
+    def sync(self, db: Session) -> None:
+        sync_index(db, self)
+
+    def remember_text(self, review_id: int, text: str) -> None:
+        self._texts.put(review_id, text)
+
+    def cached_text(self, review_id: int) -> Optional[str]:
+        return self._texts.get(review_id)
+
+
+def _load_embeddings(db: Session, ids: Optional[Iterable[int]] = None) -> Tuple[List[int], np.ndarray]:
+    stmt = select(Review.id, Review.embedding).where(sql_text(ANN_INDEX_PREDICATE))
+    if ids is not None:
+        stmt = stmt.where(Review.id.in_(list(ids)))
+    loaded_ids: List[int] = []
+    chunks: List[np.ndarray] = []
+    for rows in db.exec(stmt.execution_options(yield_per=_LOAD_CHUNK)).partitions():
+        loaded_ids.extend(int(r[0]) for r in rows)
+        chunks.append(np.asarray([r[1] for r in rows], dtype=np.float32))
+    if not chunks:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return loaded_ids, np.concatenate(chunks)
+
+
+def sync_index(db: Session, index: NumpyVectorIndex) -> Tuple[int, int]:
+    """Brings ``index`` in line with the Accepted reviews in the database,
+    fetching embeddings only for ids it does not have yet. Returns
+    ``(added, removed)``."""
+    if len(index) == 0:
+        new_ids, vectors = _load_embeddings(db)
+        index.upsert_many(new_ids, vectors)
+        index.synced_at = time.monotonic()
+        return len(new_ids), 0
+
+    current = {int(i) for i in db.exec(select(Review.id).where(sql_text(ANN_INDEX_PREDICATE))).all()}
+    known = set(index.ids().tolist())
+
+    removed = 0
+    for review_id in known - current:
+        removed += index.remove(review_id)
+
+    new_ids, vectors = _load_embeddings(db, current - known) if current - known else ([], None)
+    index.upsert_many(new_ids, vectors)
+    index.synced_at = time.monotonic()
+    return len(new_ids), removed
+
+
+class NumpyRagRepository(RagRepository):
+    """Exact k-NN over an in-process ``NumpyVectorIndex`` (or the shared
+    ``MemmapVectorIndex``, which has the same interface).
+
+    The index is synced from the database on first use and again once it is
+    older than ``refresh_seconds``, which picks up writes made by other
+    workers. Texts are fetched only for returned hits that are not cached.
+    ``params`` is accepted for interface parity; an exact scan has no knobs.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        index: Optional[NumpyVectorIndex] = None,
+        refresh_seconds: Optional[float] = None,
+    ) -> None:
+        self.db = db
+        self.index = index if index is not None else get_numpy_index()
+        self.refresh_seconds = (
+            get_settings().numpy_refresh_seconds if refresh_seconds is None else refresh_seconds
+        )
+
+    def _stale(self) -> bool:
+        synced_at = self.index.synced_at
+        return synced_at is None or (self.refresh_seconds > 0 and time.monotonic() - synced_at > self.refresh_seconds)
+
+    def _ensure_fresh(self) -> None:
+        # Double-checked so concurrent requests wait for one sync instead of
+        # each running their own against the shared index.
+        if not self._stale():
+            return
+        with self.index.sync_lock:
+            if self._stale():
+                self.index.sync(self.db)
+
+    def _hydrate(self, ids: List[int], max_chars: Optional[int] = None) -> Dict[int, str]:
+        texts = {i: t for i in ids if (t := self.index.cached_text(i)) is not None}
+        missing = [i for i in ids if i not in texts]
+        if missing:
+            rows = self.db.exec(
+                select(Review.id, Review.text).where(Review.id.in_(missing), sql_text(ANN_INDEX_PREDICATE))
+            ).all()
+            for review_id, text in rows:
+                texts[int(review_id)] = text
+                self.index.remember_text(review_id, text)
+            # Gone from the database (deleted through another worker).
+            for review_id in set(missing) - set(texts):
+                self.index.remove(review_id)
+        if max_chars is not None:
+            texts = {review_id: text[: max(0, int(max_chars))] for review_id, text in texts.items()}
+        return texts
+
+    def search_by_embedding(
+        self,
+        *,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        k = max(1, int(k or 5))
+        self._ensure_fresh()
+
+        scored = self.index.search(embedding, k, min_score=min_score)
+        texts = self._hydrate([review_id for review_id, _ in scored], max_chars)
+        return [
+            RagHit(
+                id=review_id,
+                text=texts[review_id],
+                score=score,
+                embedding=self.index.vector(review_id) if with_embeddings else None,
+            )
+            for review_id, score in scored
+            if review_id in texts
+        ]
+
+    def search_many_by_embedding(
+        self,
+        *,
+        embeddings: Sequence[List[float]],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[List[RagHit]]:
+        k = max(1, int(k or 5))
+        self._ensure_fresh()
+
+        scored = [self.index.search(e, k, min_score=min_score) for e in embeddings]
+        texts = self._hydrate(sorted({review_id for hits in scored for review_id, _ in hits}), max_chars)
+        return [
+            [RagHit(id=review_id, text=texts[review_id], score=score) for review_id, score in hits if review_id in texts]
+            for hits in scored
+        ]
+
+    def search_hybrid(
+        self,
+        *,
+        text: str,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        settings = get_settings()
+        k = max(1, int(k or 5))
+        n = max(k, settings.hybrid_candidates)
+        self._ensure_fresh()
+
+        nearest = self.index.search(embedding, n)
+        scored = dict(nearest)
+        lexical = [int(r[0]) for r in self.db.execute(sql_text(lexical_query_sql()), {"text": text, "n": n}).all()]
+
+        q = np.asarray(embedding, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        for review_id in lexical:
+            if review_id not in scored and (vec := self.index.vector(review_id)) is not None:
+                scored[review_id] = float(vec @ q)
+
+        lexical_ids = set(lexical)
+        fused = [
+            (review_id, rrf)
+            for review_id, rrf in reciprocal_rank_fusion([[i for i, _ in nearest], lexical], k=settings.rrf_k)
+            if review_id in scored
+            and (min_score is None or review_id in lexical_ids or scored[review_id] >= float(min_score))
+        ][:k]
+
+        texts = self._hydrate([review_id for review_id, _ in fused], max_chars)
+        return [
+            RagHit(
+                id=review_id,
+                text=texts[review_id],
+                score=scored[review_id],
+                embedding=self.index.vector(review_id) if with_embeddings else None,
+                fused_score=rrf,
+            )
+            for review_id, rrf in fused
+            if review_id in texts
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_numpy_index() -> NumpyVectorIndex:
+    return NumpyVectorIndex()
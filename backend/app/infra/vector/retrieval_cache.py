@@ -0,0 +1,338 @@
+# app/infra/vector/retrieval_cache.py
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.rag.entities import AnnSearchParams, RagHit
+from app.domain.rag.interfaces import RagRepository
+
+
+__all__ = ["DEFAULT_GENERATION_FILE", "RetrievalCache", "RetrievalCacheStats", "CachedRagRepository"]
+
+logger = logging.getLogger(__name__)
+
+# Shared by every worker on the host; replaced (never edited) on each
+# invalidation, so a stat() tells whether another process wrote since.
+DEFAULT_GENERATION_FILE = os.path.join(tempfile.gettempdir(), "review-analyzer-retrieval-cache.gen")
+
+_MAX_FLIPPED_BITS = 3  # multi-probe at most 2**3 buckets per lookup
+
+
+@dataclass(frozen=True)
+class RetrievalCacheStats:
+    hits: int
+    misses: int
+    hit_ratio: float
+    near_hits: int
+    invalidations: int
+    expired: int
+    entries: int
+    version: int
+    mean_hit_age_seconds: float
+    max_hit_age_seconds: float
+
+
+@dataclass
+class _Entry:
+    query: np.ndarray
+    hits: List[RagHit]
+    stored_at: float
+
+
+class RetrievalCache:
+    """Reuses k-NN results for query embeddings within ``min_cosine`` of a
+    cached one, under the same search parameters.
+
+    Entries are bucketed by a random-hyperplane LSH signature. A neighbour
+    within tolerance can land across a hyperplane close to the query, so
+    lookups also probe the buckets reached by flipping the three
+    closest-plane bits. With 8 bits that finds about 99.9% of neighbours at
+    cosine 0.995 while scanning a handful of entries.
+
+    ``invalidate`` drops everything and bumps ``version``; the indexing
+    repositories call it through ``upsert``/``remove`` when reviews are saved
+    or deleted. ``put`` takes the version read before the search, so results
+    computed across an invalidation are not stored. With ``generation_path``
+    an invalidation also replaces that file, and every ``get``/``put`` checks
+    it, so saves and deletes handled by other workers clear this cache too.
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        bits: int = 8,
+        min_cosine: float = 0.995,
+        max_entries: int = 2000,
+        ttl_seconds: float = 60.0,
+        seed: int = 0,
+        generation_path: Optional[str] = None,
+    ) -> None:
+        if not 0.0 < min_cosine <= 1.0:
+            raise ValueError(f"min_cosine must be in (0, 1], got {min_cosine}")
+        planes = np.random.default_rng(seed).standard_normal((bits, dim)).astype(np.float32)
+        self._planes = planes / np.linalg.norm(planes, axis=1, keepdims=True)
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self.min_cosine = float(min_cosine)
+        # A neighbour within angle t can only sit across plane i if the query
+        # is within t of that plane, i.e. |n_i . q| < sin(t).
+        self._margin = math.sin(math.acos(self.min_cosine))
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+
+        self._buckets: Dict[Tuple[str, int], List[_Entry]] = {}
+        self._lru: "OrderedDict[int, Tuple[Tuple[str, int], _Entry]]" = OrderedDict()
+        self.version = 0
+        self._hits = self._misses = self._near_hits = self._invalidations = self._expired = 0
+        self._hit_age_total = 0.0
+        self._hit_age_max = 0.0
+        self._lock = threading.Lock()
+        self.generation_path = generation_path
+        self._generation = self._read_generation()
+
+    def _read_generation(self) -> Optional[Tuple[int, int, int]]:
+        if not self.generation_path:
+            return None
+        try:
+            st = os.stat(self.generation_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _write_generation(self) -> None:
+        tmp = f"{self.generation_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(f"{time.time_ns()} {os.getpid()}\n")
+            os.replace(tmp, self.generation_path)
+        except OSError:
+            logger.warning("Could not publish retrieval cache generation", exc_info=True,
+                           extra={"generation_path": self.generation_path})
+        self._generation = self._read_generation()
+
+    def _clear_locked(self) -> None:
+        self._buckets.clear()
+        self._lru.clear()
+        self.version += 1
+        self._invalidations += 1
+
+    def _sync_locked(self) -> None:
+        # Another worker invalidated: its file replaced the one we last saw.
+        if self.generation_path:
+            generation = self._read_generation()
+            if generation != self._generation:
+                self._generation = generation
+                self._clear_locked()
+
+    def _normalized(self, query: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32).ravel()
+        return q / max(float(np.linalg.norm(q)), 1e-12)
+
+    def _signature(self, proj: np.ndarray) -> int:
+        return int(self._weights[proj > 0].sum())
+
+    def _probes(self, proj: np.ndarray) -> List[int]:
+        base = self._signature(proj)
+        near = np.flatnonzero(np.abs(proj) < self._margin)
+        near = near[np.argsort(np.abs(proj[near]))][:_MAX_FLIPPED_BITS]
+        out = []
+        for r in range(len(near) + 1):
+            for combo in itertools.combinations(near.tolist(), r):
+                sig = base
+                for bit in combo:
+                    sig ^= 1 << bit
+                out.append(sig)
+        return out
+
+    def _expired_at(self, entry: _Entry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.stored_at > self.ttl_seconds
+
+    def _drop(self, key: Tuple[str, int], entry: _Entry) -> None:
+        bucket = self._buckets.get(key, [])
+        if entry in bucket:
+            bucket.remove(entry)
+        if not bucket:
+            self._buckets.pop(key, None)
+        self._lru.pop(id(entry), None)
+
+    def get(self, query: Sequence[float], scope: str) -> Optional[List[RagHit]]:
+        q = self._normalized(query)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_locked()
+            best: Optional[_Entry] = None
+            best_cos = -1.0
+            for sig in self._probes(self._planes @ q):
+                key = (scope, sig)
+                for entry in list(self._buckets.get(key, ())):
+                    if self._expired_at(entry, now):
+                        self._drop(key, entry)
+                        self._expired += 1
+                        continue
+                    cos = float(entry.query @ q)
+                    if cos > best_cos:
+                        best, best_cos = entry, cos
+
+            if best is None or best_cos < self.min_cosine:
+                self._misses += 1
+                return None
+
+            self._lru.move_to_end(id(best))
+            age = now - best.stored_at
+            self._hits += 1
+            self._near_hits += best_cos < 1.0 - 1e-6
+            self._hit_age_total += age
+            self._hit_age_max = max(self._hit_age_max, age)
+            return list(best.hits)
+
+    def put(self, query: Sequence[float], scope: str, hits: List[RagHit], version: Optional[int] = None) -> None:
+        q = self._normalized(query)
+        entry = _Entry(query=q, hits=list(hits), stored_at=time.monotonic())
+        key = (scope, self._signature(self._planes @ q))
+        with self._lock:
+            self._sync_locked()
+            if version is not None and version != self.version:
+                return
+            self._buckets.setdefault(key, []).append(entry)
+            self._lru[id(entry)] = (key, entry)
+            while len(self._lru) > self.max_entries:
+                _, (old_key, old) = self._lru.popitem(last=False)
+                self._drop(old_key, old)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear_locked()
+            if self.generation_path:
+                self._write_generation()
+
+    # Same hooks as the vector indexes, so the indexing repositories keep
+    # the cache in step with saves and deletes.
+    def upsert(self, review_id: int, embedding: Sequence[float], text: Optional[str] = None) -> None:
+        self.invalidate()
+
+    def remove(self, review_id: int) -> bool:
+        self.invalidate()
+        return True
+
+    def stats(self) -> RetrievalCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return RetrievalCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                hit_ratio=(self._hits / lookups) if lookups else 0.0,
+                near_hits=self._near_hits,
+                invalidations=self._invalidations,
+                expired=self._expired,
+                entries=len(self._lru),
+                version=self.version,
+                mean_hit_age_seconds=(self._hit_age_total / self._hits) if self._hits else 0.0,
+                max_hit_age_seconds=self._hit_age_max,
+            )
+
+
+def _scope(
+    kind: str,
+    k: int,
+    min_score: Optional[float],
+    with_embeddings: bool,
+    params: Optional[AnnSearchParams],
+    max_chars: Optional[int],
+) -> str:
+    return f"{kind}|k={int(k or 5)}|min={min_score}|emb={bool(with_embeddings)}|chars={max_chars}|{params!r}"
+
+
+class CachedRagRepository(RagRepository):
+    """Serves ``inner`` k-NN results from a ``RetrievalCache``."""
+
+    def __init__(self, inner: RagRepository, cache: RetrievalCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def search_by_embedding(
+        self,
+        *,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        scope = _scope("vector", k, min_score, with_embeddings, params, max_chars)
+        hits = self.cache.get(embedding, scope)
+        version = self.cache.version  # after get(), which picks up other workers' invalidations
+        if hits is None:
+            hits = self.inner.search_by_embedding(
+                embedding=embedding,
+                k=k,
+                min_score=min_score,
+                with_embeddings=with_embeddings,
+                params=params,
+                max_chars=max_chars,
+            )
+            self.cache.put(embedding, scope, hits, version=version)
+        return hits
+
+    def search_many_by_embedding(
+        self,
+        *,
+        embeddings: Sequence[List[float]],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[List[RagHit]]:
+        scope = _scope("vector", k, min_score, False, params, max_chars)
+        out: List[Optional[List[RagHit]]] = [self.cache.get(e, scope) for e in embeddings]
+        version = self.cache.version
+        missing = [i for i, hits in enumerate(out) if hits is None]
+        if missing:
+            found = self.inner.search_many_by_embedding(
+                embeddings=[embeddings[i] for i in missing],
+                k=k,
+                min_score=min_score,
+                params=params,
+                max_chars=max_chars,
+            )
+            for i, hits in zip(missing, found):
+                out[i] = hits
+                self.cache.put(embeddings[i], scope, hits, version=version)
+        return [hits or [] for hits in out]
+
+    def search_hybrid(
+        self,
+        *,
+        text: str,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        # The lexical arm depends on the exact wording, so it is part of the scope.
+        scope = _scope("hybrid:" + " ".join(text.split()).lower(), k, min_score, with_embeddings, params, max_chars)
+        hits = self.cache.get(embedding, scope)
+        version = self.cache.version
+        if hits is None:
+            hits = self.inner.search_hybrid(
+                text=text, embedding=embedding,
+                k=k,
+                min_score=min_score,
+                with_embeddings=with_embeddings,
+                params=params,
+                max_chars=max_chars,
+            )
+            self.cache.put(embedding, scope, hits, version=version)
+        return hits
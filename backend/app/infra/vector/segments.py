@@ -0,0 +1,497 @@
+"""Append-only, memory-mapped vector segments shared by every worker on a host.
+
+    uv run python -m app.infra.vector.segments export --dir /var/lib/review-analyzer/vectors
+    uv run python -m app.infra.vector.segments compact --dir /var/lib/review-analyzer/vectors
+
+Layout under the segment directory::
+
+    manifest.json               dim, dtype, generation and the ordered segment list
+    seg-000001/vectors.bin      (capacity, dim) float32 or float16, rows L2-normalized
+    seg-000001/ids.bin          (capacity,) int64; -1 marks an unused row
+    seg-000001/tombstones.bin   ceil(capacity / 8) bytes; a set bit marks a deleted row
+    .lock                       flock() held by writers
+
+Workers map the files with ``np.memmap``, so every process shares the same
+page cache. The last segment is the delta: it has spare capacity and new rows
+are written into it in place, vector first and id second, so a reader never
+sees an id without its vector. A full delta is sealed and a new one started.
+``compact`` merges all segments into one and drops tombstoned rows.
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, text as sql_text
+from sqlmodel import Session, select
+
+from app.core.settings import get_settings
+from app.infra.db.vector_index import ANN_INDEX_PREDICATE
+from app.infra.vector.numpy_index import TextCache, sync_index
+from app.models.review import Review
+
+
+__all__ = [
+    "SegmentManifest",
+    "MemmapVectorIndex",
+    "read_manifest",
+    "write_snapshot",
+    "export_snapshot",
+    "append_rows",
+    "tombstone_rows",
+    "compact",
+    "get_memmap_index",
+]
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+DELTA_CAPACITY = int(os.getenv("RAG_SEGMENTS_DELTA_CAPACITY", "4096"))
+_SCORE_CHUNK = 65_536  # rows upcast at a time when scoring float16 segments
+_EXPORT_CHUNK = 5000
+
+_VECTORS = "vectors.bin"
+_IDS = "ids.bin"
+_TOMBSTONES = "tombstones.bin"
+
+
+@dataclass(frozen=True)
+class SegmentManifest:
+    dim: int
+    dtype: str
+    generation: int
+    segments: List[str]
+    next_segment: int
+    version: int = 1
+
+
+def read_manifest(root: str) -> Optional[SegmentManifest]:
+    path = Path(root) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return SegmentManifest(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def _write_manifest(root: Path, manifest: SegmentManifest) -> None:
+    tmp = root / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(asdict(manifest), indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, root / MANIFEST_FILE)
+
+
+@contextmanager
+def _writer_lock(root: Path) -> Iterator[None]:
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "a+") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _normalized(vectors: np.ndarray, dim: int) -> np.ndarray:
+    mat = np.asarray(vectors, dtype=np.float32).reshape(-1, dim)
+    return mat / np.clip(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12, None)
+
+
+def _segment_name(n: int) -> str:
+    return f"seg-{n:06d}"
+
+
+def _open(path: Path, dim: int, dtype: str, mode: str) -> Tuple[np.memmap, np.memmap, np.memmap]:
+    ids = np.memmap(path / _IDS, dtype=np.int64, mode=mode)
+    vectors = np.memmap(path / _VECTORS, dtype=np.dtype(dtype), mode=mode, shape=(ids.shape[0], dim))
+    tombstones = np.memmap(path / _TOMBSTONES, dtype=np.uint8, mode=mode)
+    return vectors, ids, tombstones
+
+
+def _create_segment(root: Path, name: str, dim: int, dtype: str, capacity: int) -> Path:
+    """Creates an empty segment (all ids -1) and returns its path. The files
+    are written under a temporary name and renamed into place."""
+    capacity = max(1, int(capacity))
+    tmp = root / (name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.memmap(tmp / _VECTORS, dtype=np.dtype(dtype), mode="w+", shape=(capacity, dim)).flush()
+    ids = np.memmap(tmp / _IDS, dtype=np.int64, mode="w+", shape=(capacity,))
+    ids[:] = -1
+    ids.flush()
+    np.memmap(tmp / _TOMBSTONES, dtype=np.uint8, mode="w+", shape=((capacity + 7) // 8,)).flush()
+    path = root / name
+    os.rename(tmp, path)
+    return path
+
+
+def _live_rows(ids: np.ndarray, tombstones: np.ndarray) -> np.ndarray:
+    deleted = np.unpackbits(tombstones, count=ids.shape[0], bitorder="little").astype(bool)
+    return (ids >= 0) & ~deleted
+
+
+def _delta_fill(ids: np.ndarray) -> int:
+    free = np.flatnonzero(ids < 0)
+    return int(free[0]) if free.size else int(ids.shape[0])
+
+
+def _retire(root: Path, keep: Sequence[str]) -> None:
+    # Readers that still map the old files keep working: unlinking a mapped
+    # file only frees it once the last mapping goes away.
+    for path in root.glob("seg-*"):
+        if path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _publish(root: Path, old: Optional[SegmentManifest], base: str, dim: int, dtype: str, next_segment: int) -> SegmentManifest:
+    delta = _segment_name(next_segment)
+    _create_segment(root, delta, dim, dtype, DELTA_CAPACITY)
+    manifest = SegmentManifest(
+        dim=dim,
+        dtype=dtype,
+        generation=(old.generation + 1) if old else 1,
+        segments=[base, delta],
+        next_segment=next_segment + 1,
+    )
+    _write_manifest(root, manifest)
+    _retire(root, manifest.segments)
+    return manifest
+
+
+def _write_snapshot_locked(
+    path: Path,
+    batches: Iterable[Tuple[Sequence[int], np.ndarray]],
+    rows: int,
+    dim: int,
+    dtype: str,
+) -> SegmentManifest:
+    if dtype not in ("float32", "float16"):
+        raise ValueError(f"Unsupported segment dtype {dtype!r}")
+    old = read_manifest(str(path))
+    next_segment = old.next_segment if old else 1
+    base = _segment_name(next_segment)
+    seg = _create_segment(path, base, dim, dtype, rows)
+    vectors, ids, _ = _open(seg, dim, dtype, "r+")
+
+    n = 0
+    for batch_ids, batch_vectors in batches:
+        take = min(len(batch_ids), ids.shape[0] - n)
+        if take <= 0:
+            break
+        vectors[n : n + take] = _normalized(batch_vectors, dim)[:take].astype(dtype)
+        ids[n : n + take] = np.asarray(batch_ids[:take], dtype=np.int64)
+        n += take
+    vectors.flush()
+    ids.flush()
+    manifest = _publish(path, old, base, dim, dtype, next_segment + 1)
+    logger.info("Vector snapshot written", extra={"segments_dir": str(path), "segment_rows": n, "segment_dtype": dtype})
+    return manifest
+
+
+def write_snapshot(
+    root: str,
+    batches: Iterable[Tuple[Sequence[int], np.ndarray]],
+    rows: int,
+    dim: int = 384,
+    dtype: str = "float32",
+) -> SegmentManifest:
+    """Writes ``(ids, vectors)`` batches, at most ``rows`` rows in total, into
+    a fresh base segment plus an empty delta, replacing whatever the
+    directory held before."""
+    path = Path(root)
+    with _writer_lock(path):
+        return _write_snapshot_locked(path, batches, rows, dim, dtype)
+
+
+def export_snapshot(
+    db: Session, root: str, dtype: str = "float32", dim: int = 384, if_missing: bool = False
+) -> SegmentManifest:
+    """Snapshots the Accepted review embeddings into ``root``.
+
+    The database is read under the writer lock, so a row committed after the
+    read is appended to the new delta by its writer, never dropped. With
+    ``if_missing`` an existing snapshot (e.g. one another worker published
+    while this one waited) is kept as is."""
+    path = Path(root)
+    with _writer_lock(path):
+        existing = read_manifest(root)
+        if if_missing and existing is not None:
+            return existing
+        rows = db.exec(select(func.count()).select_from(Review).where(sql_text(ANN_INDEX_PREDICATE))).one()
+        stmt = select(Review.id, Review.embedding).where(sql_text(ANN_INDEX_PREDICATE)).order_by(Review.id)
+        batches = (
+            ([int(r[0]) for r in chunk], np.asarray([r[1] for r in chunk], dtype=np.float32))
+            for chunk in db.exec(stmt.execution_options(yield_per=_EXPORT_CHUNK)).partitions()
+        )
+        return _write_snapshot_locked(path, batches, int(rows), dim, dtype)
+
+
+def _locate(root: Path, manifest: SegmentManifest, review_ids: Sequence[int]) -> List[Tuple[str, int]]:
+    wanted = np.asarray(list(review_ids), dtype=np.int64)
+    found = []
+    for name in manifest.segments:
+        ids = np.memmap(root / name / _IDS, dtype=np.int64, mode="r")
+        for row in np.flatnonzero(np.isin(ids, wanted)):
+            found.append((name, int(row)))
+    return found
+
+
+def _set_tombstones(root: Path, hits: Sequence[Tuple[str, int]]) -> None:
+    for name, row in hits:
+        tombstones = np.memmap(root / name / _TOMBSTONES, dtype=np.uint8, mode="r+")
+        tombstones[row // 8] |= np.uint8(1 << (row % 8))
+        tombstones.flush()
+
+
+def tombstone_rows(root: str, review_ids: Sequence[int]) -> int:
+    path = Path(root)
+    with _writer_lock(path):
+        manifest = read_manifest(root)
+        if manifest is None or not review_ids:
+            return 0
+        hits = _locate(path, manifest, review_ids)
+        _set_tombstones(path, hits)
+        return len(hits)
+
+
+def append_rows(root: str, review_ids: Sequence[int], vectors: np.ndarray, missing_ok: bool = False) -> bool:
+    """Appends rows to the delta segment; an id that already exists is
+    tombstoned first, so this is an upsert. Without a snapshot it raises, or
+    returns False with ``missing_ok``."""
+    path = Path(root)
+    with _writer_lock(path):
+        manifest = read_manifest(root)
+        if manifest is None:
+            if missing_ok:
+                return False
+            raise RuntimeError(f"No vector snapshot in {root}; run `python -m app.infra.vector.segments export`")
+        mat = _normalized(vectors, manifest.dim).astype(manifest.dtype)
+        _set_tombstones(path, _locate(path, manifest, review_ids))
+
+        delta_vecs, delta_ids, _ = _open(path / manifest.segments[-1], manifest.dim, manifest.dtype, "r+")
+        fill = _delta_fill(delta_ids)
+        for review_id, vec in zip(review_ids, mat):
+            if fill >= delta_ids.shape[0]:
+                # Seal the full delta and start a new one.
+                name = _segment_name(manifest.next_segment)
+                _create_segment(path, name, manifest.dim, manifest.dtype, DELTA_CAPACITY)
+                manifest = replace(
+                    manifest,
+                    generation=manifest.generation + 1,
+                    segments=manifest.segments + [name],
+                    next_segment=manifest.next_segment + 1,
+                )
+                _write_manifest(path, manifest)
+                delta_vecs, delta_ids, _ = _open(path / name, manifest.dim, manifest.dtype, "r+")
+                fill = 0
+            delta_vecs[fill] = vec
+            delta_vecs.flush()
+            delta_ids[fill] = int(review_id)
+            delta_ids.flush()
+            fill += 1
+    return True
+
+
+def compact(root: str) -> SegmentManifest:
+    """Merges every segment into one, dropping tombstoned rows."""
+    path = Path(root)
+    with _writer_lock(path):
+        manifest = read_manifest(root)
+        if manifest is None:
+            raise RuntimeError(f"No vector snapshot in {root}")
+        opened = [_open(path / name, manifest.dim, manifest.dtype, "r") for name in manifest.segments]
+        masks = [_live_rows(ids, tombstones) for _, ids, tombstones in opened]
+
+        base = _segment_name(manifest.next_segment)
+        seg = _create_segment(path, base, manifest.dim, manifest.dtype, int(sum(m.sum() for m in masks)))
+        out_vecs, out_ids, _ = _open(seg, manifest.dim, manifest.dtype, "r+")
+        n = 0
+        for (vectors, ids, _), mask in zip(opened, masks):
+            rows = np.flatnonzero(mask)
+            out_vecs[n : n + rows.size] = vectors[rows]
+            out_ids[n : n + rows.size] = ids[rows]
+            n += rows.size
+        out_vecs.flush()
+        out_ids.flush()
+
+        merged = _publish(path, manifest, base, manifest.dim, manifest.dtype, manifest.next_segment + 1)
+    logger.info("Vector segments compacted", extra={"segments_dir": root, "segment_rows": n})
+    return merged
+
+
+@dataclass
+class _OpenSegment:
+    name: str
+    vectors: np.memmap
+    ids: np.memmap
+    tombstones: np.memmap
+
+
+class MemmapVectorIndex:
+    """Read side of the segment directory with the ``NumpyVectorIndex``
+    interface, so ``NumpyRagRepository`` and the indexing repositories work
+    unchanged. Writes go straight to disk and are seen by every worker."""
+
+    def __init__(self, root: str, dtype: str = "float32", dim: int = 384, max_texts: int = 100_000) -> None:
+        self.root = root
+        self.dtype = dtype
+        self.dim = dim
+        self.generation: Optional[int] = None
+        self.synced_at: Optional[float] = None
+        self.sync_lock = threading.Lock()
+        self._segments: List[_OpenSegment] = []
+        self._texts = TextCache(max_texts)
+
+    def refresh(self) -> bool:
+        """Re-opens the segments if the manifest changed; returns whether it did."""
+        manifest = read_manifest(self.root)
+        if manifest is None or manifest.generation == self.generation:
+            return False
+        self.dim = manifest.dim
+        self._segments = [
+            _OpenSegment(name, *_open(Path(self.root) / name, manifest.dim, manifest.dtype, "r"))
+            for name in manifest.segments
+        ]
+        self.generation = manifest.generation
+        return True
+
+    def sync(self, db: Session) -> None:
+        if read_manifest(self.root) is None:
+            export_snapshot(db, self.root, dtype=self.dtype, dim=self.dim, if_missing=True)
+        self.refresh()
+        if self._drifted(db):
+            # Rows saved or deleted while no worker kept the segments up to
+            # date, e.g. under another RAG_REPOSITORY or after a failed write.
+            added, removed = sync_index(db, self)
+            logger.info(
+                "Vector segments reconciled with the database",
+                extra={"segments_dir": self.root, "rows_added": added, "rows_removed": removed},
+            )
+        self.synced_at = time.monotonic()
+
+    def _drifted(self, db: Session) -> bool:
+        rows, max_id = db.exec(
+            select(func.count(), func.max(Review.id)).where(sql_text(ANN_INDEX_PREDICATE))
+        ).one()
+        ids = self.ids()
+        return int(rows) != ids.size or int(max_id or 0) != (int(ids.max()) if ids.size else 0)
+
+    def _live(self, seg: _OpenSegment) -> np.ndarray:
+        return _live_rows(seg.ids, seg.tombstones)
+
+    def __len__(self) -> int:
+        return int(sum(self._live(s).sum() for s in self._segments))
+
+    def __contains__(self, review_id: int) -> bool:
+        return self.vector(review_id) is not None
+
+    def ids(self) -> np.ndarray:
+        if not self._segments:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.asarray(s.ids[self._live(s)]) for s in self._segments])
+
+    def vector(self, review_id: int) -> Optional[np.ndarray]:
+        for seg in reversed(self._segments):
+            rows = np.flatnonzero((seg.ids == int(review_id)) & self._live(seg))
+            if rows.size:
+                return np.asarray(seg.vectors[rows[-1]], dtype=np.float32)
+        return None
+
+    def search(self, query: Sequence[float], k: int, min_score: Optional[float] = None) -> List[Tuple[int, float]]:
+        q = _normalized(np.asarray(query), self.dim)[0]
+        best_ids: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for seg in self._segments:
+            live = self._live(seg)
+            for start in range(0, seg.ids.shape[0], _SCORE_CHUNK):
+                stop = start + _SCORE_CHUNK
+                rows = np.flatnonzero(live[start:stop]) + start
+                if rows.size == 0:
+                    continue
+                scores = np.asarray(seg.vectors[start:stop], dtype=np.float32)[rows - start] @ q
+                if min_score is not None:
+                    keep = scores >= min_score
+                    rows, scores = rows[keep], scores[keep]
+                if scores.size > k:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    rows, scores = rows[top], scores[top]
+                best_ids.append(np.asarray(seg.ids[rows]))
+                best_scores.append(scores)
+
+        if not best_scores:
+            return []
+        ids = np.concatenate(best_ids)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores, kind="stable")[: int(k)]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def upsert_many(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        if not len(ids):
+            return
+        # Checked under the writer lock: a snapshot being exported right now
+        # is waited for, and a missing one will include the committed rows.
+        if not append_rows(self.root, ids, vectors, missing_ok=True):
+            logger.info("No vector snapshot yet; skipping upsert", extra={"segments_dir": self.root})
+            return
+        self.refresh()
+
+    def upsert(self, review_id: int, embedding: Sequence[float], text: Optional[str] = None) -> None:
+        self.upsert_many([review_id], np.asarray(embedding, dtype=np.float32))
+        if text is not None:
+            self.remember_text(review_id, text)
+
+    def remove(self, review_id: int) -> bool:
+        self._texts.pop(review_id)
+        return tombstone_rows(self.root, [int(review_id)]) > 0
+
+    def remember_text(self, review_id: int, text: str) -> None:
+        self._texts.put(review_id, text)
+
+    def cached_text(self, review_id: int) -> Optional[str]:
+        return self._texts.get(review_id)
+
+
+@lru_cache(maxsize=1)
+def get_memmap_index() -> MemmapVectorIndex:
+    settings = get_settings()
+    if not settings.vector_segments_dir:
+        raise RuntimeError("RAG_REPOSITORY=memmap requires RAG_SEGMENTS_DIR")
+    return MemmapVectorIndex(settings.vector_segments_dir, dtype=settings.vector_segments_dtype)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export, compact or inspect the memory-mapped vector segments.")
+    parser.add_argument("command", choices=["export", "compact", "stats"])
+    parser.add_argument("--dir", default=os.getenv("RAG_SEGMENTS_DIR"), required=not os.getenv("RAG_SEGMENTS_DIR"))
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=os.getenv("RAG_SEGMENTS_DTYPE", "float32"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        from app.database import engine
+        from app.models.user import User  # noqa: F401  (registers the Review.user relationship target)
+
+        with Session(engine) as db:
+            export_snapshot(db, args.dir, dtype=args.dtype)
+    elif args.command == "compact":
+        compact(args.dir)
+
+    index = MemmapVectorIndex(args.dir)
+    index.refresh()
+    manifest = read_manifest(args.dir)
+    print(f"generation={index.generation} dtype={manifest.dtype if manifest else '-'} live_rows={len(index)}")
+    for seg in index._segments:
+        print(f"{seg.name}\tcapacity={seg.ids.shape[0]}\tlive={int(index._live(seg).sum())}")
+
+
+if __name__ == "__main__":
+    main()
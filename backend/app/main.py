@@ -12,6 +12,31 @@ app = FastAPI(title="Review Helper API")
 async def root():
     return {"status": "ok"}
 
+@app.on_event("startup")
+def preload_models():
+    if settings.model_offline and not settings.inference_socket:
+        from app.core.model_snapshots import configured_models, verify_snapshots
+        missing = verify_snapshots(configured_models())
+        if missing:
+            raise RuntimeError(f"MODEL_OFFLINE is set but these models have no local snapshot: {', '.join(missing)}")
+    if settings.inference_socket:
+        # Fails here, not on the first request, when INFERENCE_AUTHKEY is missing.
+        from app.infra.inference.client import get_inference_client
+        get_inference_client()
+    if settings.binary_rescore:
+        # Without the index every first stage is a sequential Hamming scan.
+        from app.database import engine
+        from app.infra.db.index_maintenance import binary_index_valid
+        with engine.connect() as conn:
+            if not binary_index_valid(conn):
+                raise RuntimeError(
+                    "RAG_BINARY_RESCORE is set but idx_review_embedding_bq is missing or invalid; "
+                    "build it with `python -m app.infra.db.index_maintenance --apply` (pgvector >= 0.7)"
+                )
+    if settings.reranker_preload:
+        from app.services.reranker import preload_rerankers
+        preload_rerankers(settings.reranker_preload)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -2,7 +2,8 @@ from sqlmodel import SQLModel, Field,Relationship
 from typing import Optional, List
 from datetime import datetime, timezone
 from sqlalchemy import Column
-from pgvector.sqlalchemy import Vector
+
+from app.models.vector_types import embedding_type
 
 class Review(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -18,5 +19,5 @@ class Review(SQLModel, table=True):
 
     embedding: Optional[List[float]] = Field(
         default=None,
-        sa_column=Column(Vector(384))
+        sa_column=Column(embedding_type())
     )
\ No newline at end of file
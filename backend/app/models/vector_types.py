@@ -0,0 +1,33 @@
+# app/models/vector_types.py
+from __future__ import annotations
+
+from typing import Optional
+
+from pgvector.sqlalchemy import Vector
+
+from app.core.settings import get_settings
+
+
+__all__ = ["HalfVector", "embedding_type"]
+
+
+class HalfVector(Vector):
+    """pgvector ``halfvec``. pgvector-python 0.2 has no type for it; the text
+    form is the same ``[x,y,...]`` as ``vector``, so only the DDL differs."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        if self.dim is None:
+            return "HALFVEC"
+        return "HALFVEC(%d)" % self.dim
+
+
+def embedding_type(storage: Optional[str] = None, dim: int = 384) -> Vector:
+    """Column type of ``review.embedding`` for RAG_EMBEDDING_STORAGE."""
+    storage = (storage or get_settings().embedding_storage).lower()
+    if storage == "halfvec":
+        return HalfVector(dim)
+    if storage == "vector":
+        return Vector(dim)
+    raise ValueError(f"Unknown embedding storage {storage!r}; expected 'vector' or 'halfvec'")
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
 from datetime import datetime
@@ -57,6 +57,19 @@ class RagSearchIn(BaseModel):
     text: str
     k: int = 5
     min_score: Optional[float] = None
+    probes: Optional[int] = Field(default=None, ge=1, le=1000)
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)
+    mode: Optional[Literal["vector", "hybrid"]] = None
+    max_chars: Optional[int] = Field(default=None, ge=1, le=20000)
+
+class RagBatchSearchIn(BaseModel):
+    texts: List[str] = Field(min_length=1, max_length=100)
+    k: int = 5
+    min_score: Optional[float] = None
+    probes: Optional[int] = Field(default=None, ge=1, le=1000)
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)
+    mode: Optional[Literal["vector", "hybrid"]] = None
+    max_chars: Optional[int] = Field(default=None, ge=1, le=20000)
 
 class RagHit(BaseModel):
     id: int
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import numpy as np
 
 def mmr_select(
@@ -6,7 +6,11 @@ def mmr_select(
     docs: List[Dict],
     k: int = 8,
     lamb: float = 0.7,
+    rel_key: Optional[str] = None,
 ) -> List[Dict]:
+    """Maximal marginal relevance. Relevance is the cosine to the query, or
+    ``doc[rel_key]`` scaled to a max of 1 when every doc has that key (the
+    fused score in hybrid retrieval)."""
     if not docs:
         return []
     C = np.vstack([np.array(d["embedding"], dtype=np.float32) for d in docs])
@@ -15,7 +19,11 @@ def mmr_select(
     def _cos(a, b):
         return (a @ b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8)
 
-    rel = C @ q / (np.linalg.norm(C, axis=1) * np.linalg.norm(q) + 1e-8)  # (N,)
+    if rel_key and all(d.get(rel_key) is not None for d in docs):
+        rel = np.array([d[rel_key] for d in docs], dtype=np.float32)
+        rel = rel / max(float(rel.max()), 1e-8)
+    else:
+        rel = C @ q / (np.linalg.norm(C, axis=1) * np.linalg.norm(q) + 1e-8)  # (N,)
     selected, remaining = [], list(range(len(docs)))
 
     while remaining and len(selected) < k:
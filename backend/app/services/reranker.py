@@ -1,23 +1,207 @@
-from typing import List, Dict
-from sentence_transformers import CrossEncoder
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+from typing import TYPE_CHECKING, Deque, List, Dict, Iterable, Optional
+import logging
+import os
+import threading
+import time
 
-_reranker = None
+import numpy as np
 
-def get_reranker(model_name: str) -> CrossEncoder:
-    global _reranker
-    if _reranker is None:
-        _reranker = CrossEncoder(model_name, trust_remote_code=True)
-    return _reranker
+from app.core.model_registry import get_model_registry
+from app.core.result_cache import ResultCache, cache_key
+
+if TYPE_CHECKING:
+    # Only an annotation here: API workers behind INFERENCE_SOCKET never load torch.
+    from sentence_transformers import CrossEncoder
+
+RERANK_BATCH_SIZE       = int(os.getenv("RAG_RERANKER_BATCH_SIZE", "32"))
+RERANK_CACHE_SIZE       = int(os.getenv("RAG_RERANKER_CACHE_SIZE", "50000"))
+RERANK_CACHE_TTL_SECONDS= float(os.getenv("RAG_RERANKER_CACHE_TTL_SECONDS", "3600"))
+SHADOW_QUEUE_SIZE       = max(1, int(os.getenv("RAG_RERANKER_SHADOW_QUEUE", "4")))
+_LATENCY_WINDOW         = 1024
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RerankerStats:
+    model_name: str
+    calls: int
+    pairs: int
+    warmup_ms: Optional[float]
+    p50_ms: float
+    p95_ms: float
+
+class _ModelLatency:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.pairs = 0
+        self.warmup_ms: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+_latency: Dict[str, _ModelLatency] = {}
+_latency_lock = threading.Lock()
+_shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank-shadow")
+# Running plus queued shadow jobs; each one holds a copy of the candidates.
+_shadow_slots = threading.BoundedSemaphore(SHADOW_QUEUE_SIZE)
+_shadow_dropped = 0
+
+def _record(model_name: str, elapsed_ms: float, pairs: int) -> None:
+    with _latency_lock:
+        lat = _latency.setdefault(model_name, _ModelLatency())
+        lat.calls += 1
+        lat.pairs += pairs
+        lat.samples.append(elapsed_ms)
+
+def get_reranker(model_name: str) -> "CrossEncoder":
+    from app.infra.inference.client import RemoteCrossEncoder, get_inference_client  # lazy import
+    client = get_inference_client()
+    if client is not None:
+        return RemoteCrossEncoder(client, model_name)
+    return get_model_registry().cross_encoder(model_name)
+
+def warm_up(model_name: str) -> float:
+    """Loads the cross-encoder and runs one prediction; returns elapsed ms."""
+    t0 = time.perf_counter()
+    get_reranker(model_name).predict([("warm up query", "warm up document")], show_progress_bar=False)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    with _latency_lock:
+        _latency.setdefault(model_name, _ModelLatency()).warmup_ms = elapsed_ms
+    return elapsed_ms
+
+def preload_rerankers(model_names: Iterable[str]) -> Dict[str, float]:
+    warmed = {}
+    for name in dict.fromkeys(n for n in model_names if n):
+        try:
+            warmed[name] = warm_up(name)
+        except Exception:
+            logger.warning("Reranker preload failed for %s", name, exc_info=True)
+    return warmed
+
+def reranker_stats() -> List[RerankerStats]:
+    with _latency_lock:
+        return [
+            RerankerStats(
+                model_name=name,
+                calls=lat.calls,
+                pairs=lat.pairs,
+                warmup_ms=lat.warmup_ms,
+                p50_ms=float(np.percentile(lat.samples, 50)) if lat.samples else 0.0,
+                p95_ms=float(np.percentile(lat.samples, 95)) if lat.samples else 0.0,
+            )
+            for name, lat in _latency.items()
+        ]
+
+@lru_cache(maxsize=1)
+def get_score_cache() -> Optional[ResultCache]:
+    if RERANK_CACHE_SIZE <= 0:
+        return None
+    return ResultCache(max_entries=RERANK_CACHE_SIZE, ttl_seconds=RERANK_CACHE_TTL_SECONDS)
+
+def _pair_key(query_key: str, doc: Dict) -> Optional[str]:
+    # The content hash keeps an edited review, or a reused id, from hitting
+    # a score computed for other text.
+    doc_id = doc.get("id")
+    if doc_id is None:
+        return None
+    digest = hashlib.sha256((doc.get("content") or "").encode("utf-8")).hexdigest()[:16]
+    return f"{query_key}:{doc_id}:{digest}"
+
+def score_pairs(query: str, docs: List[Dict], model_name: str, batch_size: Optional[int] = None) -> np.ndarray:
+    """Cross-encoder scores for ``(query, doc["content"])`` as a float32 array.
+
+    Scores are cached per (query, review id, content, model), so re-evaluating
+    an edited draft only scores neighbours it has not seen. Uncached pairs are
+    sorted by content length before ``predict`` to keep padding per batch low.
+    """
+    scores = np.empty(len(docs), dtype=np.float32)
+    cache = get_score_cache()
+    query_key = cache_key("rerank", model_name, query)
+
+    missing: List[int] = []
+    for i, d in enumerate(docs):
+        key = _pair_key(query_key, d) if cache is not None else None
+        hit = cache.get(key) if key is not None else None
+        if hit is not None:
+            scores[i] = np.frombuffer(hit, dtype=np.float32)[0]
+        else:
+            missing.append(i)
+
+    if missing:
+        missing.sort(key=lambda i: len(docs[i].get("content") or ""))
+        ce = get_reranker(model_name)
+        t0 = time.perf_counter()
+        predicted = np.asarray(
+            ce.predict(
+                [(query, docs[i].get("content") or "") for i in missing],
+                batch_size=batch_size or RERANK_BATCH_SIZE,
+                show_progress_bar=False,
+            ),
+            dtype=np.float32,
+        ).reshape(-1)
+        _record(model_name, (time.perf_counter() - t0) * 1000, len(missing))
+        scores[missing] = predicted
+        if cache is not None:
+            for i, s in zip(missing, predicted):
+                key = _pair_key(query_key, docs[i])
+                if key is not None:
+                    cache.set(key, s.tobytes())
+
+    return scores
 
 def rerank(query: str, docs: List[Dict], model_name: str, topk: int = 3) -> List[Dict]:
     if not docs:
         return []
-    ce = get_reranker(model_name)
-    pairs = [(query, d["content"]) for d in docs]
-    scores = ce.predict(pairs)  # np.ndarray
-    ranked = sorted(
-        [dict(d, rerank_score=float(s)) for d, s in zip(docs, scores)],
-        key=lambda x: x["rerank_score"],
-        reverse=True
-    )
-    return ranked[:topk]
\ No newline at end of file
+    scores = score_pairs(query, docs, model_name)
+
+    k = max(1, min(topk, len(docs)))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [dict(docs[i], rerank_score=float(scores[i])) for i in top]
+
+def _shadow_compare(query: str, docs: List[Dict], model_name: str, topk: int, primary_ids: List) -> None:
+    try:
+        t0 = time.perf_counter()
+        shadow_ids = [d.get("id") for d in rerank(query, docs, model_name=model_name, topk=topk)]
+        logger.info(
+            "RAG shadow rerank",
+            extra={
+                "rag_shadow_model": model_name,
+                "rag_shadow_ms": round((time.perf_counter() - t0) * 1000, 2),
+                "rag_shadow_overlap": len(set(shadow_ids) & set(primary_ids)) / max(1, len(primary_ids)),
+                "rag_shadow_ids": [str(i) for i in shadow_ids],
+                "rag_primary_ids": [str(i) for i in primary_ids],
+            },
+        )
+    except Exception:
+        logger.warning("RAG shadow rerank failed for %s", model_name, exc_info=True)
+
+def _run_shadow(*args) -> None:
+    try:
+        _shadow_compare(*args)
+    finally:
+        _shadow_slots.release()
+
+def shadow_dropped() -> int:
+    """Shadow samples skipped because RAG_RERANKER_SHADOW_QUEUE jobs were pending."""
+    with _latency_lock:
+        return _shadow_dropped
+
+def submit_shadow_rerank(query: str, docs: List[Dict], model_name: str, topk: int, primary: List[Dict]) -> None:
+    """Scores ``docs`` with a second cross-encoder off the request path and
+    logs how its top-k compares with the primary model's. When the shadow
+    model falls behind, new samples are dropped rather than queued."""
+    global _shadow_dropped
+    if not _shadow_slots.acquire(blocking=False):
+        with _latency_lock:
+            _shadow_dropped += 1
+        logger.debug("RAG shadow rerank dropped: %s job(s) pending", SHADOW_QUEUE_SIZE)
+        return
+    try:
+        _shadow_pool.submit(_run_shadow, query, list(docs), model_name, topk, [d.get("id") for d in primary])
+    except Exception:
+        _shadow_slots.release()
+        raise
@@ -1,48 +1,102 @@
-from typing import Sequence
+from typing import Optional
+import numpy as np
 from sqlmodel import Session, select
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.sql import func
+from app.core.settings import get_settings
+from app.domain.rag.entities import AnnSearchParams
+from app.infra.db.binary_index import first_stage_size, hamming_distance_sql
+from app.infra.db.vector_index import (
+    ANN_INDEX_PREDICATE,
+    ann_search_scope,
+    evaluation_search_params,
+    max_distance,
+    resolve_metric,
+    resolve_storage,
+)
 from app.models.review import Review
-import os
-
-_IVFFLAT_PROBES = int(os.getenv("RAG_PROBES", "15"))
 
 def retrieve_candidates(
     session: Session,
     qemb: list[float],
     top_n: int = 50,
     min_score: float | None = None,
+    params: Optional[AnnSearchParams] = None,
+    index_type: Optional[str] = None,
+    max_chars: int = 2000,
+    metric: Optional[str] = None,
+    storage: Optional[str] = None,
+    binary_rescore: Optional[bool] = None,
+    binary_candidates: Optional[int] = None,
 ) -> list[dict]:
-    try:
-        session.exec(text("SET ivfflat.probes = 15"))
-    except Exception:
-        pass
+    # The query vector is bound as an untyped literal, so Postgres reads it as
+    # the column type (vector or halfvec, RAG_EMBEDDING_STORAGE).
+    settings = get_settings()
+    metric = resolve_metric(metric)
+    if metric == "ip":
+        # <#> is the negative inner product, the cosine only for unit vectors.
+        norm = float(np.linalg.norm(qemb)) or 1.0
+        qemb = [float(x) / norm for x in qemb]
+    if binary_rescore is None:
+        binary_rescore = settings.binary_rescore
 
-    dist = Review.embedding.cosine_distance(qemb)
-    score = (1 - dist).label("score")
-    stmt = (
-        select(
-            Review.id,
-            func.coalesce(func.nullif(Review.corrected_text, ""), Review.text).label("content"),
-            Review.embedding,
-            score,
-        )
-        .where(
-            Review.status == "Accepted",
-            Review.embedding.isnot(None),
+    source = Review.__table__
+    if binary_rescore:
+        # Same two stages as SqlModelRagRepository (RAG_BINARY_RESCORE): the
+        # Hamming top-n from the binary-quantized HNSW index, then the exact
+        # distance below re-ranks those rows only.
+        rescore_n = first_stage_size(binary_candidates or settings.binary_candidates, top_n, settings.rag_max_ef_search)
+        hamming = text(
+            hamming_distance_sql("review.embedding", f"CAST(:bq_query AS {resolve_storage(storage)})")
+        ).bindparams(bindparam("bq_query", "[" + ",".join(repr(float(x)) for x in qemb) + "]"))
+        source = (
+            select(source.c.id, source.c.text, source.c.corrected_text, source.c.embedding)
+            .where(text(ANN_INDEX_PREDICATE))
+            .order_by(hamming)
+            .limit(rescore_n)
+            .subquery("bq")
         )
-        .order_by(score.desc())
-        .limit(top_n)
+
+    if metric == "ip":
+        dist = source.c.embedding.max_inner_product(qemb).label("dist")
+    else:
+        dist = source.c.embedding.cosine_distance(qemb).label("dist")
+    nearest = select(
+        source.c.id,
+        func.coalesce(func.nullif(source.c.corrected_text, ""), source.c.text).label("content"),
+        source.c.embedding,
+        dist,
     )
+    if not binary_rescore:
+        # Same predicate as the partial ANN index, and ordered by raw distance,
+        # so the planner can serve this from the index.
+        nearest = nearest.where(text(ANN_INDEX_PREDICATE))
+    nearest = nearest.order_by(dist).limit(top_n).subquery()
+    # The threshold and truncation run on the top_n rows in Postgres. Putting
+    # the threshold inside the index scan instead would make an iterative scan
+    # keep searching for rows that pass it.
+    stmt = select(
+        nearest.c.id,
+        func.left(nearest.c.content, max_chars).label("content"),
+        nearest.c.embedding,
+        ((1 - nearest.c.dist) if metric == "cosine" else -nearest.c.dist).label("score"),
+    ).order_by(nearest.c.dist)
+    if min_score is not None:
+        stmt = stmt.where(nearest.c.dist <= max_distance(min_score, metric))
 
-    rows = session.exec(stmt).all()
+    search = evaluation_search_params().merged(params)
+    if binary_rescore:
+        # The first stage always reads the HNSW bit index; ef_search must
+        # cover every candidate handed to the rescoring stage, within the cap.
+        ef_search = first_stage_size(search.ef_search or rescore_n, rescore_n, settings.rag_max_ef_search)
+        scope = ann_search_scope(session, "hnsw", AnnSearchParams(ef_search=ef_search), k=rescore_n)
+    else:
+        scope = ann_search_scope(session, index_type or settings.ann_index, search, k=top_n)
+    with scope:
+        rows = session.exec(stmt).all()
     out = []
     for rid, content, emb, s in rows:
         if hasattr(emb, "tolist"):
             emb = emb.tolist()
-        item = {"id": rid, "content": (content or "")[:2000], "embedding": emb, "score": float(s)}
-        out.append(item)
-
-    if min_score is not None:
-        out = [x for x in out if x["score"] >= min_score]
+        out.append({"id": rid, "content": content or "", "embedding": emb, "score": float(s)})
     return out
@@ -1,4 +1,22 @@
-from app.core.clients import get_sentiment_pipeline
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import struct
+
+from app.core.batching import BatchingStats, MicroBatcher
+from app.core.clients import SENTIMENT_MODEL_NAME, get_sentiment_pipeline
+from app.core.result_cache import ResultCache, cache_key
+from app.domain.reviews.interfaces import SentimentAnalyzer
+
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_WAIT_MS = float(os.getenv("SENTIMENT_MAX_WAIT_MS", "5"))
+
+
+def _token_lengths(sentiment_pipeline, texts: Sequence[str]) -> List[int]:
+    tokenizer = getattr(sentiment_pipeline, "tokenizer", None)
+    if tokenizer is None:
+        return [len(t.split()) for t in texts]
+    return [len(ids) for ids in tokenizer(list(texts), truncation=True)["input_ids"]]
+
 
 class SentimentAnalysisService:
     @staticmethod
@@ -6,3 +24,108 @@ class SentimentAnalysisService:
         sentiment_pipeline = get_sentiment_pipeline()
         result = sentiment_pipeline(text)[0]
         return result['label'], result['score']
+
+    @staticmethod
+    def analyze_batch(texts: Sequence[str], batch_size: Optional[int] = None) -> List[Tuple[str, float]]:
+        if not texts:
+            return []
+        sentiment_pipeline = get_sentiment_pipeline()
+
+        # Sorting by token length keeps similarly sized texts in the same
+        # batch, so little compute is spent on padding.
+        lengths = _token_lengths(sentiment_pipeline, texts)
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        results = sentiment_pipeline(
+            [texts[i] for i in order],
+            batch_size=batch_size or SENTIMENT_BATCH_SIZE,
+            truncation=True,
+        )
+
+        out: List[Tuple[str, float]] = [("", 0.0)] * len(texts)
+        for i, result in zip(order, results):
+            out[i] = (result['label'], result['score'])
+        return out
+
+
+class CoalescingSentimentAnalyzer:
+    """Groups concurrent ``analyze`` calls into one ``analyze_batch`` run."""
+
+    def __init__(
+        self,
+        service: Optional[SentimentAnalysisService] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        self.service = service or SentimentAnalysisService()
+        wait = SENTIMENT_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self._batcher: MicroBatcher[str, Tuple[str, float]] = MicroBatcher(
+            self.service.analyze_batch,
+            max_batch_size=max_batch_size or SENTIMENT_BATCH_SIZE,
+            max_wait_s=wait / 1000.0,
+            name="sentiment-batcher",
+        )
+
+    def analyze(self, text: str) -> Tuple[str, float]:
+        return self._batcher.submit(text)
+
+    def analyze_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        return self.service.analyze_batch(texts)
+
+    def stats(self) -> BatchingStats:
+        return self._batcher.stats()
+
+
+class CachedSentimentAnalyzer:
+    """Serves repeated texts from a ``ResultCache``; each entry is a packed
+    float64 score followed by the UTF-8 label, so hits and misses agree."""
+
+    def __init__(
+        self,
+        inner: SentimentAnalyzer,
+        cache: ResultCache,
+        model_name: str = SENTIMENT_MODEL_NAME,
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.model_name = model_name
+
+    def _key(self, text: str) -> str:
+        # "sentiment-f64": entries persisted with the old float32 layout are not read back.
+        return cache_key("sentiment-f64", self.model_name, text)
+
+    @staticmethod
+    def _pack(label: str, score: float) -> bytes:
+        return struct.pack("<d", float(score)) + label.encode("utf-8")
+
+    @staticmethod
+    def _unpack(value: bytes) -> Tuple[str, float]:
+        (score,) = struct.unpack_from("<d", value)
+        return value[8:].decode("utf-8"), score
+
+    def analyze(self, text: str) -> Tuple[str, float]:
+        key = self._key(text)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return self._unpack(hit)
+        label, score = self.inner.analyze(text)
+        self.cache.set(key, self._pack(label, score))
+        return label, score
+
+    def analyze_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        out: List[Tuple[str, float]] = [("", 0.0)] * len(texts)
+        missing: Dict[int, str] = {}
+        for i, text in enumerate(texts):
+            hit = self.cache.get(self._key(text))
+            if hit is not None:
+                out[i] = self._unpack(hit)
+            else:
+                missing[i] = text
+
+        if missing:
+            batch = getattr(self.inner, "analyze_batch", None)
+            texts_missing = list(missing.values())
+            computed = batch(texts_missing) if batch else [self.inner.analyze(t) for t in texts_missing]
+            for (i, text), (label, score) in zip(missing.items(), computed):
+                out[i] = (label, score)
+                self.cache.set(self._key(text), self._pack(label, score))
+        return out
@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Callable, Optional, Protocol
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Callable, Optional, Protocol, Union
 import json
 import logging
 import os
@@ -7,7 +8,7 @@ import numpy as np
 from app.utils.prompts import suggestion_prompt_template
 from app.core.clients import call_llm
 from app.services.ranking import mmr_select
-from app.services.reranker import rerank
+from app.services.reranker import rerank, submit_shadow_rerank
 
 
 RAG_ENABLED      = os.getenv("RAG_ENABLED", "true").lower() in ("1", "true", "yes")
@@ -16,9 +17,13 @@ MMR_L            = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
 MMR_K            = int(os.getenv("RAG_MMR_K", "8"))
 RERANK_MODEL     = os.getenv("RAG_RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
 RERANK_TOPK      = int(os.getenv("RAG_RERANKER_TOPK", "3"))
+SHADOW_MODEL     = os.getenv("RAG_RERANKER_SHADOW_MODEL", "").strip()
 RAG_MIN_SCORE    = float(os.getenv("RAG_MIN_SCORE", "0.70"))
 MAX_USER_TEXT    = int(os.getenv("MAX_USER_TEXT_CHARS", "2000"))
 MAX_SNIPPET_CHARS= int(os.getenv("MAX_SNIPPET_CHARS", "400"))
+# Candidates reach the cross-encoder before they are cut to MAX_SNIPPET_CHARS;
+# its 512-token window holds roughly 2000 characters of review.
+MAX_CANDIDATE_CHARS = int(os.getenv("MAX_CANDIDATE_CHARS", "2000"))
 
 logger = logging.getLogger(__name__)
 
@@ -87,7 +92,12 @@ def _normalize_examples_used(value: Any, allowed_ids: set[str]) -> List[str]:
 def _scores(docs: List[Dict[str, Any]]) -> List[float]:
     return [round(float(d.get("score", 0.0)), 4) for d in docs]
 
-RetrieverFn = Callable[[str, int, Optional[float]], List[Dict[str, Any]]]
+@dataclass(frozen=True)
+class Retrieval:
+    candidates: List[Dict[str, Any]]
+    query_embedding: Optional[List[float]] = field(default=None, repr=False)
+
+RetrieverFn = Callable[[str, int, Optional[float]], Union[Retrieval, List[Dict[str, Any]]]]
 
 class Embedder(Protocol):
     def embed(self, text: str) -> List[float]:
@@ -110,18 +120,31 @@ class SuggestionService:
         examples: List[Dict[str, Any]] = []
         if RAG_ENABLED and self.retriever:
             try:
-                cands = self.retriever(user_text, TOPN, effective_min_score) or []
+                retrieved = self.retriever(user_text, TOPN, effective_min_score)
+                if isinstance(retrieved, Retrieval):
+                    cands, query_emb = retrieved.candidates, retrieved.query_embedding
+                else:
+                    cands, query_emb = retrieved or [], None
                 retrieved_count = len(cands)
 
                 cands = [
-                    {"id": c.get("id"), "text": c.get("text"), "content": c.get("text"), "score": float(c.get("score", 0.0))}
+                    {
+                        "id": c.get("id"),
+                        "text": c.get("text"),
+                        "content": c.get("text"),
+                        "score": float(c.get("score", 0.0)),
+                        "embedding": c.get("embedding"),
+                        "fused_score": c.get("fused_score"),
+                    }
                     for c in cands
                 ]
                 mmr_count: Optional[int] = None
-                if cands and self.query_embedder:
+                if cands and (query_emb or self.query_embedder):
                     try:
-                        q = np.asarray(self.query_embedder.embed(user_text), dtype=np.float32)
-                        cands = mmr_select(q, cands, k=MMR_K, lamb=MMR_L)
+                        if not query_emb:
+                            query_emb = self.query_embedder.embed(user_text)
+                        q = np.asarray(query_emb, dtype=np.float32)
+                        cands = mmr_select(q, cands, k=MMR_K, lamb=MMR_L, rel_key="fused_score")
                         mmr_count = len(cands)
                     except Exception:
                         logger.warning("RAG MMR selection failed; continuing without MMR", exc_info=True)
@@ -129,8 +152,11 @@ class SuggestionService:
                 reranked_count: Optional[int] = None
                 if cands:
                     try:
+                        pre_rerank = cands
                         cands = rerank(user_text, cands, model_name=RERANK_MODEL, topk=RERANK_TOPK)
                         reranked_count = len(cands)
+                        if SHADOW_MODEL and SHADOW_MODEL != RERANK_MODEL:
+                            submit_shadow_rerank(user_text, pre_rerank, SHADOW_MODEL, RERANK_TOPK, cands)
                     except Exception:
                         logger.warning("RAG reranker failed; using top candidates without reranking", exc_info=True)
                         cands = cands[:RERANK_TOPK]
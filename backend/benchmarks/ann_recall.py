@@ -0,0 +1,303 @@
+"""Measure ANN recall and latency against exact (sequential scan) search.
+
+For every index type and search knob in the grid, runs the same query set
+through ``SqlModelRagRepository.search_by_embedding`` (top ``--k``) and
+``services.retriever.retrieve_candidates`` (top ``--top-n``). Each result is
+compared with the exact top-k from a sequential scan. Reports
+recall@k, p50/p95 latency and index size as a table, plus JSON with
+``--json``.
+
+Everything runs in one transaction that is rolled back. ``--source synthetic``
+seeds clustered unit vectors. ``--source db`` uses the Accepted reviews
+already in DATABASE_URL. Dropping and building indexes inside the
+transaction locks ``review`` until the run ends, so point ``--source db``
+at a copy of production, not production itself.
+
+    DATABASE_URL=... uv run python benchmarks/ann_recall.py --rows 100000 --probes 1,5,10,15,20 --ef-search 20,40,100
+    DATABASE_URL=... uv run python benchmarks/ann_recall.py --source db --index-types ivfflat --json recall.json
+    DATABASE_URL=... uv run python benchmarks/ann_recall.py --metric ip      # vector_ip_ops / <#>
+    DATABASE_URL=... uv run python benchmarks/ann_recall.py --storage halfvec  # pgvector >= 0.7
+    DATABASE_URL=... uv run python benchmarks/ann_recall.py --binary-candidates 100,200,400  # pgvector >= 0.7
+
+``--binary-candidates`` adds the two-stage search (RAG_BINARY_RESCORE): a
+Hamming top-n from the binary-quantized HNSW index, rescored exactly.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+DIM = 384
+
+
+def _csv_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _clustered(rng: np.random.Generator, n: int, clusters: int, spread: float) -> np.ndarray:
+    # Real review embeddings are far from uniform: topics form clusters.
+    centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    mat = centers[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, DIM)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def _vector_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+
+def _recall(found: Sequence[int], exact: Sequence[int]) -> float:
+    return len(set(found) & set(exact)) / max(1, len(exact))
+
+
+def _summary(samples_ms: List[float], recalls: List[float]) -> Dict[str, float]:
+    return {
+        "recall": float(np.mean(recalls)) if recalls else 0.0,
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--rows", type=int, default=50_000, help="synthetic rows to seed")
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--spread", type=float, default=1.5, help="within-cluster noise relative to the centers")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05, help="perturbation added to sampled query vectors")
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--index-types", default="ivfflat,hnsw")
+    parser.add_argument("--metric", choices=["cosine", "ip"], default="cosine", help="index opclass and distance operator")
+    parser.add_argument(
+        "--storage", choices=["vector", "halfvec"], default="vector",
+        help="column type for the ANN runs; exact top-k is always computed on float32",
+    )
+    parser.add_argument("--lists", type=int, default=None, help="ivfflat lists (default: recommended_lists(rows))")
+    parser.add_argument("--probes", type=_csv_ints, default=[1, 5, 10, 15, 20, 40])
+    parser.add_argument("--ef-search", type=_csv_ints, default=[10, 20, 40, 100, 200])
+    parser.add_argument(
+        "--binary-candidates", type=_csv_ints, default=[],
+        help="first-stage sizes for the binary-quantized search (repository and retriever paths)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="write results as JSON here ('-' for stdout)")
+    args = parser.parse_args()
+
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    from app.database import engine
+    from app.domain.rag.entities import AnnSearchParams
+    from app.infra.db.binary_index import BINARY_INDEX_NAME, binary_index_sql
+    from app.infra.db.index_maintenance import recommended_lists
+    from app.infra.db.rag_repository import SqlModelRagRepository
+    from app.infra.db.vector_index import (
+        ANN_INDEX_PREDICATE,
+        HNSW_EF_CONSTRUCTION,
+        HNSW_INDEX_NAME,
+        HNSW_M,
+        IVFFLAT_INDEX_NAME,
+        hnsw_index_sql,
+        index_name_for,
+        ivfflat_index_sql,
+    )
+    from app.models.user import User  # noqa: F401  (registers the Review.user relationship target)
+    from app.services.retriever import retrieve_candidates
+
+    rng = np.random.default_rng(args.seed)
+    depth = max(args.k, args.top_n)
+    rows_out: List[Dict] = []
+
+    with engine.connect() as conn:
+        tx = conn.begin()
+        session = Session(bind=conn)
+        try:
+            if args.source == "synthetic":
+                corpus = _clustered(rng, args.rows, args.clusters, args.spread)
+                user_id = conn.execute(
+                    text(
+                        "INSERT INTO \"user\" (email, hashed_password, provider, role, created_at) "
+                        "VALUES ('bench@example.com', 'x', 'credentials', 'user', now()) RETURNING id"
+                    )
+                ).scalar_one()
+                for start in range(0, args.rows, 5000):
+                    conn.execute(
+                        text(
+                            "INSERT INTO review (text, corrected_text, sentiment, status, feedback, user_id, created_at, embedding) "
+                            "VALUES (:text, '', 'POSITIVE', 'Accepted', '', :user_id, now(), CAST(:emb AS vector))"
+                        ),
+                        [
+                            {"text": f"synthetic review {i}", "user_id": user_id, "emb": _vector_literal(corpus[i])}
+                            for i in range(start, min(start + 5000, args.rows))
+                        ],
+                    )
+                base = corpus[rng.integers(0, args.rows, args.queries)]
+            else:
+                sample = conn.execute(
+                    text(f"SELECT embedding FROM review WHERE {ANN_INDEX_PREDICATE} ORDER BY random() LIMIT :n"),
+                    {"n": args.queries},
+                ).all()
+                if not sample:
+                    raise SystemExit("No Accepted reviews with embeddings in DATABASE_URL")
+                base = np.asarray([np.asarray(r[0], dtype=np.float32) for r in sample])
+
+            noise = rng.standard_normal(base.shape).astype(np.float32)
+            queries = base + args.noise * noise / np.linalg.norm(noise, axis=1, keepdims=True)
+            queries = [q.tolist() for q in queries / np.linalg.norm(queries, axis=1, keepdims=True)]
+            rows = conn.execute(text(f"SELECT count(*) FROM review WHERE {ANN_INDEX_PREDICATE}")).scalar_one()
+            print(
+                f"corpus: {rows} Accepted rows ({args.source}), {len(queries)} queries, "
+                f"k={args.k}, top_n={args.top_n}, metric={args.metric}, storage={args.storage}"
+            )
+
+            # Exact top-k: the same repository SQL with no ANN index to use,
+            # i.e. a sequential scan. Indexes are dropped inside the
+            # transaction and come back on rollback.
+            conn.execute(text(f"DROP INDEX IF EXISTS {IVFFLAT_INDEX_NAME}"))
+            conn.execute(text(f"DROP INDEX IF EXISTS {HNSW_INDEX_NAME}"))
+            conn.execute(text("ANALYZE review"))
+            exact_repo = SqlModelRagRepository(
+                session, index_type="ivfflat", params=AnnSearchParams(), metric=args.metric, storage="vector",
+                binary_rescore=False,
+            )
+            exact, exact_ms = [], []
+            for q in queries:
+                t = time.perf_counter()
+                exact.append([h.id for h in exact_repo.search_by_embedding(embedding=q, k=depth)])
+                exact_ms.append((time.perf_counter() - t) * 1000)
+            if args.storage == "halfvec":
+                # Recall below is then the cost of 16-bit storage plus the ANN.
+                conn.execute(text(f"ALTER TABLE review ALTER COLUMN embedding TYPE halfvec({DIM})"))
+            rows_out.append({
+                "index": "exact", "build": "-", "param": "-", "path": "repository",
+                "index_mb": 0.0, "build_s": 0.0, **_summary(exact_ms, [1.0] * len(queries)),
+            })
+
+            for index_type in [t.strip() for t in args.index_types.split(",") if t.strip()]:
+                conn.execute(text(f"DROP INDEX IF EXISTS {IVFFLAT_INDEX_NAME}"))
+                conn.execute(text(f"DROP INDEX IF EXISTS {HNSW_INDEX_NAME}"))
+                if index_type == "hnsw":
+                    build_sql = hnsw_index_sql(metric=args.metric, storage=args.storage)
+                    build = f"m={HNSW_M},ef_construction={HNSW_EF_CONSTRUCTION}"
+                    grid = [("ef_search", v, AnnSearchParams(ef_search=v)) for v in args.ef_search]
+                else:
+                    lists = args.lists or recommended_lists(rows)
+                    build_sql = ivfflat_index_sql(lists=lists, metric=args.metric, storage=args.storage)
+                    build = f"lists={lists}"
+                    grid = [("probes", v, AnnSearchParams(probes=v)) for v in args.probes]
+
+                t = time.perf_counter()
+                conn.execute(text(build_sql))
+                build_s = time.perf_counter() - t
+                conn.execute(text("ANALYZE review"))
+                size_mb = conn.execute(
+                    text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": index_name_for(index_type)}
+                ).scalar_one() / 1e6
+
+                for knob, value, params in grid:
+                    repo = SqlModelRagRepository(
+                        session, index_type=index_type, params=params, metric=args.metric, storage=args.storage,
+                        binary_rescore=False,
+                    )
+                    paths = {
+                        "repository": (args.k, lambda q: [h.id for h in repo.search_by_embedding(embedding=q, k=args.k)]),
+                        "retriever": (args.top_n, lambda q: [
+                            c["id"] for c in retrieve_candidates(
+                                session, q, top_n=args.top_n, params=params, index_type=index_type,
+                                metric=args.metric, binary_rescore=False,
+                            )
+                        ]),
+                    }
+                    for path, (depth_k, search) in paths.items():
+                        search(queries[0])  # warm the index pages
+                        samples, recalls = [], []
+                        for q, truth in zip(queries, exact):
+                            t = time.perf_counter()
+                            found = search(q)
+                            samples.append((time.perf_counter() - t) * 1000)
+                            recalls.append(_recall(found, truth[:depth_k]))
+                        rows_out.append({
+                            "index": index_type, "build": build, "param": f"{knob}={value}", "path": path,
+                            "index_mb": round(size_mb, 2), "build_s": round(build_s, 2),
+                            **_summary(samples, recalls),
+                        })
+
+            if args.binary_candidates:
+                conn.execute(text(f"DROP INDEX IF EXISTS {IVFFLAT_INDEX_NAME}"))
+                conn.execute(text(f"DROP INDEX IF EXISTS {HNSW_INDEX_NAME}"))
+                t = time.perf_counter()
+                conn.execute(text(binary_index_sql()))
+                build_s = time.perf_counter() - t
+                conn.execute(text("ANALYZE review"))
+                size_mb = conn.execute(
+                    text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": BINARY_INDEX_NAME}
+                ).scalar_one() / 1e6
+                for n in args.binary_candidates:
+                    repo = SqlModelRagRepository(
+                        session, index_type="hnsw", params=AnnSearchParams(), metric=args.metric,
+                        storage=args.storage, binary_rescore=True, binary_candidates=n,
+                    )
+                    paths = {
+                        "repository": (args.k, lambda q: [h.id for h in repo.search_by_embedding(embedding=q, k=args.k)]),
+                        "retriever": (args.top_n, lambda q, n=n: [
+                            c["id"] for c in retrieve_candidates(
+                                session, q, top_n=args.top_n, params=AnnSearchParams(), metric=args.metric,
+                                storage=args.storage, binary_rescore=True, binary_candidates=n,
+                            )
+                        ]),
+                    }
+                    for path, (depth_k, search) in paths.items():
+                        search(queries[0])
+                        samples, recalls = [], []
+                        for q, truth in zip(queries, exact):
+                            t = time.perf_counter()
+                            found = search(q)
+                            samples.append((time.perf_counter() - t) * 1000)
+                            recalls.append(_recall(found, truth[:depth_k]))
+                        rows_out.append({
+                            "index": "binary", "build": f"m={HNSW_M},ef_construction={HNSW_EF_CONSTRUCTION}",
+                            "param": f"rescore={n}", "path": path,
+                            "index_mb": round(size_mb, 2), "build_s": round(build_s, 2),
+                            **_summary(samples, recalls),
+                        })
+        finally:
+            session.close()
+            tx.rollback()
+
+    print(f"\n{'index':<8} {'build':<28} {'param':<14} {'path':<11} {'recall':>7} {'p50_ms':>8} {'p95_ms':>8} {'index_mb':>9}")
+    for r in rows_out:
+        print(
+            f"{r['index']:<8} {r['build']:<28} {r['param']:<14} {r['path']:<11} "
+            f"{r['recall']:>7.3f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['index_mb']:>9.1f}"
+        )
+
+    if args.json_path:
+        report = {
+            "source": args.source,
+            "metric": args.metric,
+            "storage": args.storage,
+            "rows": rows,
+            "queries": len(queries),
+            "k": args.k,
+            "top_n": args.top_n,
+            "results": rows_out,
+        }
+        if args.json_path == "-":
+            print(json.dumps(report, indent=2))
+        else:
+            with open(args.json_path, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            print(f"\nwrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare the torch and onnxruntime e5 embedders on latency, RSS and parity.
+
+Each backend runs in its own subprocess so resident memory is measured
+without the other model loaded.
+
+    uv run python benchmarks/embedding_backends.py --runs 200 --batch 16
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SAMPLE_TEXTS = [
+    "The battery lasted two full days with moderate use.",
+    "Screen is bright outdoors but the speakers are weak.",
+    "Arrived late and the box was damaged, product works fine though.",
+    "A bateria durou o dia inteiro e a tela é muito nítida.",
+    "Comfortable headphones, noise cancelling is good on flights.",
+    "Stopped charging after a week, support never answered.",
+    "Great value for the price, setup took five minutes.",
+    "The zipper broke on the first trip.",
+]
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _build(backend: str, quantize: bool):
+    if backend == "onnx":
+        from app.infra.embeddings.onnx_embedder import OnnxSentenceEmbedder
+        return OnnxSentenceEmbedder(query_prefix="query: ", quantize=quantize)
+    from app.infra.embeddings.local_sentence_transformer import LocalSentenceTransformerEmbedder
+    return LocalSentenceTransformerEmbedder(query_prefix="query: ")
+
+
+def _worker(backend: str, quantize: bool, runs: int, batch: int) -> None:
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    embedder = _build(backend, quantize)
+    embedder.embed("warm up")
+    load_s = time.perf_counter() - t0
+
+    single = []
+    for i in range(runs):
+        text = SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]
+        t = time.perf_counter()
+        embedder.embed(text)
+        single.append((time.perf_counter() - t) * 1000)
+
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(batch)]
+    batched = []
+    for _ in range(max(1, runs // batch)):
+        t = time.perf_counter()
+        embedder.embed_many(texts)
+        batched.append((time.perf_counter() - t) * 1000)
+
+    print(json.dumps({
+        "backend": backend if backend == "torch" else f"onnx{'-int8' if quantize else ''}",
+        "load_s": round(load_s, 2),
+        "rss_mb": round(_rss_mb() - rss_before, 1),
+        "single_p50_ms": round(statistics.median(single), 2),
+        "single_p95_ms": round(float(np.percentile(single, 95)), 2),
+        "batch_ms_per_text": round(statistics.median(batched) / batch, 2),
+        "vectors": embedder.embed_many(SAMPLE_TEXTS),
+    }))
+
+
+def _run(backend: str, quantize: bool, runs: int, batch: int) -> dict:
+    cmd = [sys.executable, __file__, "--worker", backend, "--runs", str(runs), "--batch", str(batch)]
+    if quantize:
+        cmd.append("--quantize")
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--worker", choices=["torch", "onnx"], help=argparse.SUPPRESS)
+    parser.add_argument("--quantize", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.quantize, args.runs, args.batch)
+        return
+
+    results = [
+        _run("torch", False, args.runs, args.batch),
+        _run("onnx", False, args.runs, args.batch),
+        _run("onnx", True, args.runs, args.batch),
+    ]
+    reference = np.asarray(results[0].pop("vectors"), dtype=np.float32)
+
+    failed = False
+    print(f"{'backend':<10} {'load_s':>7} {'rss_mb':>8} {'p50_ms':>8} {'p95_ms':>8} {'batch/text':>11} {'min_cos':>8}")
+    for r in results:
+        vectors = np.asarray(r.pop("vectors", reference), dtype=np.float32)
+        min_cos = float(np.min(np.sum(reference * vectors, axis=1)))
+        failed |= min_cos < args.min_cosine
+        print(
+            f"{r['backend']:<10} {r['load_s']:>7} {r['rss_mb']:>8} {r['single_p50_ms']:>8} "
+            f"{r['single_p95_ms']:>8} {r['batch_ms_per_text']:>11} {min_cos:>8.4f}"
+        )
+
+    if failed:
+        sys.exit(f"parity check failed: cosine below {args.min_cosine}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare pgvector and the in-process NumPy index on k-NN latency.
+
+Seeds synthetic Accepted reviews into DATABASE_URL inside a transaction that
+is rolled back at the end, builds the configured ANN index on them, and times
+``search_by_embedding`` for both repositories with the same queries.
+
+    DATABASE_URL=... uv run python benchmarks/rag_repositories.py --rows 100000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+DIM = 384
+
+
+def _unit(rng: np.random.Generator, n: int) -> np.ndarray:
+    mat = rng.standard_normal((n, DIM)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def _vector_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+
+def _timed(fn, queries, k):
+    samples, results = [], []
+    for q in queries:
+        t = time.perf_counter()
+        results.append([h.id for h in fn(embedding=q.tolist(), k=k)])
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    from app.core.settings import get_settings
+    from app.database import engine
+    from app.infra.db.index_maintenance import recommended_lists
+    from app.infra.db.rag_repository import SqlModelRagRepository
+    from app.infra.db.vector_index import hnsw_index_sql, ivfflat_index_sql
+    from app.infra.vector.numpy_index import NumpyRagRepository, NumpyVectorIndex, sync_index
+    from app.models.user import User  # noqa: F401  (registers the Review.user relationship target)
+
+    rng = np.random.default_rng(args.seed)
+    corpus = _unit(rng, args.rows)
+    # Queries near existing rows, like real reviews near their neighbours.
+    queries = corpus[rng.integers(0, args.rows, args.queries)] + 0.05 * _unit(rng, args.queries)
+
+    index_type = get_settings().ann_index
+    with engine.connect() as conn:
+        tx = conn.begin()
+        session = Session(bind=conn)
+        try:
+            user_id = conn.execute(
+                text(
+                    "INSERT INTO \"user\" (email, hashed_password, provider, role, created_at) "
+                    "VALUES ('bench@example.com', 'x', 'credentials', 'user', now()) RETURNING id"
+                )
+            ).scalar_one()
+            t = time.perf_counter()
+            for start in range(0, args.rows, 5000):
+                conn.execute(
+                    text(
+                        "INSERT INTO review (text, corrected_text, sentiment, status, feedback, user_id, created_at, embedding) "
+                        "VALUES (:text, '', 'POSITIVE', 'Accepted', '', :user_id, now(), CAST(:emb AS vector))"
+                    ),
+                    [
+                        {"text": f"synthetic review {i}", "user_id": user_id, "emb": _vector_literal(corpus[i])}
+                        for i in range(start, min(start + 5000, args.rows))
+                    ],
+                )
+            conn.execute(text("DROP INDEX IF EXISTS idx_review_embedding_ann"))
+            conn.execute(text("DROP INDEX IF EXISTS idx_review_embedding_hnsw"))
+            conn.execute(text(
+                hnsw_index_sql() if index_type == "hnsw" else ivfflat_index_sql(lists=recommended_lists(args.rows))
+            ))
+            conn.execute(text("ANALYZE review"))
+            print(f"seeded {args.rows} rows and built {index_type} in {time.perf_counter() - t:.1f}s")
+
+            pg = SqlModelRagRepository(session)
+            index = NumpyVectorIndex()
+            t = time.perf_counter()
+            sync_index(session, index)
+            load_s = time.perf_counter() - t
+            np_repo = NumpyRagRepository(session, index, refresh_seconds=0)
+
+            _timed(pg.search_by_embedding, queries[:10], args.k)  # warm caches
+            _timed(np_repo.search_by_embedding, queries[:10], args.k)
+            pg_ms, pg_ids = _timed(pg.search_by_embedding, queries, args.k)
+            np_ms, np_ids = _timed(np_repo.search_by_embedding, queries, args.k)
+        finally:
+            session.close()
+            tx.rollback()
+
+    recall = statistics.mean(len(set(a) & set(b)) / max(1, len(b)) for a, b in zip(pg_ids, np_ids))
+    print(f"numpy index load: {load_s:.2f}s, {index.ids().size * DIM * 4 / 1e6:.1f} MB")
+    print(f"{'repository':<12} {'p50_ms':>8} {'p95_ms':>8}")
+    for name, samples in (("pgvector", pg_ms), ("numpy", np_ms)):
+        print(f"{name:<12} {statistics.median(samples):>8.2f} {float(np.percentile(samples, 95)):>8.2f}")
+    print(f"pgvector recall@{args.k} vs exact numpy: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
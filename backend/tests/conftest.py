@@ -7,6 +7,7 @@ from app.dependencies import get_current_user
 from app.database import get_session
 from app.domain.reviews.use_cases import SaveApprovedReview, ListMyReviews, EvaluateText
 from app.infra.db.admin_repository import SqlModelAdminRepository
+from app.infra.db.lexical_index import search_tsv_column_sql
 from app.infra.db.reviews_repository import SqlModelReviewRepository
 from app.models.review import Review
 from app.models.user import User
@@ -41,6 +42,7 @@ def _create_schema_once():
     with engine.begin() as conn:
          conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS vector;")
          SQLModel.metadata.create_all(bind=conn)
+         conn.exec_driver_sql(search_tsv_column_sql())
     yield
 
     with engine.begin() as conn:
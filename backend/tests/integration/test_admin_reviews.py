@@ -101,4 +101,14 @@ def test_stats_no_reviews(client, session, mock_admin_user):
     assert resp.status_code == 200
     data = resp.json()
     assert data["total_reviews"] == 0
-    client.app.dependency_overrides.clear()
\ No newline at end of file
+    client.app.dependency_overrides.clear()
+
+def test_retrieval_cache_stats_requires_admin(client, mock_user):
+    resp = client.get("/api/v1/admin/rag/cache")
+    assert resp.status_code == 403
+    app.dependency_overrides.clear()
+
+def test_retrieval_cache_stats_reports_disabled_cache(client, mock_admin_user):
+    resp = client.get("/api/v1/admin/rag/cache")
+    assert resp.status_code == 200
+    assert resp.json() == {"enabled": False}
@@ -1,4 +1,5 @@
 # tests/integration/test_rag_endpoint.py
+import json
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -7,7 +8,7 @@ from fastapi.testclient import TestClient
 
 from app.main import app
 from app.domain.rag.use_cases import SearchRag
-from app.domain.rag.entities import RagHit
+from app.domain.rag.entities import AnnSearchParams, RagHit
 from app.api.v1.deps import get_rag_uc
 
 
@@ -24,13 +25,32 @@ class _FakeEmbedder:
 class _FakeRepo:
     items: List[RagHit]
 
-    def search_by_embedding(self, *, embedding: List[float], k: int = 5, min_score: Optional[float] = None) -> List[RagHit]:
+    def search_by_embedding(
+        self,
+        *,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        self.last_params = params
         out = self.items[:]
         if min_score is not None:
             out = [h for h in out if h.score >= min_score]
+        if max_chars is not None:
+            out = [RagHit(id=h.id, text=h.text[:max_chars], score=h.score) for h in out]
         out.sort(key=lambda h: h.score, reverse=True)
         return out[:k]
 
+    def search_many_by_embedding(self, *, embeddings, k=5, min_score=None, params=None, max_chars=None):
+        self.batch_sizes = getattr(self, "batch_sizes", []) + [len(embeddings)]
+        return [
+            self.search_by_embedding(embedding=e, k=k, min_score=min_score, params=params, max_chars=max_chars)
+            for e in embeddings
+        ]
+
 
 @pytest.fixture
 def client():
@@ -44,6 +64,7 @@ def client():
     app.dependency_overrides[get_rag_uc] = lambda: fake_uc
     try:
         with TestClient(app) as c:
+            c.repo = fake_uc.repo
             yield c
     finally:
         app.dependency_overrides.clear()
@@ -73,3 +94,40 @@ def test_rag_search_empty_text_returns_empty(client):
     r = client.post(f"{BASE}/search", json={"text": "   "})
     assert r.status_code == 200
     assert r.json()["results"] == []
+
+
+def test_rag_search_forwards_ann_overrides(client):
+    r = client.post(f"{BASE}/search", json={"text": "q", "probes": 30, "ef_search": 200})
+    assert r.status_code == 200
+    assert client.repo.last_params == AnnSearchParams(probes=30, ef_search=200)
+
+
+def test_rag_search_caps_ann_overrides(client):
+    r = client.post(f"{BASE}/search", json={"text": "q", "probes": 1000, "ef_search": 1000})
+    assert r.status_code == 200
+    assert client.repo.last_params == AnnSearchParams(probes=100, ef_search=400)
+
+
+def test_rag_search_batch_streams_one_ndjson_line_per_text(client, mock_admin_user):
+    r = client.post(f"{BASE}/search/batch", json={"texts": ["a", "  ", "b"], "k": 1, "probes": 5})
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert [[hit["id"] for hit in line["results"]] for line in lines] == [[10], [], [10]]
+    assert client.repo.batch_sizes == [2]  # blank texts are not searched
+    assert client.repo.last_params == AnnSearchParams(probes=5)
+
+
+def test_rag_search_batch_rejects_empty_batches(client, mock_admin_user):
+    assert client.post(f"{BASE}/search/batch", json={"texts": []}).status_code == 422
+    assert client.post(f"{BASE}/search/batch", json={"texts": ["a"] * 101}).status_code == 422
+
+
+def test_rag_search_batch_requires_an_admin(client, mock_user):
+    assert client.post(f"{BASE}/search/batch", json={"texts": ["a"]}).status_code == 403
+
+
+def test_rag_search_batch_requires_login(client):
+    assert client.post(f"{BASE}/search/batch", json={"texts": ["a"]}).status_code == 401
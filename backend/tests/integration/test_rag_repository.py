@@ -0,0 +1,249 @@
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlmodel import select
+
+from app.domain.rag.entities import AnnSearchParams
+from app.infra.db.rag_repository import SqlModelRagRepository
+from app.infra.db.vector_index import hnsw_index_sql, ivfflat_index_sql
+from app.infra.vector.numpy_index import NumpyRagRepository, NumpyVectorIndex, sync_index
+from app.infra.vector.segments import MemmapVectorIndex, read_manifest
+from app.services.retriever import retrieve_candidates
+from app.models.review import Review
+
+
+def _unit(*head: float) -> list[float]:
+    v = np.zeros(384, dtype=np.float32)
+    v[: len(head)] = head
+    return (v / np.linalg.norm(v)).tolist()
+
+
+@pytest.fixture
+def rag_repo(session, user_factory):
+    user = user_factory(email="rag@example.com")
+    rows = [
+        Review(text="battery lasts all day", sentiment="POSITIVE", status="Accepted", feedback="",
+               user_id=user.id, embedding=_unit(1.0, 0.0)),
+        Review(text="battery died quickly", sentiment="NEGATIVE", status="Accepted", feedback="",
+               user_id=user.id, embedding=_unit(0.9, 0.1)),
+        Review(text="screen is bright", sentiment="POSITIVE", status="Accepted", feedback="",
+               user_id=user.id, embedding=_unit(0.0, 1.0)),
+        Review(text="battery bad", sentiment="NEGATIVE", status="Rejected", feedback="too short",
+               user_id=user.id, embedding=_unit(1.0, 0.0)),
+    ]
+    session.add_all(rows)
+    session.commit()
+    return SqlModelRagRepository(session)
+
+
+def test_search_by_embedding_orders_by_cosine_score(rag_repo):
+    hits = rag_repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=2)
+
+    assert [h.text for h in hits] == ["battery lasts all day", "battery died quickly"]
+    assert hits[0].score == pytest.approx(1.0, abs=1e-4)
+    assert all(h.embedding is None for h in hits)
+
+
+def test_search_by_embedding_can_return_float32_embeddings(rag_repo):
+    hits = rag_repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=3, with_embeddings=True)
+
+    assert len(hits) == 3
+    for h in hits:
+        assert isinstance(h.embedding, np.ndarray)
+        assert h.embedding.dtype == np.float32
+        assert h.embedding.shape == (384,)
+    assert float(hits[0].embedding @ np.asarray(_unit(1.0, 0.0), dtype=np.float32)) == pytest.approx(hits[0].score, abs=1e-4)
+
+
+def test_hnsw_search_applies_ef_search_override(rag_repo, session):
+    session.exec(text(hnsw_index_sql(m=4, ef_construction=8)))
+    repo = SqlModelRagRepository(session, index_type="hnsw", params=AnnSearchParams(ef_search=20))
+
+    hits = repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=2, params=AnnSearchParams(ef_search=64))
+
+    assert [h.text for h in hits] == ["battery lasts all day", "battery died quickly"]
+    assert session.exec(text("SELECT current_setting('hnsw.ef_search')")).one()[0] == "64"
+
+
+def test_ivfflat_search_uses_deployment_probes_unless_overridden(rag_repo, session):
+    repo = SqlModelRagRepository(session, index_type="ivfflat", params=AnnSearchParams(probes=7))
+
+    repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=1)
+    assert session.exec(text("SELECT current_setting('ivfflat.probes')")).one()[0] == "7"
+
+    repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=1, params=AnnSearchParams(probes=3))
+    assert session.exec(text("SELECT current_setting('ivfflat.probes')")).one()[0] == "3"
+
+
+def test_rejects_unknown_index_type(session):
+    with pytest.raises(ValueError):
+        SqlModelRagRepository(session, index_type="diskann")
+
+
+def test_both_query_paths_skip_rejected_reviews(rag_repo, session):
+    hits = rag_repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=10)
+    candidates = retrieve_candidates(session, _unit(1.0, 0.0), top_n=10)
+
+    assert "battery bad" not in {h.text for h in hits}
+    assert [c["content"] for c in candidates] == [h.text for h in hits]
+
+
+def test_accepted_only_query_can_use_the_partial_index(rag_repo, session):
+    session.exec(text(ivfflat_index_sql(lists=1)))
+    session.exec(text("SET LOCAL enable_seqscan = off"))
+
+    plan = session.exec(
+        text(
+            "EXPLAIN SELECT id FROM review WHERE status = 'Accepted' AND embedding IS NOT NULL "
+            "ORDER BY embedding <=> CAST(:q AS vector) LIMIT 3"
+        ).bindparams(q=str(_unit(1.0, 0.0)))
+    ).all()
+
+    assert "idx_review_embedding_ann" in "\n".join(row[0] for row in plan)
+
+
+def test_numpy_repository_matches_pgvector_exact_results(rag_repo, session):
+    index = NumpyVectorIndex()
+    repo = NumpyRagRepository(session, index, refresh_seconds=0)
+
+    hits = repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=3, with_embeddings=True)
+    expected = rag_repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=3)
+
+    assert [(h.id, h.text) for h in hits] == [(h.id, h.text) for h in expected]
+    assert [h.score for h in hits] == pytest.approx([h.score for h in expected], abs=1e-4)
+    assert hits[0].embedding.shape == (384,)
+    assert len(index) == 3  # the Rejected review is not indexed
+
+
+def test_sync_index_picks_up_inserts_and_deletes(rag_repo, session, user_factory):
+    index = NumpyVectorIndex()
+    sync_index(session, index)
+    gone = session.exec(select(Review).where(Review.text == "screen is bright")).one()
+    session.delete(gone)
+    session.add(Review(text="new one", sentiment="POSITIVE", status="Accepted", feedback="",
+                       user_id=user_factory(email="rag@example.com").id, embedding=_unit(0.5, 0.5)))
+    session.commit()
+
+    added, removed = sync_index(session, index)
+
+    assert (added, removed) == (1, 1)
+    assert gone.id not in index
+
+
+def test_memmap_repository_exports_a_snapshot_on_first_search(rag_repo, session, tmp_path):
+    index = MemmapVectorIndex(str(tmp_path / "vectors"))
+    repo = NumpyRagRepository(session, index, refresh_seconds=0)
+
+    hits = repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=3)
+    expected = rag_repo.search_by_embedding(embedding=_unit(1.0, 0.0), k=3)
+
+    assert [(h.id, h.text) for h in hits] == [(h.id, h.text) for h in expected]
+    assert [h.score for h in hits] == pytest.approx([h.score for h in expected], abs=1e-4)
+    assert len(index) == 3
+    assert read_manifest(str(tmp_path / "vectors")).generation == 1
+
+
+def test_memmap_index_reconciles_rows_written_while_it_was_not_running(rag_repo, session, user_factory, tmp_path):
+    index = MemmapVectorIndex(str(tmp_path / "vectors"))
+    index.sync(session)
+    user = user_factory(email="offline@example.com")
+    added = Review(text="written elsewhere", sentiment="POSITIVE", status="Accepted", feedback="",
+                   user_id=user.id, embedding=_unit(0.0, 0.0, 1.0))
+    session.add(added)
+    removed = session.exec(select(Review).where(Review.text == "screen is bright")).one()
+    session.delete(removed)
+    session.commit()
+
+    fresh = MemmapVectorIndex(str(tmp_path / "vectors"))
+    fresh.sync(session)
+
+    assert added.id in fresh and removed.id not in fresh
+    assert len(fresh) == 3
+
+
+def test_hybrid_search_surfaces_keyword_matches_below_min_score(rag_repo, session, user_factory):
+    session.add(Review(text="the hinge cracked", sentiment="NEGATIVE", status="Accepted", feedback="",
+                       user_id=user_factory(email="rag@example.com").id, embedding=_unit(0.0, 0.0, 1.0)))
+    session.commit()
+    query = _unit(1.0, 0.0)
+
+    vector_only = rag_repo.search_by_embedding(embedding=query, k=3, min_score=0.5)
+    hybrid = rag_repo.search_hybrid(text="cracked hinges", embedding=query, k=3, min_score=0.5)
+
+    assert "the hinge cracked" not in [h.text for h in vector_only]
+    assert "the hinge cracked" in [h.text for h in hybrid]
+    assert all(h.fused_score > 0 for h in hybrid)
+    assert [h.fused_score for h in hybrid] == sorted((h.fused_score for h in hybrid), reverse=True)
+
+
+def test_numpy_hybrid_search_matches_sql_fusion(rag_repo, session):
+    repo = NumpyRagRepository(session, NumpyVectorIndex(), refresh_seconds=0)
+
+    hits = repo.search_hybrid(text="battery", embedding=_unit(0.0, 1.0), k=3)
+    expected = rag_repo.search_hybrid(text="battery", embedding=_unit(0.0, 1.0), k=3)
+
+    assert [h.id for h in hits] == [h.id for h in expected]
+    assert [h.fused_score for h in hits] == pytest.approx([h.fused_score for h in expected])
+
+
+@pytest.mark.parametrize("make_repo", [
+    lambda session: SqlModelRagRepository(session),
+    lambda session: NumpyRagRepository(session, NumpyVectorIndex(), refresh_seconds=0),
+])
+def test_batched_search_matches_one_query_at_a_time(rag_repo, session, make_repo):
+    repo = make_repo(session)
+    queries = [_unit(1.0, 0.0), _unit(0.0, 1.0), _unit(0.5, 0.5)]
+
+    batched = repo.search_many_by_embedding(embeddings=queries, k=2, min_score=0.1)
+    single = [repo.search_by_embedding(embedding=q, k=2, min_score=0.1) for q in queries]
+
+    assert [[h.id for h in hits] for hits in batched] == [[h.id for h in hits] for hits in single]
+    assert [[h.score for h in hits] for hits in batched] == [
+        pytest.approx([h.score for h in hits], abs=1e-5) for hits in single
+    ]
+
+
+@pytest.mark.parametrize("make_repo", [
+    lambda session: SqlModelRagRepository(session),
+    lambda session: NumpyRagRepository(session, NumpyVectorIndex(), refresh_seconds=0),
+])
+def test_min_score_and_max_chars_shape_the_result_set(rag_repo, session, make_repo):
+    repo = make_repo(session)
+    query = _unit(1.0, 0.0)
+
+    hits = repo.search_by_embedding(embedding=query, k=3, min_score=0.5, max_chars=7)
+    batched = repo.search_many_by_embedding(embeddings=[query], k=3, min_score=0.5, max_chars=7)
+    hybrid = repo.search_hybrid(text="screen", embedding=query, k=3, min_score=0.5, max_chars=7)
+
+    assert [h.text for h in hits] == ["battery", "battery"]
+    assert [h.text for h in batched[0]] == ["battery", "battery"]
+    assert sorted(h.text for h in hybrid) == ["battery", "battery", "screen "]
+
+
+def test_retrieve_candidates_filters_and_truncates_in_sql(rag_repo, session):
+    candidates = retrieve_candidates(session, _unit(1.0, 0.0), top_n=10, min_score=0.5, max_chars=12)
+
+    assert [c["content"] for c in candidates] == ["battery last", "battery died"]
+    assert all(c["score"] >= 0.5 for c in candidates)
+
+
+def test_inner_product_metric_matches_cosine_and_uses_the_ip_index(rag_repo, session):
+    session.exec(text(ivfflat_index_sql(lists=1, name="idx_review_embedding_ip", metric="ip")))
+    session.exec(text("SET LOCAL enable_seqscan = off"))
+    repo = SqlModelRagRepository(session, metric="ip")
+    query = [2 * x for x in _unit(1.0, 0.2)]  # not unit-norm: the repository normalizes it
+
+    hits = repo.search_by_embedding(embedding=query, k=3, min_score=0.5)
+    expected = rag_repo.search_by_embedding(embedding=query, k=3, min_score=0.5)
+    candidates = retrieve_candidates(session, query, top_n=3, min_score=0.5, metric="ip")
+
+    assert [h.id for h in hits] == [h.id for h in expected]
+    assert [h.score for h in hits] == pytest.approx([h.score for h in expected], abs=1e-4)
+    assert [c["score"] for c in candidates] == pytest.approx([h.score for h in expected], abs=1e-4)
+    plan = session.exec(
+        text(
+            "EXPLAIN SELECT id FROM review WHERE status = 'Accepted' AND embedding IS NOT NULL "
+            "ORDER BY embedding <#> CAST(:q AS vector) LIMIT 3"
+        ).bindparams(q=str(_unit(1.0, 0.0)))
+    ).all()
+    assert "idx_review_embedding_ip" in " ".join(row[0] for row in plan)
@@ -91,3 +91,18 @@ def test_stats_minimal(repo):
     assert isinstance(agg, dict)
     assert "total" in agg
     assert agg["total"] >= 3
+
+
+def test_inner_product_metric_rejects_embeddings_that_are_not_unit_norm(repo, monkeypatch):
+    from app.core.settings import get_settings
+
+    monkeypatch.setenv("RAG_ANN_METRIC", "ip")
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="unit-norm"):
+            repo.create_approved(
+                user_id=1, text="t", corrected_text=None, sentiment="positive", status="Accepted",
+                feedback="", suggestion=None, embedding=[2.0] + [0.0] * 383,
+            )
+    finally:
+        get_settings.cache_clear()
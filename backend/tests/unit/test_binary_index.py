@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import main
+from app.domain.rag.entities import AnnSearchParams
+from app.infra.db import index_maintenance
+from app.infra.db.binary_index import binary_index_sql, binary_quantized_sql, first_stage_size, hamming_distance_sql
+from app.infra.db.rag_repository import SqlModelRagRepository
+from app.services.retriever import retrieve_candidates
+
+
+def test_query_repeats_the_indexed_expression():
+    sql = binary_index_sql(m=16, ef_construction=64)
+
+    assert f"USING hnsw ({binary_quantized_sql()} bit_hamming_ops)" in sql
+    assert "WITH (m = 16, ef_construction = 64)" in sql
+    assert hamming_distance_sql("embedding", ":q").startswith(binary_quantized_sql("embedding"))
+
+
+def test_repository_rescores_a_hamming_first_stage():
+    db = MagicMock()
+    db.in_transaction.return_value = True
+    repo = SqlModelRagRepository(db, index_type="ivfflat", metric="cosine", storage="vector",
+                                 binary_rescore=True, binary_candidates=300)
+
+    repo.search_by_embedding(embedding=[1.0] * 384, k=5)
+
+    (set_stmt, settings), (search_stmt, binds) = [c.args for c in db.execute.call_args_list]
+    assert "<~> binary_quantize(CAST(:q AS vector))" in str(search_stmt)
+    assert "ORDER BY r.embedding <=> CAST(:q AS vector)" in str(search_stmt)
+    assert binds["rescore_n"] == 300
+    assert settings == {"n0": "hnsw.ef_search", "v0": "300"}
+
+
+def test_retriever_rescores_a_hamming_first_stage():
+    session = MagicMock()
+    session.in_transaction.return_value = True
+
+    retrieve_candidates(session, [1.0] * 384, top_n=5, binary_rescore=True, binary_candidates=300)
+
+    sql = str(session.exec.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "<~> binary_quantize(CAST(%(bq_query)s AS vector))" in sql
+    assert "LIMIT %(param_1)s) AS bq" in sql
+    (set_stmt, settings), = [c.args for c in session.execute.call_args_list]
+    assert settings == {"n0": "hnsw.ef_search", "v0": "300"}
+
+
+def test_startup_fails_when_the_binary_index_is_missing(monkeypatch):
+    monkeypatch.setattr(main, "settings", main.settings.model_copy(update={"binary_rescore": True}))
+    monkeypatch.setattr("app.database.engine", MagicMock())
+    monkeypatch.setattr(index_maintenance, "binary_index_valid", lambda conn: False)
+
+    with pytest.raises(RuntimeError, match="idx_review_embedding_bq"):
+        main.preload_models()
+
+
+def test_first_stage_never_exceeds_the_ef_search_cap():
+    assert first_stage_size(200, 5) == 200
+    assert first_stage_size(200, 350, max_ef_search=400) == 350
+    assert first_stage_size(5000, 5) == 1000
+    assert first_stage_size(300, 2000, max_ef_search=400) == 400
+
+    db = MagicMock()
+    db.in_transaction.return_value = True
+    repo = SqlModelRagRepository(db, index_type="ivfflat", metric="cosine", storage="vector",
+                                 binary_rescore=True, binary_candidates=300)
+    repo.search_by_embedding(embedding=[1.0] * 384, k=900, params=AnnSearchParams(ef_search=900))
+
+    (_, settings), (_, binds) = [c.args for c in db.execute.call_args_list]
+    assert settings == {"n0": "hnsw.ef_search", "v0": "400"}
+    assert binds["rescore_n"] == 400
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Listener
+
+import numpy as np
+import pytest
+
+from app.core.settings import get_settings
+from app.infra.inference.client import (
+    InferenceClient,
+    InferenceError,
+    InferenceTimeout,
+    RemoteCrossEncoder,
+    RemoteEmbedder,
+    RemoteSentimentAnalyzer,
+)
+from app.infra.inference.server import InferenceServer
+
+
+class _FakeEmbedder:
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.batches = []
+
+    def embed_many(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(self.prefix + t))] for t in texts]
+
+
+class _FakeCrossEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        self.batches.append(len(pairs))
+        return [float(len(d)) for _, d in pairs]
+
+
+@pytest.fixture
+def server():
+    embedders = {}
+    cross_encoders = {}
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="inf"), "s.sock")
+    srv = InferenceServer(
+        socket_path,
+        authkey=b"test",
+        embedder_factory=lambda prefix: embedders.setdefault(prefix, _FakeEmbedder(prefix)),
+        sentiment_batch_fn=lambda texts: [("POSITIVE", 0.9) for _ in texts],
+        cross_encoder_factory=lambda name: cross_encoders.setdefault(name, _FakeCrossEncoder()),
+        max_batch_size=8,
+        max_wait_ms=100,
+    )
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.01)
+    srv.embedders = embedders
+    srv.cross_encoders = cross_encoders
+    yield srv
+    srv.close()
+
+
+def test_remote_clients_round_trip(server):
+    client = InferenceClient(server.socket_path, authkey=b"test")
+
+    assert client.call("ping") == "pong"
+    assert RemoteEmbedder(client, query_prefix="query: ").embed("battery") == [14.0]
+    assert RemoteEmbedder(client, query_prefix="passage: ").embed_many(["a", "bb"]) == [[10.0], [11.0]]
+    assert RemoteSentimentAnalyzer(client).analyze("great") == ("POSITIVE", 0.9)
+    scores = RemoteCrossEncoder(client, "ce").predict([("q", "abc"), ("q", "a")])
+    assert isinstance(scores, np.ndarray)
+    assert scores.tolist() == [3.0, 1.0]
+
+
+def test_concurrent_embeds_from_many_connections_share_a_batch(server):
+    client = InferenceClient(server.socket_path, authkey=b"test")
+    embedder = RemoteEmbedder(client, query_prefix="query: ")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(embedder.embed, [f"text {i}" for i in range(8)]))
+
+    assert results == [[float(len(f"query: text {i}"))] for i in range(8)]
+    assert len(server.embedders["query: "].batches) < 8
+
+
+def test_server_errors_are_raised_on_the_client(server):
+    client = InferenceClient(server.socket_path, authkey=b"test")
+
+    with pytest.raises(InferenceError, match="Unknown inference op"):
+        client.call("nope")
+    assert client.call("ping") == "pong"
+
+
+def test_concurrent_reranks_share_a_cross_encoder_pass(server):
+    client = InferenceClient(server.socket_path, authkey=b"test")
+    ce = RemoteCrossEncoder(client, "ce")
+    requests = [[("q", "a" * (i + 1)), ("q", "b")] for i in range(6)]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(ce.predict, requests))
+
+    assert [r.tolist() for r in results] == [[float(i + 1), 1.0] for i in range(6)]
+    assert len(server.cross_encoders["ce"].batches) < 6
+
+
+def test_socket_is_private_to_the_server_user(server):
+    assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+    assert os.stat(os.path.dirname(server.socket_path)).st_mode & 0o777 == 0o700
+
+
+def test_shared_socket_directory_is_refused(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    srv = InferenceServer(str(shared / "s.sock"), authkey=b"test", sentiment_batch_fn=lambda texts: [])
+
+    with pytest.raises(RuntimeError, match="mode 0700"):
+        srv.serve_forever()
+
+
+def test_missing_authkey_is_an_error(monkeypatch):
+    monkeypatch.delenv("INFERENCE_AUTHKEY", raising=False)
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="INFERENCE_AUTHKEY"):
+            InferenceClient("/nonexistent.sock")
+    finally:
+        get_settings.cache_clear()
+
+
+def test_a_hung_server_times_out_and_the_connection_is_dropped(tmp_path):
+    socket_path = str(tmp_path / "hung.sock")
+    listener = Listener(socket_path, family="AF_UNIX", authkey=b"test")
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True).start()
+    client = InferenceClient(socket_path, authkey=b"test", timeout=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(InferenceTimeout, match="ping"):
+        client.call("ping")
+
+    assert time.monotonic() - start < 5
+    assert client._pool.empty()
+    listener.close()
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.infra.embeddings.micro_batching import MicroBatchingEmbedder
+
+
+class _RecordingEmbedder:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def embed(self, text):
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_concurrent_embeds_are_merged_into_one_batch():
+    inner = _RecordingEmbedder()
+    batcher = MicroBatchingEmbedder(inner, max_batch_size=8, max_wait_ms=200)
+    texts = [f"review {'x' * (i + 1)}" for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher.embed, texts))
+
+    assert results == [[float(len(t)), 1.0] for t in texts]
+    assert len(inner.batches) == 1
+    assert sorted(inner.batches[0]) == sorted(texts)
+
+    stats = batcher.stats()
+    assert stats.batches == 1
+    assert stats.items == 8
+    assert stats.max_batch_size == 8
+    assert stats.avg_batch_size == 8.0
+    assert stats.max_queue_wait_ms >= 0.0
+
+
+def test_flushes_on_max_wait_without_full_batch():
+    inner = _RecordingEmbedder()
+    batcher = MicroBatchingEmbedder(inner, max_batch_size=32, max_wait_ms=1)
+
+    assert batcher.embed("first") == [5.0, 1.0]
+    assert batcher.embed("second") == [6.0, 1.0]
+    assert inner.batches == [["first"], ["second"]]
+
+
+def test_blank_text_skips_the_queue():
+    inner = _RecordingEmbedder()
+    batcher = MicroBatchingEmbedder(inner, max_batch_size=4, max_wait_ms=1)
+
+    assert batcher.embed("   ") == []
+    assert inner.batches == []
+
+
+def test_errors_are_propagated_to_every_caller():
+    class _Broken:
+        def embed_many(self, texts):
+            raise RuntimeError("model unavailable")
+
+    batcher = MicroBatchingEmbedder(_Broken(), max_batch_size=4, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.embed("some review")
+
+
+def test_short_batch_results_fail_every_caller():
+    class _Short:
+        def embed_many(self, texts):
+            return [[1.0]] * (len(texts) - 1)
+
+    batcher = MicroBatchingEmbedder(_Short(), max_batch_size=4, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="returned 0 results for 1 items"):
+        batcher.embed("some review")
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.model_registry import ModelRegistry
+
+
+class _Handle:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_get_loads_each_key_once_and_shares_the_handle():
+    registry = ModelRegistry()
+    calls = []
+    lock = threading.Lock()
+
+    def loader():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return _Handle("e5")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        handles = list(pool.map(lambda _: registry.get("e5", backend="test", device="cpu", loader=loader), range(8)))
+
+    assert len(calls) == 1
+    assert all(h is handles[0] for h in handles)
+
+    [stats] = registry.stats()
+    assert (stats.name, stats.device, stats.backend) == ("e5", "cpu", "test")
+    assert stats.hits == 8
+    assert stats.load_seconds >= 0.05
+
+
+def test_device_and_backend_are_part_of_the_key():
+    registry = ModelRegistry()
+
+    cpu = registry.get("m", backend="test", device="cpu", loader=lambda: _Handle("cpu"))
+    cuda = registry.get("m", backend="test", device="cuda", loader=lambda: _Handle("cuda"))
+    onnx = registry.get("m", backend="onnx", device="cpu", loader=lambda: _Handle("onnx"))
+
+    assert {cpu.name, cuda.name, onnx.name} == {"cpu", "cuda", "onnx"}
+    assert len(registry.stats()) == 3
+
+
+def test_reports_parameter_memory_for_torch_modules():
+    torch = pytest.importorskip("torch")
+    registry = ModelRegistry()
+
+    registry.get("linear", backend="test", loader=lambda: torch.nn.Linear(10, 10))
+
+    [stats] = registry.stats()
+    assert stats.memory_bytes == (10 * 10 + 10) * 4
+
+
+def test_evicts_least_recently_used_models_over_budget():
+    torch = pytest.importorskip("torch")
+    registry = ModelRegistry(max_bytes=1000, min_idle_seconds=0)
+
+    registry.get("a", backend="test", loader=lambda: torch.nn.Linear(10, 10))  # 440 bytes
+    registry.get("b", backend="test", loader=lambda: torch.nn.Linear(10, 10))
+    registry.get("a", backend="test", loader=lambda: pytest.fail("should be cached"))
+    registry.get("c", backend="test", loader=lambda: torch.nn.Linear(10, 10))
+
+    assert sorted(s.name for s in registry.stats()) == ["a", "c"]
+    assert registry.total_bytes() <= 1000
+
+
+def test_unknown_backend_without_loader_raises():
+    with pytest.raises(ValueError):
+        ModelRegistry().get("m", backend="nope")
@@ -0,0 +1,102 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core import model_registry
+from app.core.model_snapshots import (
+    MANIFEST_FILE,
+    configured_models,
+    load_manifest,
+    prefetch_models,
+    resolve_model,
+    verify_snapshots,
+)
+
+
+def _write_snapshot(root, name, safetensors=True):
+    path = root / name.replace("/", "__")
+    path.mkdir(parents=True)
+    manifest_path = root / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"version": 1, "models": {}}
+    manifest["models"][name] = {"path": path.name, "revision": "abc123", "safetensors": safetensors}
+    manifest_path.write_text(json.dumps(manifest))
+    return path
+
+
+def test_configured_models_include_rerankers_without_duplicates(monkeypatch):
+    monkeypatch.setenv("EMBEDDINGS_MODEL_NAME", "intfloat/multilingual-e5-small")
+    monkeypatch.setenv("SENTIMENT_MODEL_NAME", "distilbert-sst2")
+    monkeypatch.setenv("RAG_RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    monkeypatch.setenv("RAG_RERANKER_SHADOW_MODEL", "cross-encoder/shadow")
+
+    with patch("app.core.model_snapshots.get_settings") as settings:
+        settings.return_value.reranker_preload = ["cross-encoder/ms-marco-MiniLM-L-6-v2"]
+        names = configured_models()
+
+    assert names == [
+        "intfloat/multilingual-e5-small",
+        "distilbert-sst2",
+        "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        "cross-encoder/shadow",
+    ]
+
+
+@patch("app.core.model_snapshots.snapshot_download")
+@patch("app.core.model_snapshots.HfApi")
+def test_prefetch_pins_revisions_and_skips_pickled_weights(mock_api, mock_download, tmp_path):
+    mock_api.return_value.model_info.side_effect = [
+        SimpleNamespace(sha="sha-e5", siblings=[SimpleNamespace(rfilename="model.safetensors")]),
+        SimpleNamespace(sha="sha-old", siblings=[SimpleNamespace(rfilename="pytorch_model.bin")]),
+    ]
+
+    snapshots = prefetch_models(["intfloat/e5", "org/old@v1"], str(tmp_path))
+
+    assert mock_api.return_value.model_info.call_args_list[1].kwargs == {"revision": "v1"}
+    first, second = mock_download.call_args_list
+    assert first.kwargs["revision"] == "sha-e5"
+    assert first.kwargs["local_dir"] == str(tmp_path / "intfloat__e5")
+    assert "*.bin" in first.kwargs["ignore_patterns"]
+    assert "*.bin" not in second.kwargs["ignore_patterns"]
+
+    manifest = load_manifest(str(tmp_path))
+    assert manifest == snapshots
+    assert manifest["intfloat/e5"].revision == "sha-e5"
+    assert manifest["intfloat/e5"].safetensors is True
+    assert manifest["org/old"].safetensors is False
+
+
+def test_resolve_model_returns_absolute_snapshot_path(tmp_path):
+    path = _write_snapshot(tmp_path, "cross-encoder/ms-marco")
+
+    snapshot = resolve_model("cross-encoder/ms-marco", snapshot_dir=str(tmp_path), offline=True)
+
+    assert snapshot.path == str(path)
+    assert snapshot.revision == "abc123"
+    assert resolve_model("other/model", snapshot_dir=str(tmp_path), offline=False) is None
+
+
+def test_offline_mode_refuses_models_without_snapshot(tmp_path):
+    _write_snapshot(tmp_path, "intfloat/e5")
+
+    with pytest.raises(RuntimeError, match="no local snapshot"):
+        resolve_model("cross-encoder/ms-marco", snapshot_dir=str(tmp_path), offline=True)
+
+    assert verify_snapshots(["intfloat/e5", "cross-encoder/ms-marco"], snapshot_dir=str(tmp_path)) == [
+        "cross-encoder/ms-marco"
+    ]
+
+
+def test_registry_loaders_open_snapshots_by_path_with_safetensors(tmp_path):
+    path = _write_snapshot(tmp_path, "cross-encoder/ms-marco")
+
+    with patch("app.core.model_snapshots.get_settings") as settings, \
+         patch("sentence_transformers.CrossEncoder") as cross_encoder:
+        settings.return_value.model_snapshot_dir = str(tmp_path)
+        settings.return_value.model_offline = True
+        model_registry._load_cross_encoder("cross-encoder/ms-marco", "cpu")
+
+    args, kwargs = cross_encoder.call_args
+    assert args == (str(path),)
+    assert kwargs["automodel_args"] == {"local_files_only": True, "use_safetensors": True}
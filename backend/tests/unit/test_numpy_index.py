@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.infra.vector.indexing import IndexingAdminRepository, IndexingReviewRepository
+from app.infra.vector.numpy_index import NumpyRagRepository, NumpyVectorIndex
+
+
+def _random_unit(n, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    mat = rng.standard_normal((n, dim)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def test_search_matches_brute_force_cosine():
+    vecs = _random_unit(500)
+    index = NumpyVectorIndex(initial_capacity=16)
+    index.upsert_many(list(range(1000, 1500)), vecs * 3.0)  # unnormalized input
+
+    query = _random_unit(1, seed=1)[0]
+    hits = index.search(query, k=10)
+
+    expected = np.argsort(-(vecs @ query))[:10] + 1000
+    assert [i for i, _ in hits] == expected.tolist()
+    assert hits[0][1] == pytest.approx(float(vecs[expected[0] - 1000] @ query), abs=1e-5)
+    assert len(index) == 500
+
+
+def test_remove_keeps_rows_contiguous_and_ids_consistent():
+    vecs = _random_unit(4)
+    index = NumpyVectorIndex(initial_capacity=4)
+    index.upsert_many([1, 2, 3, 4], vecs)
+
+    assert index.remove(2)
+    assert not index.remove(2)
+
+    assert sorted(index.ids().tolist()) == [1, 3, 4]
+    np.testing.assert_allclose(index.vector(4), vecs[3], atol=1e-6)
+    assert index.search(vecs[3], k=1)[0][0] == 4
+
+
+def test_min_score_is_applied_before_top_k():
+    index = NumpyVectorIndex(dim=2)
+    index.upsert_many([1, 2, 3], np.array([[1, 0], [0.8, 0.6], [0, 1]], dtype=np.float32))
+
+    hits = index.search([1, 0], k=3, min_score=0.5)
+
+    assert [i for i, _ in hits] == [1, 2]
+
+
+def test_upsert_replaces_existing_vector():
+    index = NumpyVectorIndex(dim=2)
+    index.upsert(1, [1, 0], text="first")
+    index.upsert(1, [0, 1])
+
+    assert len(index) == 1
+    assert index.search([0, 1], k=1)[0][1] == pytest.approx(1.0)
+    assert index.cached_text(1) == "first"
+
+
+def test_indexing_repositories_follow_saves_and_deletes():
+    index = NumpyVectorIndex(dim=2)
+
+    class _Reviews:
+        def create_approved(self, **fields):
+            return SimpleNamespace(id=7, status="Accepted", text=fields["text"])
+
+        def delete(self, review_id):
+            return True
+
+        def list_by_user(self, *, user_id):
+            return ["delegated"]
+
+    class _Admin:
+        def delete_review(self, review_id):
+            return True
+
+    reviews = IndexingReviewRepository(_Reviews(), index)
+    reviews.create_approved(text="nice", embedding=[1.0, 0.0])
+    assert 7 in index and index.cached_text(7) == "nice"
+    assert reviews.list_by_user(user_id=1) == ["delegated"]
+
+    IndexingAdminRepository(_Admin(), index).delete_review(7)
+    assert 7 not in index
+
+
+def test_listener_errors_do_not_fail_committed_writes():
+    class _Broken:
+        def upsert(self, review_id, embedding, text=None):
+            raise RuntimeError("index unavailable")
+
+        def remove(self, review_id):
+            raise RuntimeError("index unavailable")
+
+    class _Reviews:
+        def create_approved(self, **fields):
+            return SimpleNamespace(id=7, status="Accepted", text=fields["text"])
+
+        def delete(self, review_id):
+            return True
+
+    reviews = IndexingReviewRepository(_Reviews(), _Broken())
+
+    assert reviews.create_approved(text="nice", embedding=[1.0, 0.0]).id == 7
+    assert reviews.delete(7) is True
+
+
+def test_concurrent_requests_share_one_sync():
+    class _SlowIndex(NumpyVectorIndex):
+        syncs = 0
+
+        def sync(self, db):
+            type(self).syncs += 1
+            time.sleep(0.05)
+            self.synced_at = time.monotonic()
+
+    index = _SlowIndex(dim=3)
+    start = threading.Barrier(8)
+
+    def refresh(_):
+        start.wait()
+        NumpyRagRepository(db=None, index=index, refresh_seconds=60)._ensure_fresh()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(refresh, range(8)))
+
+    assert _SlowIndex.syncs == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from app.infra.embeddings.onnx_embedder import OnnxSentenceEmbedder, export_onnx_model
+
+
+_WORDS = ["battery", "lasts", "all", "day", "screen", "is", "bright", "query", ":", "passage", "died"]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny-bert")
+    vocab = path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *_WORDS]))
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(str(path))
+
+    config = BertConfig(
+        vocab_size=5 + len(_WORDS),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    BertModel(config).save_pretrained(str(path))
+    return path
+
+
+def test_onnx_embedder_matches_sentence_transformer(tiny_model_dir, tmp_path):
+    from sentence_transformers import SentenceTransformer
+
+    texts = ["battery lasts all day", "screen is bright", "battery died"]
+    reference = SentenceTransformer(str(tiny_model_dir), device="cpu").encode(
+        [f"query: {t}" for t in texts], normalize_embeddings=True
+    )
+
+    embedder = OnnxSentenceEmbedder(
+        model_name=str(tiny_model_dir),
+        query_prefix="query: ",
+        quantize=False,
+        onnx_dir=str(tmp_path / "onnx"),
+    )
+    got = np.asarray(embedder.embed_many(texts), dtype=np.float32)
+
+    cos = np.sum(reference * got, axis=1)
+    assert got.shape == (3, 32)
+    assert np.all(cos >= 0.99)
+    assert embedder.embed(texts[0]) == pytest.approx(got[0].tolist(), abs=1e-5)
+
+
+def test_onnx_embedder_quantized_model_keeps_unit_norm(tiny_model_dir, tmp_path):
+    embedder = OnnxSentenceEmbedder(
+        model_name=str(tiny_model_dir),
+        query_prefix="query: ",
+        quantize=True,
+        onnx_dir=str(tmp_path / "onnx"),
+    )
+
+    vectors = embedder.embed_many(["battery lasts all day", "", "screen is bright"])
+
+    assert vectors[1] == []
+    assert np.linalg.norm(vectors[0]) == pytest.approx(1.0, abs=1e-4)
+    assert (tmp_path / "onnx" / "model.int8.onnx").exists()
+
+
+def test_concurrent_exports_publish_complete_models_once(tiny_model_dir, tmp_path, monkeypatch):
+    import onnxruntime.quantization as quantization
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    real = quantization.quantize_dynamic
+    monkeypatch.setattr(quantization, "quantize_dynamic", lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    out_dir = tmp_path / "onnx"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        paths = list(pool.map(lambda _: export_onnx_model(str(tiny_model_dir), out_dir, quantize=True), range(4)))
+
+    assert paths == [out_dir / "model.int8.onnx"] * 4
+    assert len(calls) == 1
+    assert sorted(p.name for p in out_dir.glob("*.onnx")) == ["model.int8.onnx", "model.onnx"]
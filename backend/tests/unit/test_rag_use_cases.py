@@ -6,7 +6,8 @@ from fastapi.testclient import TestClient
 
 from app.main import app
 from app.domain.rag.use_cases import SearchRag
-from app.domain.rag.entities import RagHit
+from app.domain.rag.entities import AnnSearchParams, RagHit
+from app.domain.rag.fusion import reciprocal_rank_fusion
 from app.api.v1.deps import get_rag_uc
 
 
@@ -23,13 +24,33 @@ class _FakeEmbedder:
 class _FakeRepo:
     items: List[RagHit]
 
-    def search_by_embedding(self, *, embedding: List[float], k: int = 5, min_score: Optional[float] = None) -> List[RagHit]:
+    def search_by_embedding(
+        self,
+        *,
+        embedding: List[float],
+        k: int = 5,
+        min_score: Optional[float] = None,
+        with_embeddings: bool = False,
+        params: Optional[AnnSearchParams] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[RagHit]:
+        self.last_params = params
         out = self.items[:]
         if min_score is not None:
             out = [h for h in out if h.score >= min_score]
+        if max_chars is not None:
+            out = [RagHit(id=h.id, text=h.text[:max_chars], score=h.score) for h in out]
         out.sort(key=lambda h: h.score, reverse=True)
         return out[:k]
 
+    def search_many_by_embedding(self, *, embeddings, k=5, min_score=None, params=None, max_chars=None) -> List[List[RagHit]]:
+        self.batches = getattr(self, "batches", []) + [len(embeddings)]
+        return [self.search_by_embedding(embedding=e, k=k, min_score=min_score, max_chars=max_chars) for e in embeddings]
+
+    def search_hybrid(self, *, text: str, embedding: List[float], k: int = 5, **kwargs) -> List[RagHit]:
+        self.last_text = text
+        return self.items[:k]
+
 
 @pytest.fixture
 def client():
@@ -71,3 +92,83 @@ def test_rag_search_empty_text_returns_empty(client):
     r = client.post(f"{BASE}/search", json={"text": "   "})
     assert r.status_code == 200
     assert r.json()["results"] == []
+
+
+def test_search_rag_returns_query_embedding():
+    uc = SearchRag(embedder=_FakeEmbedder(), repo=_FakeRepo([RagHit(id=1, text="doc", score=0.9)]))
+
+    result = uc.execute(text="my query", k=1)
+
+    assert result.query_embedding == [0.1, 0.2, 0.3]
+    assert [h.id for h in result.hits] == [1]
+
+
+def test_search_rag_forwards_search_params():
+    repo = _FakeRepo([RagHit(id=1, text="doc", score=0.9)])
+    uc = SearchRag(embedder=_FakeEmbedder(), repo=repo)
+
+    uc.execute(text="my query", k=1, params=AnnSearchParams(ef_search=200))
+
+    assert repo.last_params == AnnSearchParams(ef_search=200)
+
+
+def test_search_params_override_only_the_knobs_they_set():
+    base = AnnSearchParams(probes=15, ef_search=40, iterative_scan="strict_order")
+
+    merged = base.merged(AnnSearchParams(ef_search=100))
+
+    assert merged == AnnSearchParams(probes=15, ef_search=100, iterative_scan="strict_order")
+    assert base.merged(None) is base
+    with pytest.raises(ValueError):
+        AnnSearchParams(iterative_scan="fast")
+
+
+def test_hybrid_mode_keeps_the_fused_order():
+    items = [
+        RagHit(id=1, text="keyword match", score=0.55, fused_score=0.032),
+        RagHit(id=2, text="nearest vector", score=0.91, fused_score=0.016),
+    ]
+    repo = _FakeRepo(items)
+    uc = SearchRag(embedder=_FakeEmbedder(), repo=repo, mode="hybrid")
+
+    result = uc.execute(text="  battery died  ", k=2)
+
+    assert repo.last_text == "battery died"
+    assert [h.id for h in result.hits] == [1, 2]
+    assert [h.id for h in uc.execute(text="q", k=2, mode="vector").hits] == [2, 1]
+    with pytest.raises(ValueError):
+        uc.execute(text="q", mode="bm25")
+
+
+def test_reciprocal_rank_fusion_rewards_ids_in_both_lists():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+
+    assert [i for i, _ in fused] == [3, 1, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_execute_many_embeds_and_searches_each_chunk_once():
+    class _BatchEmbedder(_FakeEmbedder):
+        calls: List[int] = []
+
+        def embed_many(self, texts):
+            self.calls.append(len(texts))
+            return [self.embed(t) for t in texts]
+
+    embedder = _BatchEmbedder()
+    repo = _FakeRepo([RagHit(id=1, text="doc", score=0.9)])
+    uc = SearchRag(embedder=embedder, repo=repo)
+
+    results = list(uc.execute_many(texts=["a", "", "b", "c", "d"], k=1, chunk_size=3))
+
+    assert [r.query for r in results] == ["a", "", "b", "c", "d"]
+    assert [len(r.hits) for r in results] == [1, 0, 1, 1, 1]
+    assert embedder.calls == [2, 2]
+    assert repo.batches == [2, 2]
+
+
+def test_rag_search_truncates_to_max_chars(client):
+    r = client.post(f"{BASE}/search", json={"text": "q", "k": 1, "max_chars": 3})
+
+    assert r.status_code == 200, r.text
+    assert [hit["text"] for hit in r.json()["results"]] == ["doc"]
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from app.services import reranker
+
+
+class _FakeCrossEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        self.calls.append((list(pairs), batch_size))
+        return [float(len(content)) for _, content in pairs]
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    ce = _FakeCrossEncoder()
+    monkeypatch.setattr(reranker, "get_reranker", lambda model_name: ce)
+    reranker.get_score_cache.cache_clear()
+    yield ce
+    reranker.get_score_cache.cache_clear()
+
+
+def _docs():
+    return [
+        {"id": 1, "content": "short", "score": 0.9},
+        {"id": 2, "content": "a much longer review text", "score": 0.8},
+        {"id": 3, "content": "medium text", "score": 0.7},
+        {"id": 4, "content": "x", "score": 0.6},
+    ]
+
+
+def test_rerank_returns_topk_by_score(cross_encoder):
+    ranked = reranker.rerank("battery", _docs(), model_name="ce", topk=2)
+
+    assert [d["id"] for d in ranked] == [2, 3]
+    assert ranked[0]["rerank_score"] == float(len("a much longer review text"))
+    assert ranked[0]["score"] == 0.8
+
+
+def test_pairs_are_sorted_by_length_and_batched(cross_encoder, monkeypatch):
+    monkeypatch.setattr(reranker, "RERANK_BATCH_SIZE", 2)
+
+    reranker.rerank("battery", _docs(), model_name="ce", topk=4)
+
+    [(pairs, batch_size)] = cross_encoder.calls
+    assert [content for _, content in pairs] == ["x", "short", "medium text", "a much longer review text"]
+    assert batch_size == 2
+
+
+def test_scores_are_cached_per_query_and_review_id(cross_encoder):
+    reranker.rerank("battery", _docs()[:2], model_name="ce", topk=2)
+    reranker.rerank("battery", _docs(), model_name="ce", topk=2)
+    reranker.rerank("battery", _docs(), model_name="other", topk=2)
+
+    assert [len(pairs) for pairs, _ in cross_encoder.calls] == [2, 2, 4]
+    assert [content for _, content in cross_encoder.calls[1][0]] == ["x", "medium text"]
+
+
+def test_cached_scores_follow_the_review_text(cross_encoder):
+    reranker.rerank("battery", _docs()[:1], model_name="ce", topk=1)
+    edited = [{"id": 1, "content": "edited review text", "score": 0.9}]
+
+    ranked = reranker.rerank("battery", edited, model_name="ce", topk=1)
+
+    assert len(cross_encoder.calls) == 2
+    assert ranked[0]["rerank_score"] == float(len("edited review text"))
+
+
+def test_rerank_empty_docs(cross_encoder):
+    assert reranker.rerank("battery", [], model_name="ce") == []
+    assert cross_encoder.calls == []
+
+
+def test_get_reranker_is_keyed_by_model_name(monkeypatch):
+    from app.core.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    monkeypatch.setattr(reranker, "get_model_registry", lambda: registry)
+    monkeypatch.setattr(
+        "app.core.model_registry._LOADERS",
+        {"cross-encoder": lambda name, device: _FakeCrossEncoder()},
+    )
+
+    a = reranker.get_reranker("cross-encoder/a")
+    b = reranker.get_reranker("cross-encoder/b")
+
+    assert a is not b
+    assert reranker.get_reranker("cross-encoder/a") is a
+
+
+def test_preload_warms_up_each_model_and_records_latency(monkeypatch):
+    encoders = {}
+    monkeypatch.setattr(reranker, "get_reranker", lambda name: encoders.setdefault(name, _FakeCrossEncoder()))
+    monkeypatch.setattr(reranker, "_latency", {})
+    reranker.get_score_cache.cache_clear()
+
+    warmed = reranker.preload_rerankers(["ce-small", "ce-large", "ce-small", ""])
+    reranker.rerank("battery", _docs(), model_name="ce-small", topk=1)
+
+    assert list(warmed) == ["ce-small", "ce-large"]
+    assert all(len(ce.calls) >= 1 for ce in encoders.values())
+    stats = {s.model_name: s for s in reranker.reranker_stats()}
+    assert stats["ce-small"].calls == 1
+    assert stats["ce-small"].pairs == 4
+    assert stats["ce-small"].warmup_ms is not None
+    assert stats["ce-large"].calls == 0
+    reranker.get_score_cache.cache_clear()
+
+
+def test_shadow_rerank_drops_samples_when_the_queue_is_full(monkeypatch):
+    release = threading.Event()
+    started = []
+    monkeypatch.setattr(reranker, "_shadow_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(reranker, "_shadow_dropped", 0)
+    monkeypatch.setattr(reranker, "_shadow_compare", lambda *args: (started.append(args), release.wait(5)))
+
+    reranker.submit_shadow_rerank("q", _docs(), "ce-shadow", 1, [])
+    reranker.submit_shadow_rerank("q", _docs(), "ce-shadow", 1, [])
+    reranker.submit_shadow_rerank("q", _docs(), "ce-shadow", 1, [])
+    release.set()
+
+    assert reranker.shadow_dropped() == 2
+    reranker._shadow_pool.submit(lambda: None).result()
+    assert len(started) == 1
@@ -0,0 +1,112 @@
+import numpy as np
+
+from app.core.result_cache import ResultCache, cache_key
+from app.infra.embeddings.cached import CachedEmbedder
+from app.services.sentiment_analysis_service import CachedSentimentAnalyzer
+
+
+def test_cache_key_ignores_whitespace_differences():
+    assert cache_key("embed", "e5", "  great   battery\n") == cache_key("embed", "e5", "great battery")
+    assert cache_key("embed", "e5", "great battery") != cache_key("embed", "other", "great battery")
+
+
+def test_lru_evicts_oldest_and_tracks_memory():
+    cache = ResultCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", b"1234")
+    cache.set("b", b"12")
+    assert cache.get("a") == b"1234"
+    cache.set("c", b"1")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    stats = cache.stats()
+    assert stats.entries == 2
+    assert stats.memory_bytes == 5
+    assert stats.hits == 2
+    assert stats.misses == 1
+    assert stats.hit_ratio == 2 / 3
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    from app.core import result_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    cache.set("k", b"v")
+
+    now[0] += 61
+    assert cache.get("k") is None
+    assert cache.stats().entries == 0
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(disk_path=path).set("k", b"value")
+
+    restarted = ResultCache(disk_path=path)
+
+    assert restarted.get("k") == b"value"
+    assert restarted.stats().disk_hits == 1
+
+
+def test_disk_tier_is_trimmed_on_startup(tmp_path, monkeypatch):
+    from app.core import result_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(max_entries=10, ttl_seconds=60, disk_path=path)
+    cache.set("old", b"x")
+    now[0] += 50
+    for i in range(3):
+        now[0] += 1
+        cache.set(f"k{i}", b"x")
+
+    now[0] += 20
+    restarted = ResultCache(max_entries=2, ttl_seconds=60, disk_path=path)
+
+    keys = [k for (k,) in restarted._disk.execute("SELECT key FROM result_cache ORDER BY key")]
+    assert keys == ["k1", "k2"]
+
+
+class _CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text):
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        self.calls += len(texts)
+        return [np.full(4, len(t), dtype=np.float32).tolist() for t in texts]
+
+
+def test_cached_embedder_reuses_float32_vectors():
+    inner = _CountingEmbedder()
+    embedder = CachedEmbedder(inner, ResultCache(), namespace="e5:query: ")
+
+    first = embedder.embed("battery lasts")
+    second = embedder.embed("  battery   lasts ")
+    many = embedder.embed_many(["battery lasts", "new text", ""])
+
+    assert first == second == [13.0] * 4
+    assert many == [[13.0] * 4, [8.0] * 4, []]
+    assert inner.calls == 2
+
+
+def test_cached_sentiment_analyzer_round_trips_label_and_score():
+    class _Inner:
+        calls = 0
+
+        def analyze(self, text):
+            self.calls += 1
+            return "NEGATIVE", 0.9987654321
+
+    inner = _Inner()
+    analyzer = CachedSentimentAnalyzer(inner, ResultCache(), model_name="distilbert")
+
+    assert analyzer.analyze("cold food") == ("NEGATIVE", 0.9987654321)
+    assert analyzer.analyze("cold  food") == ("NEGATIVE", 0.9987654321)
+    assert analyzer.analyze_batch(["cold food", "late"]) == [("NEGATIVE", 0.9987654321)] * 2
+    assert inner.calls == 2
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.domain.rag.entities import AnnSearchParams, RagHit
+from app.infra.vector.indexing import IndexingAdminRepository, IndexingReviewRepository
+from app.infra.vector.retrieval_cache import CachedRagRepository, RetrievalCache
+
+
+def _unit(v):
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def _near(q, cos, rng):
+    """A unit vector at exactly ``cos`` cosine from ``q``."""
+    r = rng.standard_normal(q.shape).astype(np.float32)
+    r -= (r @ q) * q
+    r /= np.linalg.norm(r)
+    return _unit(cos * q + np.sqrt(1 - cos**2) * r)
+
+
+class _CountingRepo:
+    def __init__(self):
+        self.calls = 0
+        self.batch_calls = []
+
+    def search_by_embedding(self, *, embedding, k=5, min_score=None, with_embeddings=False, params=None, max_chars=None):
+        self.calls += 1
+        return [RagHit(id=self.calls, text="doc", score=0.9)]
+
+    def search_many_by_embedding(self, *, embeddings, k=5, min_score=None, params=None, max_chars=None):
+        self.batch_calls.append(len(embeddings))
+        return [[RagHit(id=100 + i, text="doc", score=0.9)] for i in range(len(embeddings))]
+
+    def search_hybrid(self, *, text, embedding, **kwargs):
+        self.calls += 1
+        return [RagHit(id=self.calls, text=text, score=0.5, fused_score=0.03)]
+
+
+def test_reuses_results_within_the_cosine_tolerance():
+    rng = np.random.default_rng(0)
+    cache = RetrievalCache(min_cosine=0.995, max_entries=1000)
+    found = 0
+    for i in range(300):
+        q = _unit(rng.standard_normal(384))
+        cache.put(q, "s", [RagHit(id=i, text="t", score=1.0)])
+        hit = cache.get(_near(q, 0.996, rng), "s")
+        found += hit is not None and hit[0].id == i
+        assert cache.get(_near(q, 0.98, rng), "s") is None
+
+    # Multi-probe catches neighbours that fall across a hyperplane.
+    assert found >= 297
+    stats = cache.stats()
+    assert stats.near_hits == stats.hits == found
+    assert stats.hit_ratio == pytest.approx(found / 600)
+
+
+def test_scope_ttl_and_eviction_bound_the_cache(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.infra.vector.retrieval_cache.time.monotonic", lambda: clock[0])
+    cache = RetrievalCache(dim=4, max_entries=2, ttl_seconds=10)
+    a, b, c = _unit([1, 0, 0, 0]), _unit([0, 1, 0, 0]), _unit([0, 0, 1, 0])
+    cache.put(a, "k=5", [])
+
+    assert cache.get(a, "k=8") is None
+    clock[0] += 11
+    assert cache.get(a, "k=5") is None
+    assert cache.stats().expired == 1
+
+    for v in (a, b, c):
+        cache.put(v, "k=5", [])
+    assert cache.stats().entries == 2
+    assert cache.get(a, "k=5") is None
+
+
+def test_saves_and_admin_deletes_invalidate_the_cache():
+    cache = RetrievalCache(dim=4)
+    repo = CachedRagRepository(_CountingRepo(), cache)
+    q = _unit([1, 2, 3, 4]).tolist()
+    entity = SimpleNamespace(id=7, status="Accepted", text="new")
+    reviews = IndexingReviewRepository(SimpleNamespace(create_approved=lambda **kw: entity), cache)
+    admin = IndexingAdminRepository(SimpleNamespace(delete_review=lambda review_id: True), cache)
+
+    first = repo.search_by_embedding(embedding=q, k=3)
+    assert repo.search_by_embedding(embedding=q, k=3) == first
+
+    reviews.create_approved(embedding=[0.1] * 4, text="new")
+    assert repo.search_by_embedding(embedding=q, k=3) != first
+    admin.delete_review(7)
+    repo.search_by_embedding(embedding=q, k=3)
+
+    assert repo.inner.calls == 3
+    assert cache.stats().invalidations == 2
+    assert cache.stats().version == 2
+
+
+def test_cached_repository_keys_on_params_text_and_batches_only_misses():
+    cache = RetrievalCache(dim=4)
+    repo = CachedRagRepository(_CountingRepo(), cache)
+    q, other = _unit([1, 0, 0, 0]).tolist(), _unit([0, 1, 0, 0]).tolist()
+
+    repo.search_by_embedding(embedding=q, k=3, params=AnnSearchParams(probes=5))
+    repo.search_by_embedding(embedding=q, k=3, params=AnnSearchParams(probes=20))
+    repo.search_hybrid(text="Battery  died", embedding=q, k=3)
+    repo.search_hybrid(text="battery died", embedding=q, k=3)
+    repo.search_hybrid(text="screen", embedding=q, k=3)
+    assert repo.inner.calls == 4
+
+    repo.search_many_by_embedding(embeddings=[q, other], k=3)
+    out = repo.search_many_by_embedding(embeddings=[q, other, _unit([0, 0, 1, 0]).tolist()], k=3)
+    assert repo.inner.batch_calls == [2, 1]
+    assert [hits[0].id for hits in out] == [100, 101, 100]
+
+
+def test_results_computed_across_an_invalidation_are_not_stored():
+    cache = RetrievalCache(dim=4)
+    q = _unit([1, 0, 0, 0])
+    version = cache.version
+    cache.invalidate()  # a save lands while the search is running
+
+    cache.put(q, "s", [], version=version)
+
+    assert cache.stats().entries == 0
+
+
+def test_invalidation_from_another_process_clears_the_cache(tmp_path):
+    path = str(tmp_path / "cache.gen")
+    worker, other = RetrievalCache(dim=4, generation_path=path), RetrievalCache(dim=4, generation_path=path)
+    repo = CachedRagRepository(_CountingRepo(), worker)
+    q = _unit([1, 2, 3, 4]).tolist()
+
+    repo.search_by_embedding(embedding=q, k=3)
+    repo.search_by_embedding(embedding=q, k=3)
+    assert repo.inner.calls == 1
+
+    other.invalidate()  # e.g. an admin delete handled by another worker
+    repo.search_by_embedding(embedding=q, k=3)
+    assert repo.inner.calls == 2
+
+    other.invalidate()
+    other.invalidate()
+    repo.search_by_embedding(embedding=q, k=3)
+    assert repo.inner.calls == 3
+    assert worker.stats().invalidations == 2
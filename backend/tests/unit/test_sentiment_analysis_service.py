@@ -19,3 +19,56 @@ def test_sentiment_positive(mocker):
     sentiment, score = SentimentAnalysisService.analyze("I bought this product two years ago, gave it to my mom, and am now buying another one. It seems to work forever!")
     assert sentiment == "POSITIVE"
     assert 0.0 <= score <= 1.0
+
+class _FakeTokenizer:
+    def __call__(self, texts, truncation=True):
+        return {"input_ids": [t.split() for t in texts]}
+
+
+class _FakeBatchPipeline:
+    tokenizer = _FakeTokenizer()
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None, truncation=None):
+        self.calls.append((list(texts), batch_size))
+        return [
+            {"label": "NEGATIVE" if "cold" in t else "POSITIVE", "score": 0.5 + len(t.split()) / 100}
+            for t in texts
+        ]
+
+
+def test_sentiment_batch_sorts_by_length_and_preserves_order(mocker):
+    pipe = _FakeBatchPipeline()
+    mocker.patch("app.services.sentiment_analysis_service.get_sentiment_pipeline", return_value=pipe)
+    texts = [
+        "The food arrived cold and late after a very long wait",
+        "Great",
+        "Works well enough",
+    ]
+
+    results = SentimentAnalysisService.analyze_batch(texts, batch_size=8)
+
+    assert [label for label, _ in results] == ["NEGATIVE", "POSITIVE", "POSITIVE"]
+    assert results[1][1] == 0.51
+    [(sent, batch_size)] = pipe.calls
+    assert sent == [texts[1], texts[2], texts[0]]
+    assert batch_size == 8
+
+
+def test_coalescing_analyzer_groups_concurrent_calls(mocker):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.sentiment_analysis_service import CoalescingSentimentAnalyzer
+
+    pipe = _FakeBatchPipeline()
+    mocker.patch("app.services.sentiment_analysis_service.get_sentiment_pipeline", return_value=pipe)
+    analyzer = CoalescingSentimentAnalyzer(max_batch_size=4, max_wait_ms=200)
+    texts = ["cold soup", "nice phone", "fast delivery", "cold coffee again"]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(analyzer.analyze, texts))
+
+    assert [label for label, _ in results] == ["NEGATIVE", "POSITIVE", "POSITIVE", "NEGATIVE"]
+    assert len(pipe.calls) == 1
+    assert analyzer.stats().max_batch_size == 4
@@ -1,3 +1,7 @@
+import importlib.util
+
+import pytest
+
 from app.core.settings import get_settings
 
 
@@ -9,6 +13,42 @@ def test_settings_loads_core_environment(monkeypatch):
     monkeypatch.setenv("CORS_ORIGINS", " http://localhost:3000, https://example.com ,, ")
     monkeypatch.setenv("PORT", "9999")
     monkeypatch.setenv("E2E_FAKE_ANALYSIS", "true")
+    monkeypatch.setenv("RAG_EMBED_BATCHING", "true")
+    monkeypatch.setenv("RAG_EMBED_MAX_BATCH", "16")
+    monkeypatch.setenv("RAG_EMBED_MAX_WAIT_MS", "2.5")
+    monkeypatch.setenv("RAG_EMBEDDING_BACKEND", "ONNX")
+    monkeypatch.setenv("SENTIMENT_BATCHING", "1")
+    monkeypatch.setenv("RAG_RERANKER_PRELOAD", "cross-encoder/a, cross-encoder/b")
+    monkeypatch.setenv("MODEL_SNAPSHOT_DIR", "/app/models")
+    monkeypatch.setenv("INFERENCE_AUTHKEY", "k3y")
+    monkeypatch.setenv("INFERENCE_TIMEOUT_SECONDS", "2.5")
+    monkeypatch.setenv("MODEL_OFFLINE", "true")
+    monkeypatch.setenv("RAG_ANN_INDEX", "HNSW")
+    monkeypatch.setenv("RAG_ANN_METRIC", "IP")
+    monkeypatch.setenv("RAG_EMBEDDING_STORAGE", "HalfVec")
+    monkeypatch.setenv("RAG_HNSW_EF_SEARCH", "100")
+    monkeypatch.setenv("RAG_PROBES", "20")
+    monkeypatch.setenv("RAG_MAX_PROBES", "50")
+    monkeypatch.setenv("RAG_MAX_EF_SEARCH", "200")
+    monkeypatch.setenv("RAG_ITERATIVE_SCAN", "Strict_Order")
+    monkeypatch.setenv("RAG_EVAL_PROBES", "4")
+    monkeypatch.setenv("RAG_EVAL_EF_SEARCH", "32")
+    monkeypatch.setenv("RAG_EVAL_ITERATIVE_SCAN", "relaxed_order")
+    monkeypatch.setenv("RAG_REPOSITORY", "NumPy")
+    monkeypatch.setenv("RAG_NUMPY_REFRESH_SECONDS", "5")
+    monkeypatch.setenv("RAG_SEGMENTS_DIR", "/var/lib/vectors")
+    monkeypatch.setenv("RAG_SEGMENTS_DTYPE", "float16")
+    monkeypatch.setenv("RAG_RETRIEVAL_MODE", "Hybrid")
+    monkeypatch.setenv("RAG_HYBRID_CANDIDATES", "80")
+    monkeypatch.setenv("RAG_HYBRID_PROBES", "5")
+    monkeypatch.setenv("RAG_RRF_K", "30")
+    monkeypatch.setenv("RAG_BINARY_RESCORE", "true")
+    monkeypatch.setenv("RAG_BINARY_CANDIDATES", "300")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE", "true")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE_MIN_COSINE", "0.99")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE_MAX_ENTRIES", "500")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE_TTL_SECONDS", "15")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE_GENERATION_FILE", "/run/review-analyzer/cache.gen")
     get_settings.cache_clear()
 
     settings = get_settings()
@@ -20,5 +60,54 @@ def test_settings_loads_core_environment(monkeypatch):
     assert settings.cors_origins == ["http://localhost:3000", "https://example.com"]
     assert settings.port == 9999
     assert settings.e2e_fake_analysis is True
+    assert settings.embed_batching is True
+    assert (settings.embed_max_batch, settings.embed_max_wait_ms) == (16, 2.5)
+    assert settings.embedding_backend == "onnx"
+    assert settings.sentiment_batching is True
+    assert settings.reranker_preload == ["cross-encoder/a", "cross-encoder/b"]
+    assert settings.model_snapshot_dir == "/app/models"
+    assert settings.inference_authkey == "k3y"
+    assert settings.inference_timeout_seconds == 2.5
+    assert settings.model_offline is True
+    assert settings.ann_index == "hnsw"
+    assert settings.ann_metric == "ip"
+    assert settings.embedding_storage == "halfvec"
+    assert settings.hnsw_ef_search == 100
+    assert settings.rag_probes == 20
+    assert (settings.rag_max_probes, settings.rag_max_ef_search) == (50, 200)
+    assert settings.iterative_scan == "strict_order"
+    assert (settings.eval_probes, settings.eval_ef_search) == (4, 32)
+    assert settings.eval_iterative_scan == "relaxed_order"
+    assert settings.rag_repository == "numpy"
+    assert settings.numpy_refresh_seconds == 5.0
+    assert (settings.vector_segments_dir, settings.vector_segments_dtype) == ("/var/lib/vectors", "float16")
+    assert settings.retrieval_mode == "hybrid"
+    assert (settings.hybrid_candidates, settings.hybrid_probes, settings.rrf_k) == (80, 5, 30)
+    assert (settings.binary_rescore, settings.binary_candidates) == (True, 300)
+    assert settings.retrieval_cache_enabled is True
+    assert (settings.retrieval_cache_min_cosine, settings.retrieval_cache_max_entries) == (0.99, 500)
+    assert settings.retrieval_cache_ttl_seconds == 15.0
+    assert settings.retrieval_cache_generation_file == "/run/review-analyzer/cache.gen"
+
+    get_settings.cache_clear()
+
+
+def test_onnx_backend_requires_onnxruntime(monkeypatch):
+    monkeypatch.setenv("RAG_EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+    get_settings.cache_clear()
+
+    with pytest.raises(ValueError, match="uv sync --extra onnx"):
+        get_settings()
+
+    get_settings.cache_clear()
+
+
+def test_binary_candidates_must_fit_one_hnsw_scan(monkeypatch):
+    monkeypatch.setenv("RAG_BINARY_CANDIDATES", "5000")
+    get_settings.cache_clear()
+
+    with pytest.raises(ValueError, match="RAG_BINARY_CANDIDATES"):
+        get_settings()
 
     get_settings.cache_clear()
@@ -250,3 +250,58 @@ def test_review_continues_when_rag_reranker_fails(mock_call_llm, mock_rerank, ca
         record.message == "RAG reranker failed; using top candidates without reranking"
         for record in caplog.records
     )
+
+@patch("app.services.suggestion_service.rerank")
+@patch("app.services.suggestion_service.call_llm")
+def test_review_reuses_retrieval_query_embedding_for_mmr(mock_call_llm, mock_rerank):
+    from app.services.suggestion_service import Retrieval
+
+    mock_call_llm.return_value = '{"status": "Rejected", "feedback": "Use more detail.", "suggestion": ""}'
+    mock_rerank.side_effect = lambda query, docs, model_name, topk: docs[:topk]
+
+    class _CountingEmbedder:
+        calls = 0
+
+        def embed(self, text):
+            self.calls += 1
+            return [1.0, 0.0]
+
+    def retriever(query_text, k, min_score):
+        return Retrieval(
+            candidates=[
+                {"id": 10, "text": "Approved review about battery life.", "score": 0.91, "embedding": [1.0, 0.0]},
+                {"id": 20, "text": "Approved review about screen brightness.", "score": 0.88, "embedding": [0.0, 1.0]},
+            ],
+            query_embedding=[1.0, 0.0],
+        )
+
+    embedder = _CountingEmbedder()
+    svc = SuggestionService(retriever=retriever, query_embedder=embedder)
+    svc.evaluate(text="Battery bad")
+
+    assert embedder.calls == 0
+    docs = mock_rerank.call_args.args[1]
+    assert [d["id"] for d in docs] == [10, 20]
+
+@patch("app.services.suggestion_service.submit_shadow_rerank")
+@patch("app.services.suggestion_service.rerank")
+@patch("app.services.suggestion_service.call_llm")
+def test_review_submits_shadow_rerank_when_configured(mock_call_llm, mock_rerank, mock_shadow, monkeypatch):
+    from app.services import suggestion_service
+
+    mock_call_llm.return_value = '{"status": "Rejected", "feedback": "Use more detail.", "suggestion": ""}'
+    mock_rerank.side_effect = lambda query, docs, model_name, topk: docs[:1]
+    monkeypatch.setattr(suggestion_service, "SHADOW_MODEL", "cross-encoder/tiny")
+
+    def retriever(query_text, k, min_score):
+        return [
+            {"id": 10, "text": "Approved review about battery life.", "score": 0.91},
+            {"id": 20, "text": "Approved review about screen brightness.", "score": 0.88},
+        ]
+
+    SuggestionService(retriever=retriever).evaluate(text="Battery bad")
+
+    query, docs, model_name, topk, primary = mock_shadow.call_args.args
+    assert model_name == "cross-encoder/tiny"
+    assert [d["id"] for d in docs] == [10, 20]
+    assert [d["id"] for d in primary] == [10]
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.domain.rag.entities import AnnSearchParams
+from app.infra.db.vector_index import (
+    ann_search_scope,
+    ann_search_settings,
+    hnsw_index_sql,
+    ivfflat_index_sql,
+    opclass_for,
+)
+from app.models.vector_types import embedding_type
+
+
+def test_settings_only_include_knobs_for_the_index_type():
+    params = AnnSearchParams(probes=10, ef_search=16, iterative_scan="relaxed_order")
+
+    assert ann_search_settings("ivfflat", params) == {"ivfflat.probes": "10", "ivfflat.iterative_scan": "relaxed_order"}
+    assert ann_search_settings("hnsw", params, k=50) == {"hnsw.ef_search": "50", "hnsw.iterative_scan": "relaxed_order"}
+    assert ann_search_settings("hnsw", AnnSearchParams()) == {}
+
+
+def test_ivfflat_rejects_strict_order_iterative_scan():
+    with pytest.raises(ValueError):
+        ann_search_settings("ivfflat", AnnSearchParams(iterative_scan="strict_order"))
+
+
+def test_scope_opens_and_commits_its_own_transaction():
+    db = MagicMock()
+    db.in_transaction.return_value = False
+
+    with ann_search_scope(db, "ivfflat", AnnSearchParams(probes=5)):
+        pass
+
+    db.begin.return_value.commit.assert_called_once()
+    stmt, binds = db.execute.call_args.args
+    assert "set_config(:n0, :v0, true)" in str(stmt)
+    assert binds == {"n0": "ivfflat.probes", "v0": "5"}
+
+
+def test_scope_joins_the_callers_transaction():
+    db = MagicMock()
+    db.in_transaction.return_value = True
+
+    with ann_search_scope(db, "hnsw", AnnSearchParams(ef_search=40)):
+        pass
+
+    db.begin.assert_not_called()
+
+
+def test_hnsw_sql_validates_ef_construction():
+    assert "WITH (m = 16, ef_construction = 64)" in hnsw_index_sql(m=16, ef_construction=64)
+    with pytest.raises(ValueError):
+        hnsw_index_sql(m=16, ef_construction=16)
+
+
+def test_index_opclass_follows_storage_and_metric():
+    assert opclass_for("cosine", "vector") == "vector_cosine_ops"
+    assert opclass_for("ip", "halfvec") == "halfvec_ip_ops"
+    sql = ivfflat_index_sql(lists=10, metric="cosine", storage="halfvec", column="embedding_new")
+    assert "USING ivfflat (embedding_new halfvec_cosine_ops)" in sql
+    with pytest.raises(ValueError):
+        opclass_for("cosine", "bit")
+
+
+def test_embedding_column_type_follows_storage():
+    dialect = postgresql.dialect()
+    assert embedding_type("vector").compile(dialect=dialect) == "VECTOR(384)"
+    assert embedding_type("halfvec").compile(dialect=dialect) == "HALFVEC(384)"
+    with pytest.raises(ValueError):
+        embedding_type("bit")
@@ -0,0 +1,135 @@
+import multiprocessing
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.infra.vector import segments
+from app.infra.vector.segments import (
+    MemmapVectorIndex,
+    append_rows,
+    compact,
+    export_snapshot,
+    read_manifest,
+    tombstone_rows,
+    write_snapshot,
+)
+
+
+def _random_unit(n, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    mat = rng.standard_normal((n, dim)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def _snapshot(root, ids, vecs, dtype="float32"):
+    return write_snapshot(str(root), [(ids, vecs)], len(ids), dim=vecs.shape[1], dtype=dtype)
+
+
+def test_snapshot_search_matches_brute_force(tmp_path):
+    vecs = _random_unit(300)
+    _snapshot(tmp_path, list(range(1, 301)), vecs * 2.0)
+    index = MemmapVectorIndex(str(tmp_path))
+    index.refresh()
+
+    query = _random_unit(1, seed=1)[0]
+    hits = index.search(query, k=5)
+
+    assert [i for i, _ in hits] == (np.argsort(-(vecs @ query))[:5] + 1).tolist()
+    assert len(index) == 300
+    assert isinstance(index.vector(7), np.ndarray)
+
+
+def test_float16_segments_keep_ranking_close(tmp_path):
+    vecs = _random_unit(200)
+    _snapshot(tmp_path, list(range(200)), vecs, dtype="float16")
+    index = MemmapVectorIndex(str(tmp_path))
+    index.refresh()
+
+    query = vecs[42]
+    hit_id, score = index.search(query, k=1)[0]
+
+    assert hit_id == 42
+    assert score == pytest.approx(1.0, abs=1e-3)
+    assert (tmp_path / read_manifest(str(tmp_path)).segments[0] / "vectors.bin").stat().st_size == 200 * 384 * 2
+
+
+def test_appends_seal_the_delta_and_upsert_replaces(tmp_path, monkeypatch):
+    monkeypatch.setattr(segments, "DELTA_CAPACITY", 2)
+    vecs = _random_unit(6, dim=4)
+    _snapshot(tmp_path, [1, 2], vecs[:2])
+    index = MemmapVectorIndex(str(tmp_path))
+    index.refresh()
+
+    append_rows(str(tmp_path), [3, 4, 5], vecs[2:5])
+    assert index.refresh()  # the full delta was sealed: new manifest generation
+    assert len(read_manifest(str(tmp_path)).segments) == 3
+
+    index.upsert(1, vecs[5], text="edited")
+    assert len(index) == 5
+    assert index.search(vecs[5], k=1)[0][0] == 1
+    assert index.cached_text(1) == "edited"
+
+
+def test_tombstones_hide_rows_and_compaction_drops_them(tmp_path):
+    vecs = _random_unit(5, dim=4)
+    _snapshot(tmp_path, [1, 2, 3], vecs[:3])
+    append_rows(str(tmp_path), [4, 5], vecs[3:])
+    index = MemmapVectorIndex(str(tmp_path))
+    index.refresh()
+
+    assert index.remove(2)
+    assert tombstone_rows(str(tmp_path), [5]) == 1
+    assert 2 not in index
+    assert sorted(index.ids().tolist()) == [1, 3, 4]
+
+    old = read_manifest(str(tmp_path))
+    merged = compact(str(tmp_path))
+    index.refresh()
+
+    assert merged.generation == old.generation + 1
+    assert not any((tmp_path / name).exists() for name in old.segments)
+    assert sorted(index.ids().tolist()) == [1, 3, 4]
+    assert index.search(vecs[3], k=1)[0][0] == 4
+
+
+def _append_from_child(root, review_id, vec):
+    append_rows(root, [review_id], vec)
+
+
+def test_rows_appended_by_another_process_are_visible_without_reload(tmp_path):
+    vecs = _random_unit(3, dim=4)
+    _snapshot(tmp_path, [1, 2], vecs[:2])
+    index = MemmapVectorIndex(str(tmp_path))
+    index.refresh()
+
+    child = multiprocessing.get_context("fork").Process(target=_append_from_child, args=(str(tmp_path), 3, vecs[2]))
+    child.start()
+    child.join(10)
+
+    assert child.exitcode == 0
+    assert not index.refresh()  # same generation: the delta was mapped already
+    assert index.search(vecs[2], k=1)[0][0] == 3
+
+
+def test_append_without_snapshot_fails(tmp_path):
+    with pytest.raises(RuntimeError):
+        append_rows(str(tmp_path), [1], np.ones(4, dtype=np.float32))
+
+
+def test_index_without_snapshot_skips_writes(tmp_path):
+    index = MemmapVectorIndex(str(tmp_path))
+
+    index.upsert(1, np.ones(4, dtype=np.float32), text="kept for later")
+
+    assert read_manifest(str(tmp_path)) is None
+    assert index.remove(1) is False
+
+
+def test_export_if_missing_keeps_a_snapshot_published_meanwhile(tmp_path):
+    vecs = _random_unit(2, dim=4)
+    published = _snapshot(tmp_path, [1, 2], vecs)
+    db = MagicMock()
+
+    assert export_snapshot(db, str(tmp_path), dim=4, if_missing=True) == published
+    db.exec.assert_not_called()